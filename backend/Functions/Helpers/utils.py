@@ -1,25 +1,83 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import re
 from fastapi import HTTPException
 from youtube_transcript_api._api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import (
+    AgeRestricted, InvalidVideoId, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable, VideoUnplayable
+)
 from urllib.parse import urlparse, parse_qs
 
+# YouTube video ids are 11 characters of [A-Za-z0-9_-]; anything else never reaches a cache file name.
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+TRANSCRIPT_LANGUAGES = ["en-GB", "en-IN", "en-CA", "en-AU", "en"]
+# Transcript fetch cache: one zlib-compressed JSON file per (video_id, languages). Set TRANSCRIPT_CACHE_DIR="" to disable.
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", ".cache/transcripts")
+TRANSCRIPT_CACHE_TTL_SECONDS = int(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(30*24*3600)))
+TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS", str(6*3600)))
+# "No transcript" style failures are cached so broken entries are not re-fetched on every view.
+PERMANENT_TRANSCRIPT_ERRORS = (AgeRestricted, InvalidVideoId, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable, VideoUnplayable)
+
 def extract_video_id(url: str) -> str:
-    """Extract YouTube video ID from URL."""
+    """Extract YouTube video ID from URL; returns "" when the URL holds no well-formed video id."""
     parsed_url = urlparse(url)
+    video_id = ""
     if parsed_url.hostname in ("www.youtube.com", "youtube.com"):
         query = parse_qs(parsed_url.query)
-        video_id = query.get("v", [None])[0]
-        return video_id if video_id is not None else ""
+        video_id = query.get("v", [""])[0]
     elif parsed_url.hostname == "youtu.be":
-        return parsed_url.path.lstrip("/")
-    return ""
+        video_id = parsed_url.path.lstrip("/")
+    return video_id if VIDEO_ID_PATTERN.match(video_id) else ""
+
+def _transcript_cache_path(video_id: str, languages: list) -> str:
+    if not VIDEO_ID_PATTERN.match(video_id):
+        raise ValueError(f"Invalid YouTube video id: {video_id!r}")
+    digest = hashlib.sha256(",".join(languages).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(TRANSCRIPT_CACHE_DIR, f"{video_id}-{digest}.json.z")
+
+def _read_transcript_cache(video_id: str, languages: list):
+    """Returns the unexpired cache entry ({"transcript": ...} or {"error": ...}) or None."""
+    if not TRANSCRIPT_CACHE_DIR:
+        return None
+    try:
+        with open(_transcript_cache_path(video_id, languages), "rb") as f:
+            entry = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+    except (OSError, ValueError, zlib.error):
+        return None
+    return entry if entry.get("expires_at", 0) > time.time() else None
+
+def _write_transcript_cache(video_id: str, languages: list, entry: dict, ttl_seconds: int) -> None:
+    if not TRANSCRIPT_CACHE_DIR:
+        return
+    try:
+        os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        path = _transcript_cache_path(video_id, languages)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(json.dumps({**entry, "expires_at": time.time() + ttl_seconds}).encode("utf-8")))
+        os.replace(tmp_path, path)
+    except (OSError, ValueError) as e:
+        print(f"Error writing transcript cache for {video_id}: {e}")
 
 def fetch_transcript(video_id: str) -> list:
-    """Fetch and format transcript from YouTube."""
+    """Fetch and format transcript from YouTube, served from the local transcript cache when possible."""
+    cached = _read_transcript_cache(video_id, TRANSCRIPT_LANGUAGES)
+    if cached is not None:
+        if "error" in cached:
+            raise HTTPException(status_code=500, detail=f"Error fetching transcript: {cached['error']}")
+        return cached["transcript"]
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=["en-GB", "en-IN", "en-CA", "en-AU", "en"])
-        return [{"text": entry["text"], "start": entry["start"], "duration": entry["duration"]} for entry in transcript]
+        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=TRANSCRIPT_LANGUAGES)
+        formatted = [{"text": entry["text"], "start": entry["start"], "duration": entry["duration"]} for entry in transcript]
     except Exception as e:
+        if isinstance(e, PERMANENT_TRANSCRIPT_ERRORS):
+            _write_transcript_cache(video_id, TRANSCRIPT_LANGUAGES, {"error": str(e)}, TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS)
         raise HTTPException(status_code=500, detail=f"Error fetching transcript: {str(e)}")
+    _write_transcript_cache(video_id, TRANSCRIPT_LANGUAGES, {"transcript": formatted}, TRANSCRIPT_CACHE_TTL_SECONDS)
+    return formatted
     
 def textify(transcript: list) -> str:
     """Convert transcript list to a single text string."""
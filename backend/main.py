@@ -233,11 +233,16 @@ async def get_transcript_endpoint(video_id: str):
         raise HTTPException(status_code=404, detail="Transcript not available for this video.")
 
 @app.get("/video_details/{video_id}")
-async def get_video_details_endpoint(video_id: str):
+async def get_video_details_endpoint(video_id: str, fields: Optional[str] = None):
     """
-    Retrieves all stored details for a specific video.
+    Retrieves the stored details for a specific video.
+    fields is an optional comma-separated projection (e.g. "video_id,description") so callers
+    that only need the description do not download the whole transcript.
     """
-    video_doc = videos_collection.find_one({"video_id": video_id})
+    projection = {field.strip(): 1 for field in fields.split(",") if field.strip()} if fields else None
+    if projection is not None:
+        projection["description"] = 1 # needed for the repair check below
+    video_doc = videos_collection.find_one({"video_id": video_id}, projection)
     if not video_doc:
         raise HTTPException(status_code=404, detail="Video details not found.")
 
@@ -270,7 +275,7 @@ async def get_video_details_endpoint(video_id: str):
                 }}
             )
             # Re-fetch the updated document to ensure the client gets the latest data
-            video_doc = videos_collection.find_one({"video_id": video_id})
+            video_doc = videos_collection.find_one({"video_id": video_id}, projection)
             if video_doc:
                 video_doc["_id"] = str(video_doc["_id"]) # Convert again after re-fetching
             else:
@@ -126,7 +126,7 @@ const YouTubeNoteBook: React.FC<YouTubeNoteBookProps> = ({ videoId, notebookId,
   useEffect(() => {
     const fetchVideoDetails = async () => {
       try {
-        const response = await axios.get<VideoDetailsResponse>(`${API_BASE_URL}/video_details/${videoId}`);
+        const response = await axios.get<VideoDetailsResponse>(`${API_BASE_URL}/video_details/${videoId}?fields=video_id,description`);
         setVideoTitle(response.data.description.title || 'Video Unavailable');
         // Pre-fetch description so it's ready when user switches
         setDescription(response.data.description);
@@ -144,7 +144,7 @@ const YouTubeNoteBook: React.FC<YouTubeNoteBookProps> = ({ videoId, notebookId,
     setDescriptionLoading(true);
     setDescriptionError(null);
     try {
-      const response = await axios.get<VideoDetailsResponse>(`${API_BASE_URL}/video_details/${videoId}`);
+      const response = await axios.get<VideoDetailsResponse>(`${API_BASE_URL}/video_details/${videoId}?fields=video_id,description`);
       setDescription(response.data.description);
     } catch (err) {
       setDescriptionError('Failed to fetch description');
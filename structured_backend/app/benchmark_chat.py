@@ -0,0 +1,196 @@
+# app/benchmark_chat.py
+# Chat latency benchmark: `python -m app.benchmark_chat --video-id <id> [--users 50] [--mode both] [--retrieval-only]`.
+# Simulates concurrent users asking questions about one video and prints latency percentiles per mode as JSON.
+# "blocking" reproduces the old chain, where retrieval ran synchronously inside the event loop;
+# "async" runs the current chain, where retrieval is awaited and bounded by RAG_RETRIEVAL_TIMEOUT_SECONDS.
+# --simulate swaps Atlas, the embedding model and the LLM for in-process stand-ins with fixed latencies
+# (--sim-mongo-ms, --sim-embed-ms, --sim-llm-ms), so the event-loop effect can be measured without credentials.
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+from langchain_core.runnables import RunnableLambda
+from app.core.dependencies import get_basic_rag_service
+from app.core.lexical_index import LexicalIndexStore
+from app.core.settings import settings
+from app.core.vector_matrix_cache import VectorMatrixCache
+from app.repositories.vector_repository import VectorRepository
+from app.services.rag_service import BasicRAGService
+
+DEFAULT_QUESTIONS=[
+    "What is the main topic of the video?",
+    "Which examples are given?",
+    "What are the key takeaways?",
+    "Are any tools or libraries mentioned?",
+]
+
+
+async def ask(rag_service: BasicRAGService, mode: str, question: str, video_id: str, retrieval_only: bool)->None:
+    inputs={"question": question, "video_id": video_id}
+    if mode=="blocking":
+        context=rag_service._get_retriever_chain(question, video_id)
+        if not retrieval_only:
+            await rag_service.answer_chain.ainvoke({**inputs, "context": context})
+    elif retrieval_only:
+        await rag_service.retriever.ainvoke(inputs)
+    else:
+        await rag_service.rag_chain.ainvoke(inputs)
+
+
+class _SimulatedCursor(list):
+    def sort(self, *args):
+        return self
+
+
+class _SimulatedCollection:
+    """The chunk queries VectorRepository issues, answered from a list after mongo_seconds."""
+
+    def __init__(self, docs: List[dict], mongo_seconds: float):
+        self.docs=docs
+        self.mongo_seconds=mongo_seconds
+
+    def find(self, query: dict, projection=None)->_SimulatedCursor:
+        time.sleep(self.mongo_seconds)
+        if "_id" in query:
+            ids={str(chunk_id) for chunk_id in query["_id"]["$in"]}
+            return _SimulatedCursor(dict(doc) for doc in self.docs if doc["_id"] in ids)
+        return _SimulatedCursor(dict(doc) for doc in self.docs if doc["video_id"]==query["video_id"])
+
+    def count_documents(self, query: dict)->int:
+        time.sleep(self.mongo_seconds)
+        return sum(1 for doc in self.docs if doc["video_id"]==query["video_id"])
+
+
+class _SimulatedEmbeddings:
+    def __init__(self, dimension: int, embed_seconds: float):
+        self.dimension=dimension
+        self.embed_seconds=embed_seconds
+        self.rng=random.Random(0)
+
+    def embed_query(self, text: str)->List[float]:
+        time.sleep(self.embed_seconds)
+        return [self.rng.random() for _ in range(self.dimension)]
+
+    async def aembed_query(self, text: str)->List[float]:
+        await asyncio.sleep(self.embed_seconds)
+        return [self.rng.random() for _ in range(self.dimension)]
+
+
+class _SimulatedVectorStore:
+    _text_key="text"
+    _embedding_key="embedding"
+
+    def __init__(self, collection: _SimulatedCollection, embeddings: _SimulatedEmbeddings):
+        self.collection=collection
+        self.embeddings=embeddings
+
+
+def build_simulated_rag_service(args)->BasicRAGService:
+    """
+    The real BasicRAGService and VectorRepository (configured retrieval mode, matrix cache, in-memory BM25 store
+    and timeouts from settings) over stand-ins: one video of --sim-chunks random embeddings.
+    """
+    rng=random.Random(0)
+    docs=[
+        {
+            "_id": f"{args.video_id}:{i}", "video_id": args.video_id, "start": float(i),
+            "text": f"chunk {i} about topic {i%17} with an example, a tool and a takeaway",
+            "embedding": [rng.random() for _ in range(args.sim_dimension)],
+        }
+        for i in range(args.sim_chunks)
+    ]
+    vector_store=_SimulatedVectorStore(
+        _SimulatedCollection(docs, args.sim_mongo_ms/1000),
+        _SimulatedEmbeddings(args.sim_dimension, args.sim_embed_ms/1000)
+    )
+    vector_repository=VectorRepository(
+        vector_store,
+        matrix_cache=VectorMatrixCache(),
+        lexical_index=LexicalIndexStore(None),
+        retrieval_mode=settings.RETRIEVAL_MODE.lower(),
+        rrf_k=settings.RETRIEVAL_RRF_K,
+        fusion_candidates=settings.RETRIEVAL_FUSION_CANDIDATES,
+        query_timeout_seconds=settings.RETRIEVAL_QUERY_TIMEOUT_SECONDS,
+        embed_timeout_seconds=settings.RETRIEVAL_EMBED_TIMEOUT_SECONDS
+    )
+
+    def answer(inputs)->str:
+        time.sleep(args.sim_llm_ms/1000)
+        return "simulated answer"
+
+    async def aanswer(inputs)->str:
+        await asyncio.sleep(args.sim_llm_ms/1000)
+        return "simulated answer"
+
+    llm=RunnableLambda(answer, afunc=aanswer)
+    return BasicRAGService(llm, vector_repository, retrieval_timeout_seconds=settings.RAG_RETRIEVAL_TIMEOUT_SECONDS)
+
+
+def percentile(values: List[float], pct: float)->float:
+    ordered=sorted(values)
+    return ordered[min(len(ordered)-1, int(round(pct/100*(len(ordered)-1))))]
+
+
+async def run_mode(rag_service: BasicRAGService, mode: str, args)->dict:
+    latencies: List[float]=[]
+    errors=0
+
+    async def user(user_index: int):
+        nonlocal errors
+        for i in range(args.requests_per_user):
+            question=args.questions[(user_index+i)%len(args.questions)]
+            started=time.perf_counter()
+            try:
+                await ask(rag_service, mode, question, args.video_id, args.retrieval_only)
+            except Exception as e:
+                errors+=1
+                print(f"Request failed: {e}")
+            latencies.append(time.perf_counter()-started)
+
+    started=time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(args.users)))
+    wall_seconds=time.perf_counter()-started
+    return {
+        "mode": mode,
+        "users": args.users,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_seconds": percentile(latencies, 50),
+        "p95_seconds": percentile(latencies, 95),
+        "p99_seconds": percentile(latencies, 99),
+        "max_seconds": max(latencies),
+        "requests_per_second": len(latencies)/wall_seconds,
+    }
+
+
+async def main(args)->None:
+    rag_service=build_simulated_rag_service(args) if args.simulate else await asyncio.to_thread(get_basic_rag_service)
+    # One untimed request first, so model clients and caches are warm in both modes.
+    await ask(rag_service, "async", args.questions[0], args.video_id, args.retrieval_only)
+    modes=["blocking", "async"] if args.mode=="both" else [args.mode]
+    for mode in modes:
+        print(json.dumps(await run_mode(rag_service, mode, args)), flush=True)
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Measure chat latency percentiles under concurrent users.")
+    parser.add_argument("--video-id", help="an ingested video id (required unless --simulate)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests-per-user", type=int, default=4)
+    parser.add_argument("--mode", choices=["blocking", "async", "both"], default="both")
+    parser.add_argument("--retrieval-only", action="store_true", help="skip the answer LLM call and time retrieval alone")
+    parser.add_argument("--question", dest="questions", action="append", help="question to ask (repeatable)")
+    parser.add_argument("--simulate", action="store_true", help="use in-process stand-ins instead of Atlas, Vertex AI and Gemini")
+    parser.add_argument("--sim-mongo-ms", type=float, default=40.0, help="latency of each simulated Mongo query")
+    parser.add_argument("--sim-embed-ms", type=float, default=50.0, help="latency of each simulated query embedding")
+    parser.add_argument("--sim-llm-ms", type=float, default=300.0, help="latency of each simulated answer")
+    parser.add_argument("--sim-chunks", type=int, default=300)
+    parser.add_argument("--sim-dimension", type=int, default=768)
+    args=parser.parse_args()
+    if args.simulate:
+        args.video_id=args.video_id or "simulated01"
+    elif not args.video_id:
+        parser.error("--video-id is required unless --simulate is given")
+    args.questions=args.questions or DEFAULT_QUESTIONS
+    asyncio.run(main(args))
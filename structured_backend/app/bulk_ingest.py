@@ -0,0 +1,35 @@
+# app/bulk_ingest.py
+# Bulk ingest from the command line: `python -m app.bulk_ingest <url-or-id> ... [--file urls.txt]`.
+# Videos are ingested in this process with the same stage caps as the job workers; status is printed as NDJSON.
+import argparse
+import asyncio
+import json
+import sys
+from app.core.dependencies import get_bulk_ingest_service
+
+
+def read_items(args)->list:
+    items=list(args.items)
+    if args.file:
+        with open(args.file) as f:
+            items.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return items
+
+
+async def main(items: list)->int:
+    bulk_ingest_service=await asyncio.to_thread(get_bulk_ingest_service)
+    failed=0
+    async for event in bulk_ingest_service.run(items):
+        print(json.dumps(event, default=str), flush=True)
+        if event["status"] in ("failed", "invalid"):
+            failed+=1
+    return 1 if failed else 0
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Ingest many YouTube videos with bounded parallelism.")
+    parser.add_argument("items", nargs="*", help="YouTube URLs or video ids")
+    parser.add_argument("--file", help="file with one URL or video id per line")
+    items=read_items(parser.parse_args())
+    if not items:
+        parser.error("no videos given")
+    sys.exit(asyncio.run(main(items)))
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.metrics import metrics
+
+
+class _VideoAnswers:
+    """The cached answers of one (namespace, video): normalized query vectors plus answers, expiries and last use."""
+
+    def __init__(self):
+        self.vectors: List[np.ndarray]=[]
+        self.answers: List[Any]=[]
+        self.expires_at: List[float]=[]
+        self.last_used: List[float]=[]
+        self._matrix: Optional[np.ndarray]=None
+
+    def matrix(self)->np.ndarray:
+        if self._matrix is None:
+            self._matrix=np.vstack(self.vectors)
+        return self._matrix
+
+    def remove(self, positions: List[int])->None:
+        for i in sorted(positions, reverse=True):
+            del self.vectors[i], self.answers[i], self.expires_at[i], self.last_used[i]
+        self._matrix=None
+
+    def add(self, vector: np.ndarray, answer: Any, expires_at: float, now: float)->None:
+        self.vectors.append(vector)
+        self.answers.append(answer)
+        self.expires_at.append(expires_at)
+        self.last_used.append(now)
+        self._matrix=None
+
+
+class SemanticAnswerCache:
+    """
+    Serves a stored answer when a new question about the same video is semantically close to one
+    already answered: the cosine similarity of the query embeddings must reach similarity_threshold.
+    Answers are indexed per (namespace, video_id), so a lookup only scores that video's questions.
+    Entries expire after ttl_seconds; each video keeps at most max_entries_per_video answers and at
+    most max_videos videos are kept, both evicted least recently used first. Each invalidation bumps
+    the video's generation, and an answer computed under an older generation is not stored, so an
+    answer built from chunks that were replaced while it was generated cannot be cached.
+    """
+
+    def __init__(
+            self,
+            similarity_threshold: float=0.95,
+            ttl_seconds: float=3600,
+            max_entries_per_video: int=256,
+            max_videos: int=1024
+    ):
+        self.similarity_threshold=similarity_threshold
+        self.ttl_seconds=ttl_seconds
+        self.max_entries_per_video=max_entries_per_video
+        self.max_videos=max_videos
+        self._videos: "OrderedDict[Tuple[str, str], _VideoAnswers]"=OrderedDict()
+        self._generations: Dict[str, int]={}
+        self._lock=threading.Lock()
+        self.hits=0
+        self.misses=0
+        metrics.register_gauge("answer_cache", self.stats)
+
+    @staticmethod
+    def _normalize(vector: List[float])->np.ndarray:
+        array=np.asarray(vector, dtype=np.float32)
+        return array/(np.linalg.norm(array)+1e-12)
+
+    def lookup(self, namespace: str, video_id: str, query_vector: List[float])->Optional[Any]:
+        """Returns the answer of the most similar cached question above the threshold, or None."""
+        now=time.monotonic()
+        with self._lock:
+            entries=self._videos.get((namespace, video_id))
+            if entries is not None:
+                expired=[i for i, expires_at in enumerate(entries.expires_at) if expires_at<=now]
+                if expired:
+                    entries.remove(expired)
+                if entries.vectors:
+                    self._videos.move_to_end((namespace, video_id))
+                    similarities=entries.matrix()@self._normalize(query_vector)
+                    best=int(np.argmax(similarities))
+                    if similarities[best]>=self.similarity_threshold:
+                        entries.last_used[best]=now
+                        self.hits+=1
+                        metrics.incr(f"answer_cache.{namespace}.hits")
+                        return entries.answers[best]
+                else:
+                    del self._videos[(namespace, video_id)]
+            self.misses+=1
+            metrics.incr(f"answer_cache.{namespace}.misses")
+            return None
+
+    def generation(self, video_id: str)->int:
+        """Read before retrieving the answer's context and pass to put."""
+        with self._lock:
+            return self._generations.get(video_id, 0)
+
+    def put(self, namespace: str, video_id: str, query_vector: List[float], answer: Any, generation: Optional[int]=None)->None:
+        now=time.monotonic()
+        with self._lock:
+            if generation is not None and generation!=self._generations.get(video_id, 0):
+                return
+            entries=self._videos.get((namespace, video_id))
+            if entries is None:
+                entries=self._videos[(namespace, video_id)]=_VideoAnswers()
+            self._videos.move_to_end((namespace, video_id))
+            if len(entries.vectors)>=self.max_entries_per_video:
+                entries.remove([int(np.argmin(entries.last_used))])
+            entries.add(self._normalize(query_vector), answer, now+self.ttl_seconds, now)
+            while len(self._videos)>self.max_videos:
+                self._videos.popitem(last=False)
+
+    def invalidate(self, video_id: str)->None:
+        """Drops every cached answer about a video, in all namespaces."""
+        with self._lock:
+            self._generations[video_id]=self._generations.get(video_id, 0)+1
+            for key in [key for key in self._videos if key[1]==video_id]:
+                del self._videos[key]
+
+    def stats(self)->Dict[str, float]:
+        with self._lock:
+            lookups=self.hits+self.misses
+            return {
+                "videos": len(self._videos),
+                "entries": sum(len(entries.vectors) for entries in self._videos.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+            }
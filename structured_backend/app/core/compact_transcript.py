@@ -0,0 +1,162 @@
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson.binary import Binary
+
+try:
+    import zstandard
+except ImportError:  # optional dependency; zlib is always available
+    zstandard=None
+
+FORMAT_VERSION="columnar-v1"
+
+
+def _compress(data: bytes, codec: str)->bytes:
+    if codec=="zstd":
+        if zstandard is None:
+            raise ValueError("TRANSCRIPT_COMPRESSION=zstd requires the zstandard package.")
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    if codec=="zlib":
+        return zlib.compress(data, 6)
+    return data
+
+def _decompress(data: bytes, codec: str)->bytes:
+    if codec=="zstd":
+        if zstandard is None:
+            raise ValueError("This transcript is zstd-compressed and the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec=="zlib":
+        return zlib.decompress(data)
+    return data
+
+
+class CompactTranscript:
+    """
+    Columnar transcript: the segment texts are stored once as a single string joined by spaces,
+    with per-segment character offsets and float32 start/duration arrays. Each column is stored
+    as one (optionally compressed) binary field. Decoding is lazy: transcript_text only
+    decompresses the text column, and the {text, start, duration} entries are built on first access.
+    """
+
+    def __init__(self, text: str, offsets: array, starts: array, durations: array):
+        self._text=text
+        self._offsets=offsets
+        self._starts=starts
+        self._durations=durations
+        self._raw: Optional[Dict[str, Any]]=None
+        self._entries: Optional[List[Dict[str, Any]]]=None
+        self._max_ends: Optional[List[float]]=None
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Any])->"CompactTranscript":
+        """Builds the columns from transcript entries given as dicts or TranscriptEntry models."""
+        texts: List[str]=[]
+        offsets=array("I", [0])
+        starts=array("f")
+        durations=array("f")
+        position=0
+        for entry in entries:
+            if not isinstance(entry, dict):
+                entry=entry.model_dump()
+            texts.append(entry["text"])
+            starts.append(entry["start"])
+            durations.append(entry["duration"])
+            # Each segment is followed by the joining space, except the last one.
+            position+=len(entry["text"])+1
+            offsets.append(position)
+        return cls(" ".join(texts), offsets, starts, durations)
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any])->"CompactTranscript":
+        """Wraps a stored document without decompressing any column yet."""
+        if doc.get("format")!=FORMAT_VERSION:
+            raise ValueError(f"Unknown compact transcript format: {doc.get('format')}")
+        transcript=cls(None, None, None, None)
+        transcript._raw=doc
+        return transcript
+
+    def to_document(self, codec: str="zlib")->Dict[str, Any]:
+        return {
+            "format": FORMAT_VERSION,
+            "codec": codec,
+            "count": len(self.starts),
+            "text": Binary(_compress(self.transcript_text.encode("utf-8"), codec)),
+            "offsets": Binary(_compress(self.offsets.tobytes(), codec)),
+            "starts": Binary(_compress(self.starts.tobytes(), codec)),
+            "durations": Binary(_compress(self.durations.tobytes(), codec)),
+        }
+
+    def _column(self, name: str, typecode: str)->array:
+        values=array(typecode)
+        values.frombytes(_decompress(self._raw[name], self._raw["codec"]))
+        return values
+
+    @property
+    def transcript_text(self)->str:
+        if self._text is None:
+            self._text=_decompress(self._raw["text"], self._raw["codec"]).decode("utf-8")
+        return self._text
+
+    @property
+    def offsets(self)->array:
+        if self._offsets is None:
+            self._offsets=self._column("offsets", "I")
+        return self._offsets
+
+    @property
+    def starts(self)->array:
+        if self._starts is None:
+            self._starts=self._column("starts", "f")
+        return self._starts
+
+    @property
+    def durations(self)->array:
+        if self._durations is None:
+            self._durations=self._column("durations", "f")
+        return self._durations
+
+    def __len__(self)->int:
+        return self._raw["count"] if self._raw is not None and self._starts is None else len(self.starts)
+
+    def segment_text(self, index: int)->str:
+        return self.transcript_text[self.offsets[index]:self.offsets[index+1]-1]
+
+    @property
+    def entries(self)->List[Dict[str, Any]]:
+        """The transcript in the legacy list-of-dicts shape, built once on first access."""
+        if self._entries is None:
+            text, offsets=self.transcript_text, self.offsets
+            # float32 keeps about 7 significant digits, so round back to the millisecond precision YouTube reports.
+            self._entries=[
+                {"text": text[offsets[i]:offsets[i+1]-1], "start": round(start, 3), "duration": round(duration, 3)}
+                for i, (start, duration) in enumerate(zip(self.starts.tolist(), self.durations.tolist()))
+            ]
+        return self._entries
+
+    def _running_max_ends(self)->List[float]:
+        # YouTube segments overlap in time, so the end times are not sorted; their running maximum is.
+        if self._max_ends is None:
+            self._max_ends=list(accumulate(
+                (start+duration for start, duration in zip(self.starts.tolist(), self.durations.tolist())), max
+            ))
+        return self._max_ends
+
+    def window(self, start: float, end: Optional[float]=None)->List[Dict[str, Any]]:
+        """
+        Returns the segments that overlap [start, end) in the legacy entry shape. Segment start times
+        are sorted, so the last bound is found with bisect; the first candidate is the first segment
+        whose running maximum end time passes start, and only the segments in range are decoded.
+        """
+        starts=self.starts.tolist()
+        durations=self.durations
+        first=bisect_right(self._running_max_ends(), start)
+        last=len(starts) if end is None else bisect_left(starts, end)
+        return [
+            {"text": self.segment_text(i), "start": round(starts[i], 3), "duration": round(durations[i], 3)}
+            for i in range(first, last)
+            # Skips segments that start before start but had already ended by then.
+            if starts[i]>=start or starts[i]+durations[i]>start
+        ]
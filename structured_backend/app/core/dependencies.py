@@ -1,4 +1,8 @@
 import os
+import asyncio
+import functools
+import threading
+from typing import Optional
 import vertexai
 from langchain_google_vertexai import ChatVertexAI
 from app.core.settings import settings
@@ -6,6 +10,12 @@ from app.services.genai_service import GenAIService
 from fastapi import Depends
 from langchain_mongodb import MongoDBAtlasVectorSearch
 from app.core.embeddings import VertexAIEmbeddingsNative
+from app.core.embedding_cache import EmbeddingCache, MongoEmbeddingStore, SQLiteEmbeddingStore, QueryEmbeddingCache
+from app.core.transcript_cache import TranscriptCache, FileTranscriptStore, MongoTranscriptStore
+from app.core.vector_matrix_cache import VectorMatrixCache
+from app.core.lexical_index import LexicalIndexStore
+from app.core.retrieval_cache import RetrievalCache
+from app.core.answer_cache import SemanticAnswerCache
 from app.repositories.vector_repository import VectorRepository
 from app.services.youtube_service import YouTubeService
 from app.services.vector_service import VectorService
@@ -20,6 +30,13 @@ from app.repositories.video_mongodb_repository import VideoMongoDBRepository
 from app.repositories.user_mongodb_repository import UserMongoDBRepository
 from app.repositories.notebook_mongodb_repository import NotebookMongoDBRepository
 from app.services.notebook_service import NotebookService
+from app.services.video_ingest_service import VideoIngestService
+from app.services.bulk_ingest_service import BulkIngestService
+from app.services.job_queue_service import JobQueueService, ProgressCallback
+from app.repositories.job_mongodb_repository import JobMongoDBRepository
+from app.repositories.in_memory_job_repository import InMemoryJobRepository
+from app.repositories.lease_mongodb_repository import LeaseMongoDBRepository
+from app.core.schema import JobDBEntry
 
 
 
@@ -34,7 +51,39 @@ If we defined the model or vector store inside their respective functions withou
 _embeddings_model_cache=None
 _vector_store_cache=None
 _gemini_model_cache=None
+_job_repository_cache=None
+_job_queue_service_cache=None
+_video_ingest_service_cache=None
+_transcript_cache=None
+_vector_matrix_cache=None
+_lexical_index_cache=None
+_retrieval_cache=None
+_answer_cache=None
+_mongo_client_cache=None
+_llm_timestamp_cache=None
+_vector_repository_cache=None
+_chat_mongodb_repository_cache=None
+_basic_rag_service_cache=None
+_chat_rag_service_cache=None
+_persistant_chat_rag_service_cache=None
+_timestamp_service_cache=None
+
+def _singleton(getter):
+    """
+    Serializes a singleton getter, so concurrent first calls (the warm-up thread, request threads, job workers)
+    build one instance instead of racing. Each getter has its own lock, so independent singletons still build
+    in parallel; getters only call the getters of their dependencies, so the locks cannot deadlock.
+    """
+    lock=threading.RLock()
+
+    @functools.wraps(getter)
+    def locked(*args, **kwargs):
+        with lock:
+            return getter(*args, **kwargs)
+    return locked
+
 
+@_singleton
 def get_gemini_model() -> ChatVertexAI:
     """Initializes and returns a singleton instance of the Gemini LLM."""
     global _gemini_model_cache
@@ -58,9 +107,30 @@ def get_genai_service(
         llm: ChatVertexAI = Depends(get_gemini_model)
 )->GenAIService:
     """Provides a GenAIService instance with the LLM dependency injected."""
-    return GenAIService(llm=llm)
+    return GenAIService(
+        llm=llm,
+        map_reduce_threshold_chars=settings.DESCRIPTION_MAP_REDUCE_THRESHOLD_CHARS,
+        map_window_chars=settings.DESCRIPTION_MAP_WINDOW_CHARS,
+        map_concurrency=settings.DESCRIPTION_MAP_CONCURRENCY,
+        description_token_budget=settings.DESCRIPTION_TOKEN_BUDGET
+    )
 
 
+def _build_embedding_cache(model_name: str)->EmbeddingCache:
+    """Builds the embedding cache with the persistent tier selected by EMBEDDING_CACHE_BACKEND."""
+    backend=settings.EMBEDDING_CACHE_BACKEND.lower()
+    store=None
+    if backend=="mongo":
+        if not settings.MONGODB_URI or settings.DB_NAME is None:
+            raise ValueError("MONGODB_URI and DB_NAME must be set for the mongo embedding cache !!!")
+        store=MongoEmbeddingStore(MongoClient(settings.MONGODB_URI)[settings.DB_NAME][settings.EMBEDDING_CACHE_COLLECTION])
+    elif backend=="sqlite":
+        store=SQLiteEmbeddingStore(settings.EMBEDDING_CACHE_SQLITE_PATH)
+    elif backend!="memory":
+        raise ValueError(f"Unknown EMBEDDING_CACHE_BACKEND: {settings.EMBEDDING_CACHE_BACKEND}")
+    return EmbeddingCache(model_name=model_name, lru_size=settings.EMBEDDING_CACHE_LRU_SIZE, store=store)
+
+@_singleton
 def get_embeddings_model()-> VertexAIEmbeddingsNative:
     """Initializes and returns the MongoDBAtlasVectorSearch instance as a singleton."""
 
@@ -70,13 +140,24 @@ def get_embeddings_model()-> VertexAIEmbeddingsNative:
             if(settings.EMBEDDINGS_MODEL_NAME is None):
                 raise ValueError
             _embeddings_model_cache=VertexAIEmbeddingsNative(
-                model_name=settings.EMBEDDINGS_MODEL_NAME
+                model_name=settings.EMBEDDINGS_MODEL_NAME,
+                batch_size=settings.EMBEDDINGS_BATCH_SIZE,
+                max_batch_tokens=settings.EMBEDDINGS_MAX_BATCH_TOKENS,
+                max_concurrency=settings.EMBEDDINGS_MAX_CONCURRENCY,
+                max_retries=settings.EMBEDDINGS_MAX_RETRIES,
+                cache=_build_embedding_cache(settings.EMBEDDINGS_MODEL_NAME),
+                # One query cache per process, shared by the chat and timestamp retrieval paths.
+                query_cache=QueryEmbeddingCache(
+                    max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+                    ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+                )
             )
-            test_embedding_dim=len(_embeddings_model_cache.embed_query("test"))
-            print(f"Embeddings model initialized Successfully !! \n Embedding dimension: {test_embedding_dim}")
-
-            if test_embedding_dim != 3072:
-                raise ValueError(f"Expected dimension 3072, but got{test_embedding_dim}")
+            # Probes the model once. With WARMUP_ON_STARTUP the background warm-up builds the model,
+            # so no request pays for it; worker processes and WARMUP_ON_STARTUP=False build it on first use.
+            dimension=len(_embeddings_model_cache.embed_query("test"))
+            print(f"Embeddings model initialized Successfully !! \n Embedding dimension: {dimension}")
+            if dimension != settings.EMBEDDINGS_DIMENSION:
+                raise ValueError(f"Expected dimension {settings.EMBEDDINGS_DIMENSION}, but got {dimension}")
         except Exception as e:
             print(f"Error initializing custom embedding model: {e}")
             _embeddings_model_cache=None
@@ -85,6 +166,7 @@ def get_embeddings_model()-> VertexAIEmbeddingsNative:
     return _embeddings_model_cache
 
 
+@_singleton
 def get_vector_store()->MongoDBAtlasVectorSearch:
 
     """Initializes and returns the MongoDBAtlasVectorSearch instance as a singleton."""
@@ -130,75 +212,196 @@ def get_vector_store()->MongoDBAtlasVectorSearch:
     return _vector_store_cache
 
 
-def get_vector_repository(
-        vector_store: MongoDBAtlasVectorSearch=Depends(get_vector_store)
-)->VectorRepository:
-    """Provides a VectorRepository instance."""
-    return VectorRepository(vector_store)
+@_singleton
+def get_vector_matrix_cache()->Optional[VectorMatrixCache]:
+    """Provides the in-memory per-video embedding matrix cache as a singleton, or None when disabled."""
+    global _vector_matrix_cache
+    if _vector_matrix_cache is None and settings.VECTOR_MATRIX_CACHE_ENABLED:
+        _vector_matrix_cache=VectorMatrixCache(
+            max_bytes=settings.VECTOR_MATRIX_CACHE_MAX_MB*1024*1024,
+            ttl_seconds=settings.VECTOR_MATRIX_CACHE_TTL_SECONDS
+        )
+    return _vector_matrix_cache
+
+@_singleton
+def get_lexical_index_store(vector_store: MongoDBAtlasVectorSearch)->LexicalIndexStore:
+    """Provides the per-video BM25 index store as a singleton, persisted next to the chunks when the backend is mongo."""
+    global _lexical_index_cache
+    if _lexical_index_cache is None:
+        backend=settings.LEXICAL_INDEX_BACKEND.lower()
+        if backend=="mongo":
+            collection=vector_store.collection.database[settings.LEXICAL_INDEX_COLLECTION]
+        elif backend=="memory":
+            collection=None
+        else:
+            raise ValueError(f"Unknown LEXICAL_INDEX_BACKEND: {settings.LEXICAL_INDEX_BACKEND}")
+        _lexical_index_cache=LexicalIndexStore(collection, max_videos=settings.LEXICAL_INDEX_MAX_VIDEOS, ttl_seconds=settings.LEXICAL_INDEX_TTL_SECONDS)
+    return _lexical_index_cache
+
+@_singleton
+def get_retrieval_cache()->Optional[RetrievalCache]:
+    """Provides the search result cache as a singleton, or None when disabled."""
+    global _retrieval_cache
+    if _retrieval_cache is None and settings.RETRIEVAL_CACHE_ENABLED:
+        _retrieval_cache=RetrievalCache(max_entries=settings.RETRIEVAL_CACHE_SIZE, ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS)
+    return _retrieval_cache
+
+@_singleton
+def get_answer_cache()->Optional[SemanticAnswerCache]:
+    """Provides the semantic answer cache shared by /chat/once and timestamp queries as a singleton, or None when disabled."""
+    global _answer_cache
+    if _answer_cache is None and settings.ANSWER_CACHE_ENABLED:
+        _answer_cache=SemanticAnswerCache(
+            similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+            max_entries_per_video=settings.ANSWER_CACHE_MAX_ENTRIES_PER_VIDEO,
+            max_videos=settings.ANSWER_CACHE_MAX_VIDEOS
+        )
+    return _answer_cache
+
+def _build_vector_repository(vector_store: MongoDBAtlasVectorSearch)->VectorRepository:
+    return VectorRepository(
+        vector_store,
+        matrix_cache=get_vector_matrix_cache(),
+        lexical_index=get_lexical_index_store(vector_store),
+        retrieval_mode=settings.RETRIEVAL_MODE.lower(),
+        rrf_k=settings.RETRIEVAL_RRF_K,
+        fusion_candidates=settings.RETRIEVAL_FUSION_CANDIDATES,
+        retrieval_cache=get_retrieval_cache(),
+        # Cached answers are derived from the chunks, so re-ingesting a video drops them as well.
+        dependent_caches=[cache for cache in (get_answer_cache(),) if cache is not None],
+        query_timeout_seconds=settings.RETRIEVAL_QUERY_TIMEOUT_SECONDS,
+        embed_timeout_seconds=settings.RETRIEVAL_EMBED_TIMEOUT_SECONDS
+    )
+
+@_singleton
+def get_vector_repository()->VectorRepository:
+    """Provides the VectorRepository used by request handlers as a singleton."""
+    global _vector_repository_cache
+    if _vector_repository_cache is None:
+        _vector_repository_cache=_build_vector_repository(get_vector_store())
+    return _vector_repository_cache
 
 def get_transcript_processing_service()->TranscriptProcessingService:
     """
     Provides a TranscriptProcessing instance. This service is stateless and doesn't require a singleton cache.
     """
-    return TranscriptProcessingService()
+    return TranscriptProcessingService(chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP)
 
 def get_vector_service(
         vector_repository: VectorRepository=Depends(get_vector_repository),
         transcript_processing_service: TranscriptProcessingService=Depends(get_transcript_processing_service)
 )->VectorService:
     """Provides a Vector Service instance."""
-    return VectorService(vector_repository,transcript_processing_service)
+    return VectorService(vector_repository,transcript_processing_service,batch_size=settings.INGEST_BATCH_SIZE,queue_size=settings.INGEST_QUEUE_SIZE)
+
+@_singleton
+def get_transcript_cache()->Optional[TranscriptCache]:
+    """Provides the transcript fetch cache selected by TRANSCRIPT_CACHE_BACKEND as a singleton, or None when disabled."""
+    global _transcript_cache
+    backend=settings.TRANSCRIPT_CACHE_BACKEND.lower()
+    if _transcript_cache is None and backend!="none":
+        if backend=="file":
+            store=FileTranscriptStore(settings.TRANSCRIPT_CACHE_DIR)
+        elif backend=="mongo":
+            if not settings.MONGODB_URI or settings.DB_NAME is None:
+                raise ValueError("MONGODB_URI and DB_NAME must be set for the mongo transcript cache !!!")
+            store=MongoTranscriptStore(get_mongo_client()[settings.DB_NAME][settings.TRANSCRIPT_CACHE_COLLECTION])
+        else:
+            raise ValueError(f"Unknown TRANSCRIPT_CACHE_BACKEND: {settings.TRANSCRIPT_CACHE_BACKEND}")
+        _transcript_cache=TranscriptCache(
+            store,
+            ttl_seconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS,
+            negative_ttl_seconds=settings.TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS
+        )
+    return _transcript_cache
 
 def get_youtube_service()-> YouTubeService:
     """Provide a YoutTUbeService instance."""
-    return YouTubeService()
+    return YouTubeService(transcript_cache=get_transcript_cache())
 
+@_singleton
 def get_llm_timestamp()->ChatVertexAI:
-    """Provides a ChatVertexAI model instance for timestamp extraction."""
-    llm=ChatVertexAI(
-        model_name=settings.TIMESTAMP_LLM_MODEL,
-        temperature=settings.TIMESTAMP_TEMPERATURE,
-        project=settings.GOOGLE_CLOUD_PROJECT,
-        location=settings.GOOGLE_CLOUD_LOCATION,
-    )
-    return llm
+    """Provides the ChatVertexAI model for timestamp extraction as a singleton."""
+    global _llm_timestamp_cache
+    if _llm_timestamp_cache is None:
+        _llm_timestamp_cache=ChatVertexAI(
+            model_name=settings.TIMESTAMP_LLM_MODEL,
+            temperature=settings.TIMESTAMP_TEMPERATURE,
+            project=settings.GOOGLE_CLOUD_PROJECT,
+            location=settings.GOOGLE_CLOUD_LOCATION,
+        )
+    return _llm_timestamp_cache
 
-def get_timestamp_service(
-        llm_timestamp: ChatVertexAI=Depends(get_llm_timestamp),
-        vector_repository: VectorRepository=Depends(get_vector_repository)
-)-> TimestampService:
-    """Provides a TimestampService instance with its dependencies."""
-    return TimestampService(llm=llm_timestamp, vector_repository=vector_repository)
+"""
+The RAG and timestamp services below hold compiled prompts and chains, so they are app-scoped
+singletons rather than rebuilt by the Depends graph on every request. Per-request values
+(question, video_id, k, filter, chat history) are passed when the chains are invoked.
+"""
 
+@_singleton
+def get_timestamp_service()-> TimestampService:
+    """Provides the TimestampService singleton."""
+    global _timestamp_service_cache
+    if _timestamp_service_cache is None:
+        _timestamp_service_cache=TimestampService(
+            llm=get_llm_timestamp(),
+            vector_repository=get_vector_repository(),
+            answer_cache=get_answer_cache(),
+            video_mongo_repo=VideoMongoDBRepository(get_mongo_client())
+        )
+    return _timestamp_service_cache
+
+@_singleton
 def get_mongo_client()->MongoClient:
-    """Provides a MongoClient instance."""
-    MONGO_URI=settings.MONGODB_URI
-    return MongoClient(MONGO_URI)
-
-def get_chat_mongodb_repository(client: MongoClient=Depends(get_mongo_client))->ChatMongoDBRepository:
-    """Provides a MongoDBRepository instance."""
-    return ChatMongoDBRepository(client)
-
-def get_basic_rag_service(
-        llm: ChatVertexAI=Depends(get_gemini_model),
-        vector_store: MongoDBAtlasVectorSearch=Depends(get_vector_store)
-)->BasicRAGService:
-    """Provides the base RAG service."""
-    return BasicRAGService(llm,vector_store)
-
-def get_chat_rag_service(
-        llm: ChatVertexAI=Depends(get_gemini_model),
-        rag_service: BasicRAGService=Depends(get_basic_rag_service)
-)->ChatRAGService:
-    """Provides the chat RAG service with history management."""
-    return ChatRAGService(llm,rag_service)
-
-def get_persistant_chat_rag_service(
-        chat_rag_service: ChatRAGService=Depends(get_chat_rag_service),
-        chat_mongo_repo: ChatMongoDBRepository=Depends(get_chat_mongodb_repository)
-)->PersistentChatRAGService:
-    """Provides the full persistent chat service."""
-    return PersistentChatRAGService(chat_rag_service,chat_mongo_repo)
+    """Provides the MongoClient singleton; it is thread-safe and keeps its own connection pool."""
+    global _mongo_client_cache
+    if _mongo_client_cache is None:
+        _mongo_client_cache=MongoClient(settings.MONGODB_URI)
+    return _mongo_client_cache
+
+@_singleton
+def get_chat_mongodb_repository()->ChatMongoDBRepository:
+    """Provides the ChatMongoDBRepository singleton, so its index is only ensured once."""
+    global _chat_mongodb_repository_cache
+    if _chat_mongodb_repository_cache is None:
+        _chat_mongodb_repository_cache=ChatMongoDBRepository(get_mongo_client())
+    return _chat_mongodb_repository_cache
+
+@_singleton
+def get_basic_rag_service()->BasicRAGService:
+    """Provides the base RAG service singleton."""
+    global _basic_rag_service_cache
+    if _basic_rag_service_cache is None:
+        _basic_rag_service_cache=BasicRAGService(
+            get_gemini_model(),
+            get_vector_repository(),
+            retrieval_timeout_seconds=settings.RAG_RETRIEVAL_TIMEOUT_SECONDS,
+            answer_cache=get_answer_cache(),
+            video_mongo_repo=VideoMongoDBRepository(get_mongo_client())
+        )
+    return _basic_rag_service_cache
+
+@_singleton
+def get_chat_rag_service()->ChatRAGService:
+    """Provides the chat RAG service with history management as a singleton."""
+    global _chat_rag_service_cache
+    if _chat_rag_service_cache is None:
+        _chat_rag_service_cache=ChatRAGService(get_gemini_model(),get_basic_rag_service())
+    return _chat_rag_service_cache
+
+@_singleton
+def get_persistant_chat_rag_service()->PersistentChatRAGService:
+    """Provides the full persistent chat service as a singleton."""
+    global _persistant_chat_rag_service_cache
+    if _persistant_chat_rag_service_cache is None:
+        _persistant_chat_rag_service_cache=PersistentChatRAGService(get_chat_rag_service(),get_chat_mongodb_repository())
+    return _persistant_chat_rag_service_cache
+
+def warm_request_services()->None:
+    """Builds every app-scoped request service, so the first requests do not pay for it."""
+    get_persistant_chat_rag_service()
+    get_timestamp_service()
 
 def get_video_mongodb_repository(client: MongoClient=Depends(get_mongo_client))->VideoMongoDBRepository:
     return VideoMongoDBRepository(client)
@@ -211,3 +414,96 @@ def get_notebook_mongodb_repository(client: MongoClient=Depends(get_mongo_client
 
 def get_notebook_service(user_mongodb_repository:UserMongoDBRepository=Depends(get_user_mongodb_repository), notebook_mongodb_repository: NotebookMongoDBRepository=Depends(get_notebook_mongodb_repository),chat_mongodb_repository=Depends(get_chat_mongodb_repository))->NotebookService:
     return NotebookService(user_mongodb_repository,notebook_mongodb_repository,chat_mongodb_repository)
+
+@_singleton
+def get_video_ingest_service()->VideoIngestService:
+    """
+    Provides the VideoIngestService used by background workers as a singleton.
+    Workers run outside the request scope, so the dependencies are resolved directly instead of through Depends.
+    """
+    global _video_ingest_service_cache
+    if _video_ingest_service_cache is None:
+        vector_service=VectorService(
+            get_vector_repository(),
+            get_transcript_processing_service(),
+            batch_size=settings.INGEST_BATCH_SIZE,
+            queue_size=settings.INGEST_QUEUE_SIZE
+        )
+        _video_ingest_service_cache=VideoIngestService(
+            youtube_service=get_youtube_service(),
+            genai_service=get_genai_service(get_gemini_model()),
+            vector_service=vector_service,
+            video_mongo_repo=VideoMongoDBRepository(get_mongo_client()),
+            # Cross-process coalescing is only needed when several processes share the Mongo job queue.
+            lease_repository=LeaseMongoDBRepository(get_mongo_client()) if settings.JOB_QUEUE_BACKEND.lower()=="mongo" else None,
+            lease_ttl_seconds=settings.INGEST_LEASE_TTL_SECONDS,
+            stage_limits={
+                "transcript": settings.INGEST_TRANSCRIPT_CONCURRENCY,
+                "llm": settings.INGEST_LLM_CONCURRENCY,
+                "embedding": settings.INGEST_EMBEDDING_CONCURRENCY,
+            },
+            description_mode=settings.DESCRIPTION_MODE.lower()
+        )
+    return _video_ingest_service_cache
+
+def get_bulk_ingest_service()->BulkIngestService:
+    """Provides a BulkIngestService on top of the VideoIngestService singleton, so the stage caps are shared."""
+    video_ingest_service=get_video_ingest_service()
+    return BulkIngestService(
+        youtube_service=video_ingest_service.youtube_service,
+        video_mongo_repo=video_ingest_service.video_mongo_repo,
+        video_ingest_service=video_ingest_service,
+        max_in_flight=settings.BULK_INGEST_MAX_IN_FLIGHT
+    )
+
+async def _handle_ingest_video_job(job: JobDBEntry, report: ProgressCallback):
+    ingest_service=await asyncio.to_thread(get_video_ingest_service)
+    result=await ingest_service.ingest_video(job.payload["video_id"], job.payload["url"], report)
+    if result.get("description_status")=="pending":
+        # Embeddings are stored; only the description has to be retried.
+        await get_job_queue_service().enqueue(
+            "generate_description", {"video_id": job.payload["video_id"]},
+            delay_seconds=settings.DESCRIPTION_RETRY_DELAY_SECONDS
+        )
+    return result
+
+async def _handle_generate_description_job(job: JobDBEntry, report: ProgressCallback):
+    ingest_service=await asyncio.to_thread(get_video_ingest_service)
+    return await ingest_service.regenerate_description(job.payload["video_id"], report)
+
+@_singleton
+def get_job_repository():
+    """Provides the job queue repository selected by JOB_QUEUE_BACKEND as a singleton."""
+    global _job_repository_cache
+    if _job_repository_cache is None:
+        backend=settings.JOB_QUEUE_BACKEND.lower()
+        if backend=="mongo":
+            _job_repository_cache=JobMongoDBRepository(get_mongo_client())
+        elif backend=="memory":
+            _job_repository_cache=InMemoryJobRepository()
+        else:
+            raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {settings.JOB_QUEUE_BACKEND}")
+    return _job_repository_cache
+
+@_singleton
+def get_job_queue_service()->JobQueueService:
+    """Provides the JobQueueService singleton with all job handlers registered."""
+    global _job_queue_service_cache
+    if _job_queue_service_cache is None:
+        _job_queue_service_cache=JobQueueService(
+            get_job_repository(),
+            num_workers=settings.JOB_WORKERS,
+            poll_interval_seconds=settings.JOB_POLL_INTERVAL_SECONDS,
+            stale_after_seconds=settings.JOB_STALE_AFTER_SECONDS
+        )
+        _job_queue_service_cache.register_handler(
+            "ingest_video", _handle_ingest_video_job,
+            max_attempts=settings.INGEST_RETRY_MAX_ATTEMPTS,
+            retry_delay_seconds=settings.INGEST_RETRY_DELAY_SECONDS
+        )
+        _job_queue_service_cache.register_handler(
+            "generate_description", _handle_generate_description_job,
+            max_attempts=settings.DESCRIPTION_RETRY_MAX_ATTEMPTS,
+            retry_delay_seconds=settings.DESCRIPTION_RETRY_DELAY_SECONDS
+        )
+    return _job_queue_service_cache
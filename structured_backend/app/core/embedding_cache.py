@@ -0,0 +1,229 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson.binary import Binary
+from pymongo.collection import Collection
+
+from app.core.metrics import metrics
+
+
+def _pack_vector(vector: List[float])->bytes:
+    """Packs a vector as little-endian float32 bytes (a quarter of the size of a BSON double array)."""
+    return array("f", vector).tobytes()
+
+def _unpack_vector(data: bytes)->List[float]:
+    vector=array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class MongoEmbeddingStore:
+    """Persistent embedding tier backed by a MongoDB collection. Documents are keyed by the cache key."""
+
+    def __init__(self, collection: Collection):
+        self.collection=collection
+
+    def get_many(self, keys: List[str])->Dict[str, List[float]]:
+        found={}
+        for doc in self.collection.find({"_id": {"$in": keys}}, {"vector": 1}):
+            found[doc["_id"]]=_unpack_vector(doc["vector"])
+        return found
+
+    def put_many(self, items: Dict[str, List[float]])->None:
+        if not items:
+            return
+        now=datetime.utcnow()
+        docs=[{"_id": key, "vector": Binary(_pack_vector(vector)), "created_at": now} for key, vector in items.items()]
+        try:
+            self.collection.insert_many(docs, ordered=False)
+        except Exception as e:
+            # Duplicate keys mean another worker cached the same text first, which is fine.
+            if "E11000" not in str(e):
+                raise
+
+
+class SQLiteEmbeddingStore:
+    """Persistent embedding tier backed by a local SQLite file, for offline use and experiments."""
+
+    def __init__(self, path: str):
+        directory=os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock=threading.Lock()
+        self._conn=sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str])->Dict[str, List[float]]:
+        found={}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit.
+            for i in range(0, len(keys), 500):
+                chunk=keys[i:i+500]
+                placeholders=",".join("?" for _ in chunk)
+                rows=self._conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk)
+                for key, data in rows:
+                    found[key]=_unpack_vector(data)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]])->None:
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, _pack_vector(vector)) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (model_name, task_type, sha256(text)).
+    Lookups go through an in-process LRU first and then the optional persistent store;
+    persistent hits are promoted into the LRU.
+    """
+
+    def __init__(self, model_name: str, lru_size: int=20000, store=None):
+        self.model_name=model_name
+        self.lru_size=lru_size
+        self.store=store
+        self._lru: "OrderedDict[str, List[float]]"=OrderedDict()
+        self._lock=threading.Lock()
+        self.lru_hits=0
+        self.store_hits=0
+        self.misses=0
+        metrics.register_gauge("embedding_cache", self.stats)
+
+    def key(self, task_type: str, text: str)->str:
+        digest=hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{task_type}:{digest}"
+
+    def _lru_get(self, key: str)->Optional[List[float]]:
+        with self._lock:
+            vector=self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: str, vector: List[float])->None:
+        with self._lock:
+            self._lru[key]=vector
+            self._lru.move_to_end(key)
+            while len(self._lru)>self.lru_size:
+                self._lru.popitem(last=False)
+
+    def get_many(self, task_type: str, texts: List[str])->List[Optional[List[float]]]:
+        """Returns the cached vector for each text, or None where it has to be embedded."""
+        keys=[self.key(task_type, text) for text in texts]
+        results: List[Optional[List[float]]]=[self._lru_get(key) for key in keys]
+        lru_hits=sum(1 for vector in results if vector is not None)
+
+        store_hits=0
+        missing=list({key for key, vector in zip(keys, results) if vector is None})
+        if missing and self.store is not None:
+            try:
+                found=self.store.get_many(missing)
+            except Exception as e:
+                print(f"Error reading persistent embedding cache: {e}")
+                found={}
+            for i, key in enumerate(keys):
+                if results[i] is None and key in found:
+                    results[i]=found[key]
+                    store_hits+=1
+            for key, vector in found.items():
+                self._lru_put(key, vector)
+
+        misses=len(texts)-lru_hits-store_hits
+        with self._lock:
+            self.lru_hits+=lru_hits
+            self.store_hits+=store_hits
+            self.misses+=misses
+        metrics.incr("embedding_cache.lru_hits", lru_hits)
+        metrics.incr("embedding_cache.store_hits", store_hits)
+        metrics.incr("embedding_cache.misses", misses)
+        return results
+
+    def put_many(self, task_type: str, texts: List[str], vectors: List[List[float]])->None:
+        items={}
+        for text, vector in zip(texts, vectors):
+            if not vector:
+                continue
+            key=self.key(task_type, text)
+            items[key]=vector
+            self._lru_put(key, vector)
+        if self.store is not None:
+            try:
+                self.store.put_many(items)
+            except Exception as e:
+                print(f"Error writing persistent embedding cache: {e}")
+
+    def stats(self)->Dict[str, float]:
+        with self._lock:
+            lookups=self.lru_hits+self.store_hits+self.misses
+            return {
+                "lru_size": len(self._lru),
+                "lru_hits": self.lru_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "hit_rate": (self.lru_hits+self.store_hits)/lookups if lookups else 0.0,
+            }
+
+
+def normalize_query(text: str)->str:
+    """Case-folds a query and collapses runs of whitespace, so trivially different retries share an entry."""
+    return " ".join(text.split()).casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, TTL-aware LRU of query embeddings keyed by the normalized query text.
+    Shared by every caller of embed_query (chat, chat/once and timestamp retrieval).
+    """
+
+    def __init__(self, max_size: int=2048, ttl_seconds: float=3600):
+        self.max_size=max_size
+        self.ttl_seconds=ttl_seconds
+        self._entries: "OrderedDict[str, tuple]"=OrderedDict()
+        self._lock=threading.Lock()
+        self.hits=0
+        self.misses=0
+        metrics.register_gauge("query_embedding_cache", self.stats)
+
+    def get(self, normalized_query: str)->Optional[List[float]]:
+        with self._lock:
+            entry=self._entries.get(normalized_query)
+            if entry is not None and entry[0]>time.monotonic():
+                self._entries.move_to_end(normalized_query)
+                self.hits+=1
+                metrics.incr("query_embedding_cache.hits")
+                return entry[1]
+            if entry is not None:
+                del self._entries[normalized_query]
+            self.misses+=1
+            metrics.incr("query_embedding_cache.misses")
+            return None
+
+    def put(self, normalized_query: str, vector: List[float])->None:
+        with self._lock:
+            self._entries[normalized_query]=(time.monotonic()+self.ttl_seconds, vector)
+            self._entries.move_to_end(normalized_query)
+            while len(self._entries)>self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self)->Dict[str, float]:
+        with self._lock:
+            lookups=self.hits+self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+            }
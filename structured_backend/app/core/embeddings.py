@@ -1,8 +1,17 @@
+import asyncio
+import time
 import traceback
 import vertexai
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.embeddings import Embeddings
-from typing import List
+from typing import List, Optional
 from vertexai.language_models import TextEmbeddingModel, TextEmbeddingInput
+from app.core.embedding_cache import EmbeddingCache, QueryEmbeddingCache, normalize_query
+
+# Some models only accept a single input per get_embeddings call, whatever batch size is configured.
+MAX_INPUTS_PER_REQUEST={
+    "gemini-embedding-001": 1,
+}
 
 class VertexAIEmbeddingsNative(Embeddings):
     """
@@ -10,9 +19,28 @@ class VertexAIEmbeddingsNative(Embeddings):
     This class handles the logic for interacting with the Vertex AI embedding model.
     """
 
-    def __init__(self, model_name: str="gemini-embedding-001"):
+    def __init__(
+            self,
+            model_name: str="gemini-embedding-001",
+            batch_size: int=250,
+            max_batch_tokens: int=20000,
+            max_concurrency: int=8,
+            max_retries: int=3,
+            retry_backoff_seconds: float=1.0,
+            cache: Optional[EmbeddingCache]=None,
+            query_cache: Optional[QueryEmbeddingCache]=None
+    ):
         self.model_name=model_name
+        self.batch_size=max(1, min(batch_size, MAX_INPUTS_PER_REQUEST.get(model_name, batch_size)))
+        self.max_batch_tokens=max_batch_tokens
+        self.max_concurrency=max(1, max_concurrency)
+        self.max_retries=max_retries
+        self.retry_backoff_seconds=retry_backoff_seconds
+        self.cache=cache
+        self.query_cache=query_cache
         self.client=None
+        self._async_semaphore=None
+        self._async_semaphore_loop=None
 
         try:
             self.client = TextEmbeddingModel.from_pretrained(self.model_name)
@@ -21,26 +49,166 @@ class VertexAIEmbeddingsNative(Embeddings):
             traceback.print_exc()
             raise ValueError(f"Failed to load native Vertex AI embedding model {self.model_name} : {e}")
 
-    def embed_documents(self, texts: list[str])->list[list[float]]:
-        """Embeds a list of texts one by one"""
-        embeddings_list=[]
+    @staticmethod
+    def _estimate_tokens(text: str)->int:
+        """Rough token estimate (~4 characters per token), good enough for request budgeting."""
+        return len(text)//4+1
+
+    def _make_batches(self, texts: List[str])->List[List[int]]:
+        """
+        Groups text indices into batches that respect both the batch size and the token budget.
+        A single text larger than the budget still gets a batch of its own.
+        """
+        batches=[]
+        current=[]
+        current_tokens=0
         for i, text in enumerate(texts):
+            tokens=self._estimate_tokens(text)
+            if current and (len(current)>=self.batch_size or current_tokens+tokens>self.max_batch_tokens):
+                batches.append(current)
+                current=[]
+                current_tokens=0
+            current.append(i)
+            current_tokens+=tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, texts: List[str], task_type: str)->List[List[float]]:
+        """Embeds one batch in a single request, retrying with exponential backoff on failure."""
+        if self.client is None:
+            raise RuntimeError("TextEmbeddingModel client is not initialized.")
+        inputs=[TextEmbeddingInput(text, task_type=task_type) for text in texts]
+        for attempt in range(self.max_retries+1):
             try:
-                if self.client is None:
-                    raise RuntimeError("TextEmbeddingModel client is not initialized.")
-                input_obj=TextEmbeddingInput(text, task_type="RETRIEVAL_DOCUMENT")
-                response=self.client.get_embeddings([input_obj])
-                embeddings_list.append(list(response[0].values))
+                response=self.client.get_embeddings(inputs)
+                return [list(embedding.values) for embedding in response]
             except Exception as e:
-                print(f"Error embedding document {i+1}/{len(texts)}: {text[:50]}... : {e}")
-                embeddings_list.append([])
+                if attempt==self.max_retries:
+                    raise RuntimeError(f"Failed to embed batch of {len(texts)} texts after {attempt+1} attempts: {e}") from e
+                delay=self.retry_backoff_seconds*(2**attempt)
+                print(f"Error embedding batch of {len(texts)} texts (attempt {attempt+1}/{self.max_retries+1}): {e}. Retrying in {delay:.1f}s")
+                time.sleep(delay)
+        return []
+
+    def _embed_texts(self, texts: List[str], task_type: str)->List[List[float]]:
+        """
+        Embeds texts without consulting the cache. Texts are packed into batches
+        and up to max_concurrency batches are in flight at once.
+        """
+        if not texts:
+            return []
+        batches=self._make_batches(texts)
+        embeddings_list: List[List[float]]=[[] for _ in texts]
+
+        def run(batch: List[int])->None:
+            vectors=self._embed_batch([texts[i] for i in batch], task_type=task_type)
+            for i, vector in zip(batch, vectors):
+                embeddings_list[i]=vector
+
+        if len(batches)==1:
+            run(batches[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                # list() re-raises the first batch that failed after all of its retries.
+                list(executor.map(run, batches))
         return embeddings_list
 
+    def _embed_with_cache(self, texts: List[str], task_type: str)->List[List[float]]:
+        """Serves what it can from the cache and embeds only the remaining texts, once per distinct text."""
+        if self.cache is None:
+            return self._embed_texts(texts, task_type)
+        results=self.cache.get_many(task_type, texts)
+        missing=list(dict.fromkeys(text for text, vector in zip(texts, results) if vector is None))
+        if missing:
+            vectors=self._embed_texts(missing, task_type)
+            self.cache.put_many(task_type, missing, vectors)
+            computed=dict(zip(missing, vectors))
+            results=[vector if vector is not None else computed[text] for text, vector in zip(texts, results)]
+        return results
+
+    def embed_documents(self, texts: list[str])->list[list[float]]:
+        """Embeds a list of texts, reusing cached vectors where available."""
+        return self._embed_with_cache(texts, task_type="RETRIEVAL_DOCUMENT")
+
     def embed_query(self, text: str) -> List[float]:
-        """Embeds a single query text."""
+        """
+        Embeds a single query text. With a query cache configured, repeated questions skip the
+        embedding request entirely; the normalized query is only the cache key, the original text is embedded.
+        """
+        if self.query_cache is None:
+            return self._embed_with_cache([text], task_type="RETRIEVAL_QUERY")[0]
+        normalized=normalize_query(text)
+        vector=self.query_cache.get(normalized)
+        if vector is None:
+            vector=self._embed_with_cache([text], task_type="RETRIEVAL_QUERY")[0]
+            self.query_cache.put(normalized, vector)
+        return vector
+
+    def _get_async_semaphore(self)->asyncio.Semaphore:
+        """Returns the semaphore bounding in-flight async requests, bound to the running event loop."""
+        loop=asyncio.get_running_loop()
+        if self._async_semaphore is None or self._async_semaphore_loop is not loop:
+            self._async_semaphore=asyncio.Semaphore(self.max_concurrency)
+            self._async_semaphore_loop=loop
+        return self._async_semaphore
+
+    async def _aembed_batch(self, texts: List[str], task_type: str)->List[List[float]]:
+        """Async counterpart of _embed_batch; holds a concurrency slot only while a request is in flight."""
         if self.client is None:
             raise RuntimeError("TextEmbeddingModel client is not initialized.")
-        input_obj=TextEmbeddingInput(text, task_type="RETRIEVAL_QUERY")
-        embeddings=self.client.get_embeddings([input_obj])
-        return list(embeddings[0].values)
+        inputs=[TextEmbeddingInput(text, task_type=task_type) for text in texts]
+        semaphore=self._get_async_semaphore()
+        for attempt in range(self.max_retries+1):
+            try:
+                async with semaphore:
+                    response=await self.client.get_embeddings_async(inputs)
+                return [list(embedding.values) for embedding in response]
+            except Exception as e:
+                if attempt==self.max_retries:
+                    raise RuntimeError(f"Failed to embed batch of {len(texts)} texts after {attempt+1} attempts: {e}") from e
+                delay=self.retry_backoff_seconds*(2**attempt)
+                print(f"Error embedding batch of {len(texts)} texts (attempt {attempt+1}/{self.max_retries+1}): {e}. Retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        return []
+
+    async def _aembed_texts(self, texts: List[str], task_type: str)->List[List[float]]:
+        if not texts:
+            return []
+        batches=self._make_batches(texts)
+        results=await asyncio.gather(
+            *(self._aembed_batch([texts[i] for i in batch], task_type=task_type) for batch in batches)
+        )
+        embeddings_list: List[List[float]]=[[] for _ in texts]
+        for batch, vectors in zip(batches, results):
+            for i, vector in zip(batch, vectors):
+                embeddings_list[i]=vector
+        return embeddings_list
+
+    async def _aembed_with_cache(self, texts: List[str], task_type: str)->List[List[float]]:
+        if self.cache is None:
+            return await self._aembed_texts(texts, task_type)
+        # The persistent tier does blocking I/O, so keep it off the event loop.
+        results=await asyncio.to_thread(self.cache.get_many, task_type, texts)
+        missing=list(dict.fromkeys(text for text, vector in zip(texts, results) if vector is None))
+        if missing:
+            vectors=await self._aembed_texts(missing, task_type)
+            await asyncio.to_thread(self.cache.put_many, task_type, missing, vectors)
+            computed=dict(zip(missing, vectors))
+            results=[vector if vector is not None else computed[text] for text, vector in zip(texts, results)]
+        return results
+
+    async def aembed_documents(self, texts: list[str])->list[list[float]]:
+        """Async version of embed_documents using the SDK's native async client."""
+        return await self._aembed_with_cache(texts, task_type="RETRIEVAL_DOCUMENT")
 
+    async def aembed_query(self, text: str)->List[float]:
+        """Async version of embed_query using the SDK's native async client."""
+        if self.query_cache is None:
+            return (await self._aembed_with_cache([text], task_type="RETRIEVAL_QUERY"))[0]
+        normalized=normalize_query(text)
+        vector=self.query_cache.get(normalized)
+        if vector is None:
+            vector=(await self._aembed_with_cache([text], task_type="RETRIEVAL_QUERY"))[0]
+            self.query_cache.put(normalized, vector)
+        return vector
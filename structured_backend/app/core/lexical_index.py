@@ -0,0 +1,167 @@
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bson.binary import Binary
+from pymongo.collection import Collection
+
+from app.core.metrics import metrics
+
+# Keeps identifiers (snake_case, dotted.names, kebab-case) and numbers such as 3.14 as single tokens.
+TOKEN_PATTERN=re.compile(r"\w+(?:[.\-']\w+)*")
+
+STOPWORDS=frozenset(
+    "a an and are as at be but by do does for from has have how i if in is it its of on or so that the "
+    "their them then there these they this to was we were what when where which who why will with you your".split()
+)
+
+def tokenize(text: str)->List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over one video's chunks. Postings map each term to
+    (chunk position, term frequency) pairs; chunk_ids[position] is the stored chunk _id.
+    """
+
+    def __init__(self, chunk_ids: List[str], lengths: List[int], postings: Dict[str, List[Tuple[int, int]]], k1: float=1.5, b: float=0.75):
+        self.chunk_ids=chunk_ids
+        self.lengths=lengths
+        self.postings=postings
+        self.k1=k1
+        self.b=b
+        self.avg_length=sum(lengths)/len(lengths) if lengths else 0.0
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Tuple[str, str]])->"BM25Index":
+        """Builds the index from (chunk_id, text) pairs."""
+        chunk_ids: List[str]=[]
+        lengths: List[int]=[]
+        postings: Dict[str, List[Tuple[int, int]]]={}
+        for position, (chunk_id, text) in enumerate(chunks):
+            tokens=tokenize(text)
+            chunk_ids.append(chunk_id)
+            lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                postings.setdefault(term, []).append((position, count))
+        return cls(chunk_ids, lengths, postings)
+
+    def search(self, query: str, k: int)->List[Tuple[str, float]]:
+        """Returns up to k (chunk_id, score) pairs, best first; chunks sharing no term with the query are left out."""
+        n=len(self.chunk_ids)
+        scores: Dict[int, float]={}
+        for term in set(tokenize(query)):
+            postings=self.postings.get(term)
+            if not postings:
+                continue
+            idf=math.log(1.0+(n-len(postings)+0.5)/(len(postings)+0.5))
+            for position, tf in postings:
+                norm=self.k1*(1.0-self.b+self.b*self.lengths[position]/(self.avg_length or 1.0))
+                scores[position]=scores.get(position, 0.0)+idf*tf*(self.k1+1.0)/(tf+norm)
+        best=sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [(self.chunk_ids[position], score) for position, score in best]
+
+    def to_bytes(self)->bytes:
+        # Terms can contain "." and so cannot be Mongo field names; the index is stored as one compressed blob.
+        payload={"chunk_ids": self.chunk_ids, "lengths": self.lengths, "postings": self.postings}
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes)->"BM25Index":
+        payload=json.loads(zlib.decompress(data).decode("utf-8"))
+        postings={term: [tuple(pair) for pair in pairs] for term, pairs in payload["postings"].items()}
+        return cls(payload["chunk_ids"], payload["lengths"], postings)
+
+
+class LexicalIndexStore:
+    """
+    Keeps per-video BM25 indexes in an in-process LRU of max_videos entries and, when a collection
+    is given, persists them in MongoDB so other processes and restarts do not rebuild them.
+    In-process entries expire after ttl_seconds, so indexes rebuilt by another process (such as an
+    out-of-process ingest worker) are picked up. A persisted index is only used while its chunk_count
+    still matches the video's stored chunks. Each invalidation bumps the video's generation, and an
+    index built under an older generation is not kept.
+    """
+
+    def __init__(self, collection: Optional[Collection]=None, max_videos: int=256, ttl_seconds: float=600):
+        self.collection=collection
+        self.max_videos=max_videos
+        self.ttl_seconds=ttl_seconds
+        self._indexes: "OrderedDict[str, Tuple[float, BM25Index]]"=OrderedDict()
+        self._generations: Dict[str, int]={}
+        self._lock=threading.Lock()
+        metrics.register_gauge("lexical_index", lambda: {"videos": len(self._indexes), "max_videos": self.max_videos})
+
+    def generation(self, video_id: str)->int:
+        """Read before building a video's index and pass to put."""
+        with self._lock:
+            return self._generations.get(video_id, 0)
+
+    def _remember(self, video_id: str, index: BM25Index, generation: int)->bool:
+        with self._lock:
+            if generation!=self._generations.get(video_id, 0):
+                return False
+            self._indexes[video_id]=(time.monotonic()+self.ttl_seconds, index)
+            self._indexes.move_to_end(video_id)
+            while len(self._indexes)>self.max_videos:
+                self._indexes.popitem(last=False)
+            return True
+
+    def get(self, video_id: str, count_chunks: Optional[Callable[[], int]]=None)->Optional[BM25Index]:
+        """
+        Returns the video's index from memory or, failing that, from the collection. count_chunks gives the
+        number of chunks currently stored for the video; a persisted index with another chunk_count is ignored.
+        """
+        generation=self.generation(video_id)
+        with self._lock:
+            entry=self._indexes.get(video_id)
+            if entry is not None and entry[0]>time.monotonic():
+                self._indexes.move_to_end(video_id)
+                return entry[1]
+            if entry is not None:
+                del self._indexes[video_id]
+        if self.collection is None:
+            return None
+        doc=self.collection.find_one({"_id": video_id}, {"data": 1, "chunk_count": 1})
+        if doc is None or (count_chunks is not None and doc.get("chunk_count")!=count_chunks()):
+            return None
+        index=BM25Index.from_bytes(doc["data"])
+        self._remember(video_id, index, generation)
+        return index
+
+    def put(self, video_id: str, index: BM25Index, generation: int, persist: bool=True)->None:
+        """
+        Keeps the index in memory and, with persist, in the collection. Only indexes built from a video's
+        complete chunk set should be persisted; indexes built while the video is still embedding stay local.
+        """
+        if not self._remember(video_id, index, generation):
+            return
+        if persist and self.collection is not None:
+            self.collection.replace_one(
+                {"_id": video_id},
+                {"_id": video_id, "data": Binary(index.to_bytes()), "chunk_count": len(index.chunk_ids), "updated_at": datetime.utcnow()},
+                upsert=True
+            )
+
+    def invalidate(self, video_id: str)->None:
+        with self._lock:
+            self._generations[video_id]=self._generations.get(video_id, 0)+1
+            self._indexes.pop(video_id, None)
+        if self.collection is not None:
+            self.collection.delete_one({"_id": video_id})
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int=60)->List[Tuple[str, float]]:
+    """Fuses ranked id lists: each id scores sum(1/(k+rank)) over the lists it appears in, rank starting at 1."""
+    scores: Dict[str, float]={}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item]=scores.get(item, 0.0)+1.0/(k+rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry.
+    Holds named counters, timing summaries and gauge callbacks, and renders them for the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock=threading.Lock()
+        self._counters: Dict[str, float]={}
+        self._timings: Dict[str, Dict[str, float]]={}
+        self._gauges: Dict[str, Callable[[], Any]]={}
+
+    def incr(self, name: str, value: float=1)->None:
+        with self._lock:
+            self._counters[name]=self._counters.get(name, 0)+value
+
+    def observe(self, name: str, seconds: float)->None:
+        """Records one duration (in seconds) under the given timing name."""
+        with self._lock:
+            timing=self._timings.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0})
+            timing["count"]+=1
+            timing["total_seconds"]+=seconds
+            timing["max_seconds"]=max(timing["max_seconds"], seconds)
+            timing["last_seconds"]=seconds
+
+    @contextmanager
+    def timer(self, name: str):
+        """Context manager that observes the wall time of its body."""
+        start=time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter()-start)
+
+    def register_gauge(self, name: str, fn: Callable[[], Any])->None:
+        """Registers a callback whose value is read every time a snapshot is taken."""
+        with self._lock:
+            self._gauges[name]=fn
+
+    def snapshot(self)->Dict[str, Any]:
+        with self._lock:
+            counters=dict(self._counters)
+            timings={
+                name: {**timing, "avg_seconds": timing["total_seconds"]/timing["count"] if timing["count"] else 0.0}
+                for name, timing in self._timings.items()
+            }
+            gauges=dict(self._gauges)
+        gauge_values={}
+        for name, fn in gauges.items():
+            try:
+                gauge_values[name]=fn()
+            except Exception as e:
+                gauge_values[name]=f"error: {e}"
+        return {"counters": counters, "timings": timings, "gauges": gauge_values}
+
+
+metrics=Metrics()
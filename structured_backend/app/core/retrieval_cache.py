@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.embedding_cache import normalize_query
+from app.core.metrics import metrics
+
+RetrievalKey=Tuple[str, str, int, str, int]
+
+
+class RetrievalCache:
+    """
+    TTL'd LRU of search results keyed by (video_id, normalized query, k, retrieval mode). Queries are
+    normalized like the query embedding cache does, so both caches treat the same questions as equal.
+    Entries hold the ranked (chunk_id, score) pairs only, not the chunk texts. Keys are also
+    indexed by video, so re-ingesting a video drops all of its entries at once.
+    Keys also carry the video's generation, which every invalidation bumps: a search that started
+    before an invalidation builds its key under the old generation, and put() drops its result.
+    """
+
+    def __init__(self, max_entries: int=4096, ttl_seconds: float=900):
+        self.max_entries=max_entries
+        self.ttl_seconds=ttl_seconds
+        self._entries: "OrderedDict[RetrievalKey, Tuple[float, List[Tuple[str, float]]]]"=OrderedDict()
+        self._keys_by_video: Dict[str, Set[RetrievalKey]]={}
+        self._generations: Dict[str, int]={}
+        self._lock=threading.Lock()
+        self.hits=0
+        self.misses=0
+        metrics.register_gauge("retrieval_cache", self.stats)
+
+    def key(self, video_id: str, query: str, k: int, mode: str)->RetrievalKey:
+        """Builds the key before searching, so it records the generation the search started under."""
+        with self._lock:
+            generation=self._generations.get(video_id, 0)
+        return (video_id, normalize_query(query), k, mode, generation)
+
+    def get(self, key: RetrievalKey)->Optional[List[Tuple[str, float]]]:
+        with self._lock:
+            entry=self._entries.get(key)
+            if entry is not None and entry[0]>time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits+=1
+                metrics.incr("retrieval_cache.hits")
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses+=1
+            metrics.incr("retrieval_cache.misses")
+            return None
+
+    def put(self, key: RetrievalKey, results: List[Tuple[str, float]])->None:
+        with self._lock:
+            if key[4]!=self._generations.get(key[0], 0):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key]=(time.monotonic()+self.ttl_seconds, results)
+            self._keys_by_video.setdefault(key[0], set()).add(key)
+            while len(self._entries)>self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: RetrievalKey)->None:
+        del self._entries[key]
+        video_keys=self._keys_by_video.get(key[0])
+        if video_keys is not None:
+            video_keys.discard(key)
+            if not video_keys:
+                del self._keys_by_video[key[0]]
+
+    def invalidate(self, video_id: str)->None:
+        with self._lock:
+            self._generations[video_id]=self._generations.get(video_id, 0)+1
+            for key in list(self._keys_by_video.get(video_id, ())):
+                self._remove(key)
+
+    def stats(self)->Dict[str, float]:
+        with self._lock:
+            lookups=self.hits+self.misses
+            return {
+                "entries": len(self._entries),
+                "videos": len(self._keys_by_video),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+            }
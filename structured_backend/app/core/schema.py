@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, Field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 from bson import ObjectId
 
@@ -63,9 +63,14 @@ class ChatSessionSummaryForEndpoint(BaseModel):
 class VideoSubmission(BaseModel):
     url: HttpUrl
 
+class BulkVideoSubmission(BaseModel):
+    """YouTube URLs or bare video ids to ingest in one request."""
+    items: List[str]
+
 class ChatQuery(BaseModel):
     query: str
     video_id: Optional[str] = None # Optional: if you want to limit search to a specific video
+    use_cache: bool = True # set to False to always generate a fresh answer
 
 class ChatSessionCreation(BaseModel):
     video_id: Optional[str] = None # Optional: if starting a chat specific to a video
@@ -80,6 +85,7 @@ class ChatQueryWithSession(BaseModel):
 class TimestampQuery(BaseModel):
     query: str
     video_id: str # Video ID is mandatory for timestamp queries
+    use_cache: bool = True # set to False to always search the transcript again
 
 # main.py (add these to your existing Pydantic models)
 
@@ -143,7 +149,9 @@ class VideoDBEntry(BaseModel):
     submitted_at: datetime
     transcript: List[TranscriptEntry]
     transcript_text: str
-    description: VideoDescription
+    description: Optional[VideoDescription] = None
+    description_status: str = "ready" # "ready", or "pending" while a failed generation waits for its retry
+    embedding_status: str = "ready" # "running" while chunks are still embedding after the description was stored
     updated_at: datetime
 
     model_config = {
@@ -190,6 +198,29 @@ class NotebookDBEntry(BaseModel):
         }
     }
 
+class JobDBEntry(BaseModel):
+    """
+    Pydantic schema for a background job (e.g. a video ingest) in the job queue.
+    status is one of queued, running, done or failed; stage and progress describe how far a running job got.
+    """
+    job_id: str
+    job_type: str
+    payload: Dict[str, Any]
+    dedupe_key: Optional[str] = None # at most one queued/running job per (job_type, dedupe_key) is created from one API process
+    status: str = "queued"
+    stage: Optional[str] = None
+    progress: float = 0.0
+    detail: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    not_before: Optional[datetime] = None # a queued job is not claimed before this time (used for retries)
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class VideoEmbeddingDBEntry(BaseModel):
     pass
 
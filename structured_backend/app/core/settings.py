@@ -23,6 +23,71 @@ class Settings(BaseSettings):
     EMBEDDINGS_MODEL_NAME: Optional[str] = None
     TIMESTAMP_LLM_MODEL: Optional[str] = None
     TIMESTAMP_TEMPERATURE: Optional[str] = None
+    EMBEDDINGS_BATCH_SIZE: int = 250
+    EMBEDDINGS_MAX_BATCH_TOKENS: int = 20000
+    EMBEDDINGS_MAX_CONCURRENCY: int = 8
+    EMBEDDINGS_MAX_RETRIES: int = 3
+    EMBEDDINGS_DIMENSION: int = 3072
+    EMBEDDING_CACHE_BACKEND: str = "mongo" # "mongo", "sqlite" or "memory"
+    EMBEDDING_CACHE_COLLECTION: str = "embedding_cache"
+    EMBEDDING_CACHE_SQLITE_PATH: str = ".cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_LRU_SIZE: int = 20000
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+    VECTOR_MATRIX_CACHE_ENABLED: bool = True # single-video searches run in-process on cached chunk matrices
+    VECTOR_MATRIX_CACHE_MAX_MB: int = 256
+    VECTOR_MATRIX_CACHE_TTL_SECONDS: int = 600
+    RETRIEVAL_MODE: str = "hybrid" # "vector", "bm25" or "hybrid" (BM25 + vector fused with reciprocal rank fusion)
+    RETRIEVAL_RRF_K: int = 60
+    RETRIEVAL_FUSION_CANDIDATES: int = 20
+    RAG_RETRIEVAL_TIMEOUT_SECONDS: float = 10.0
+    RETRIEVAL_QUERY_TIMEOUT_SECONDS: float = 5.0 # per search leg, sent to Mongo as maxTimeMS
+    RETRIEVAL_EMBED_TIMEOUT_SECONDS: float = 5.0
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_SIZE: int = 4096
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 900
+    ANSWER_CACHE_ENABLED: bool = True # semantic cache for /chat/once answers and timestamp queries
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES_PER_VIDEO: int = 256
+    ANSWER_CACHE_MAX_VIDEOS: int = 1024
+    LEXICAL_INDEX_BACKEND: str = "mongo" # "mongo" or "memory"
+    LEXICAL_INDEX_COLLECTION: str = "lexical_indexes"
+    LEXICAL_INDEX_MAX_VIDEOS: int = 256
+    LEXICAL_INDEX_TTL_SECONDS: int = 600
+    WARMUP_ON_STARTUP: bool = True
+    CHUNK_SIZE: int = 1000
+    CHUNK_OVERLAP: int = 200
+    INGEST_BATCH_SIZE: int = 32
+    INGEST_QUEUE_SIZE: int = 4
+    JOB_QUEUE_BACKEND: str = "mongo" # "mongo" or "memory"
+    JOB_WORKERS: int = 2
+    RUN_JOB_WORKERS_IN_APP: bool = True # set to False when workers run as `python -m app.worker`
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_STALE_AFTER_SECONDS: int = 900
+    DESCRIPTION_RETRY_DELAY_SECONDS: int = 60
+    DESCRIPTION_RETRY_MAX_ATTEMPTS: int = 5
+    INGEST_LEASE_TTL_SECONDS: int = 120
+    INGEST_RETRY_MAX_ATTEMPTS: int = 3 # retries resume from the chunks already stored
+    INGEST_RETRY_DELAY_SECONDS: int = 30
+    INGEST_TRANSCRIPT_CONCURRENCY: int = 4
+    INGEST_LLM_CONCURRENCY: int = 2
+    INGEST_EMBEDDING_CONCURRENCY: int = 2
+    BULK_INGEST_MAX_IN_FLIGHT: int = 8
+    DESCRIPTION_MAP_REDUCE_THRESHOLD_CHARS: int = 60000
+    DESCRIPTION_MAP_WINDOW_CHARS: int = 20000
+    DESCRIPTION_MAP_CONCURRENCY: int = 4
+    DESCRIPTION_MODE: str = "full" # "full" or "budgeted"
+    DESCRIPTION_TOKEN_BUDGET: int = 4000
+    TRANSCRIPT_CACHE_BACKEND: str = "file" # "file", "mongo" or "none"
+    TRANSCRIPT_CACHE_DIR: str = ".cache/transcripts"
+    TRANSCRIPT_CACHE_COLLECTION: str = "transcript_cache"
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 30*24*3600
+    TRANSCRIPT_CACHE_NEGATIVE_TTL_SECONDS: int = 6*3600
+    # "legacy" stays the default while backend/main.py reads the same videos collection: its /transcript and
+    # /video_details endpoints only understand transcript + transcript_text. Switch to "compact" once it is retired.
+    TRANSCRIPT_STORAGE_FORMAT: str = "legacy" # "compact" or "legacy"
+    TRANSCRIPT_COMPRESSION: str = "zlib" # "zlib", "zstd" (needs the zstandard package) or "none"
 
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from app.core.metrics import metrics
+
+
+class KeyedLock:
+    """Map of asyncio locks keyed by string; a key's lock is dropped once nobody holds or waits for it."""
+
+    def __init__(self):
+        self._locks: Dict[str, List[Any]]={}
+
+    @asynccontextmanager
+    async def lock(self, key: str):
+        entry=self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1]+=1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1]-=1
+            if entry[1]==0:
+                self._locks.pop(key, None)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the function and
+    every caller that arrives while it is in flight awaits the same result (or exception).
+    """
+
+    def __init__(self, name: str):
+        self.name=name
+        self._inflight: Dict[str, asyncio.Future]={}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]])->Tuple[Any, bool]:
+        """Returns (result, shared), where shared is True when the result came from another caller's run."""
+        future=self._inflight.get(key)
+        if future is not None:
+            metrics.incr(f"single_flight.{self.name}.coalesced")
+            return await asyncio.shield(future), True
+
+        future=asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even if no latecomer ever awaits it.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key]=future
+        try:
+            result=await fn()
+            future.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
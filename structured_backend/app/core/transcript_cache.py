@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import re
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson.binary import Binary
+from pymongo.collection import Collection
+
+from app.core.metrics import metrics
+
+VIDEO_ID_PATTERN=re.compile(r"^[A-Za-z0-9_-]{11}$")
+# Cache keys become file names, so they may only contain characters that cannot form a path.
+KEY_PATTERN=re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _encode(entry: Dict[str, Any])->bytes:
+    return zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"), 6)
+
+def _decode(data: bytes)->Dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class FileTranscriptStore:
+    """Stores one zlib-compressed JSON file per cache key under a local directory."""
+
+    def __init__(self, directory: str):
+        self.directory=directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str)->str:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid transcript cache key: {key!r}")
+        return os.path.join(self.directory, f"{key}.json.z")
+
+    def get(self, key: str)->Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return _decode(f.read())
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any])->None:
+        # Write to a temp file first so concurrent readers never see a partial entry.
+        path=self._path(key)
+        tmp_path=f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_encode(entry))
+        os.replace(tmp_path, path)
+
+
+class MongoTranscriptStore:
+    """Stores compressed cache entries in a MongoDB collection; a TTL index removes expired ones."""
+
+    def __init__(self, collection: Collection):
+        self.collection=collection
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def get(self, key: str)->Optional[Dict[str, Any]]:
+        doc=self.collection.find_one({"_id": key}, {"data": 1})
+        return _decode(doc["data"]) if doc else None
+
+    def put(self, key: str, entry: Dict[str, Any])->None:
+        self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "data": Binary(_encode(entry)), "expires_at": datetime.utcnow()+timedelta(seconds=entry["expires_at"]-time.time())},
+            upsert=True
+        )
+
+
+class TranscriptCache:
+    """
+    Caches transcript fetches keyed by (video_id, language preference list).
+    Successful fetches are kept for ttl_seconds. "No transcript" outcomes are kept as negative
+    entries for negative_ttl_seconds, so they are not retried against YouTube on every request.
+    """
+
+    def __init__(self, store, ttl_seconds: float=30*24*3600, negative_ttl_seconds: float=6*3600):
+        self.store=store
+        self.ttl_seconds=ttl_seconds
+        self.negative_ttl_seconds=negative_ttl_seconds
+
+    @staticmethod
+    def key(video_id: str, languages: List[str])->str:
+        if not VIDEO_ID_PATTERN.match(video_id):
+            raise ValueError(f"Invalid YouTube video id: {video_id!r}")
+        digest=hashlib.sha256(",".join(languages).encode("utf-8")).hexdigest()[:16]
+        return f"{video_id}-{digest}"
+
+    def get(self, video_id: str, languages: List[str])->Optional[Dict[str, Any]]:
+        """
+        Returns {"transcript": [...]} for a cached transcript, {"error": "..."} for a cached
+        negative result, or None when the video has to be fetched.
+        """
+        try:
+            entry=self.store.get(self.key(video_id, languages))
+        except Exception as e:
+            print(f"Error reading transcript cache for video_id:{video_id}: {e}")
+            entry=None
+        if entry is None or entry["expires_at"]<=time.time():
+            metrics.incr("transcript_cache.misses")
+            return None
+        metrics.incr("transcript_cache.negative_hits" if "error" in entry else "transcript_cache.hits")
+        return entry
+
+    def _put(self, video_id: str, languages: List[str], entry: Dict[str, Any])->None:
+        try:
+            self.store.put(self.key(video_id, languages), entry)
+        except Exception as e:
+            print(f"Error writing transcript cache for video_id:{video_id}: {e}")
+
+    def put(self, video_id: str, languages: List[str], transcript: List[Dict[str, Any]])->None:
+        self._put(video_id, languages, {"transcript": transcript, "expires_at": time.time()+self.ttl_seconds})
+
+    def put_negative(self, video_id: str, languages: List[str], error: str)->None:
+        self._put(video_id, languages, {"error": error, "expires_at": time.time()+self.negative_ttl_seconds})
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.core.metrics import metrics
+
+
+class VideoMatrix:
+    """One video's chunks: a contiguous float32 matrix of L2-normalized embeddings plus the texts and metadata."""
+
+    def __init__(self, texts: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]], expires_at: float):
+        matrix=np.asarray(embeddings, dtype=np.float32)
+        matrix/=np.linalg.norm(matrix, axis=1, keepdims=True)+1e-12
+        self.matrix=np.ascontiguousarray(matrix)
+        self.texts=texts
+        self.metadatas=metadatas
+        self.expires_at=expires_at
+        self._positions: Optional[Dict[str, int]]=None
+
+    @property
+    def nbytes(self)->int:
+        # The matrix dominates; texts and metadata are approximated by the text length.
+        return self.matrix.nbytes+sum(len(text) for text in self.texts)
+
+    def _document(self, i: int)->Document:
+        return Document(page_content=self.texts[i], metadata=dict(self.metadatas[i]), id=self.metadatas[i].get("_id"))
+
+    def documents_by_id(self, chunk_ids: List[str])->Dict[str, Document]:
+        """Returns the documents of the given chunk ids that this matrix holds."""
+        if self._positions is None:
+            self._positions={metadata.get("_id"): i for i, metadata in enumerate(self.metadatas)}
+        return {chunk_id: self._document(self._positions[chunk_id]) for chunk_id in chunk_ids if chunk_id in self._positions}
+
+    def search(self, query_vector: List[float], k: int)->List[Tuple[Document, float]]:
+        """Scores every chunk with one matrix-vector product and returns the top k by cosine similarity."""
+        query=np.asarray(query_vector, dtype=np.float32)
+        query/=np.linalg.norm(query)+1e-12
+        scores=self.matrix@query
+        if k<len(scores):
+            top=np.argpartition(-scores, k-1)[:k]
+            top=top[np.argsort(-scores[top])]
+        else:
+            top=np.argsort(-scores)
+        # Same score scale as Atlas $vectorSearch with the cosine similarity function.
+        return [
+            (self._document(i), float((1.0+scores[i])/2.0))
+            for i in top
+        ]
+
+
+class VectorMatrixCache:
+    """
+    LRU of per-video embedding matrices bounded by a memory budget. Used by VectorRepository to
+    answer single-video searches in-process instead of through $vectorSearch. Entries expire after
+    ttl_seconds, so chunks re-ingested by another process are picked up; this process invalidates
+    a video itself whenever it writes that video's chunks. Each invalidation bumps the video's
+    generation, and a matrix loaded under an older generation is not cached, so a load that raced
+    with a write cannot put stale chunks back.
+    """
+
+    def __init__(self, max_bytes: int=256*1024*1024, ttl_seconds: float=600):
+        self.max_bytes=max_bytes
+        self.ttl_seconds=ttl_seconds
+        self._entries: "OrderedDict[str, VideoMatrix]"=OrderedDict()
+        self._bytes=0
+        self._generations: Dict[str, int]={}
+        self._lock=threading.Lock()
+        self.hits=0
+        self.misses=0
+        self.evictions=0
+        metrics.register_gauge("vector_matrix_cache", self.stats)
+
+    def get(self, video_id: str)->Optional[VideoMatrix]:
+        with self._lock:
+            entry=self._entries.get(video_id)
+            if entry is not None and entry.expires_at>time.monotonic():
+                self._entries.move_to_end(video_id)
+                self.hits+=1
+                metrics.incr("vector_matrix_cache.hits")
+                return entry
+            if entry is not None:
+                self._remove(video_id)
+            self.misses+=1
+            metrics.incr("vector_matrix_cache.misses")
+            return None
+
+    def generation(self, video_id: str)->int:
+        """Read before loading a video's chunks and pass to put."""
+        with self._lock:
+            return self._generations.get(video_id, 0)
+
+    def put(
+            self,
+            video_id: str,
+            texts: List[str],
+            metadatas: List[Dict[str, Any]],
+            embeddings: List[List[float]],
+            generation: Optional[int]=None
+    )->Optional[VideoMatrix]:
+        """
+        Builds and caches the matrix; returns None (nothing cached) for a video without chunks.
+        The matrix is returned but not cached when the video was invalidated after generation was read.
+        """
+        if not embeddings:
+            return None
+        entry=VideoMatrix(texts, metadatas, embeddings, time.monotonic()+self.ttl_seconds)
+        if entry.nbytes>self.max_bytes:
+            return entry
+        with self._lock:
+            if generation is not None and generation!=self._generations.get(video_id, 0):
+                return entry
+            if video_id in self._entries:
+                self._remove(video_id)
+            self._entries[video_id]=entry
+            self._bytes+=entry.nbytes
+            while self._bytes>self.max_bytes:
+                oldest=next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions+=1
+        return entry
+
+    def _remove(self, video_id: str)->None:
+        entry=self._entries.pop(video_id)
+        self._bytes-=entry.nbytes
+
+    def invalidate(self, video_id: str)->None:
+        with self._lock:
+            self._generations[video_id]=self._generations.get(video_id, 0)+1
+            if video_id in self._entries:
+                self._remove(video_id)
+
+    def stats(self)->Dict[str, float]:
+        with self._lock:
+            lookups=self.hits+self.misses
+            return {
+                "videos": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+            }
@@ -0,0 +1,87 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Dict, Optional
+
+from app.core.metrics import metrics
+from app.core.dependencies import get_gemini_model, get_embeddings_model, get_vector_store, warm_request_services
+
+
+class WarmupState:
+    """
+    Tracks the background warm-up of the expensive singletons.
+    ready flips to True once every component is initialized (including the embedding dimension check).
+    """
+
+    def __init__(self):
+        self.ready=False
+        self.started_at: Optional[float]=None
+        self.finished_at: Optional[float]=None
+        self.components: Dict[str, Dict[str, Any]]={}
+
+    def to_dict(self)->Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "total_seconds": (self.finished_at-self.started_at) if self.started_at and self.finished_at else None,
+            "components": self.components,
+        }
+
+
+warmup_state=WarmupState()
+
+
+async def _warm_component(name: str, fn)->Any:
+    """
+    Runs one initializer and records its status and duration.
+    Blocking initializers run in a worker thread; coroutine functions are awaited directly.
+    """
+    warmup_state.components[name]={"status": "running", "seconds": None, "error": None}
+    start=time.perf_counter()
+    try:
+        if inspect.iscoroutinefunction(fn):
+            result=await fn()
+        else:
+            result=await asyncio.to_thread(fn)
+        warmup_state.components[name]["status"]="ready"
+        return result
+    except Exception as e:
+        warmup_state.components[name]["status"]="failed"
+        warmup_state.components[name]["error"]=str(e)
+        raise
+    finally:
+        elapsed=time.perf_counter()-start
+        warmup_state.components[name]["seconds"]=elapsed
+        metrics.observe(f"warmup.{name}", elapsed)
+
+
+async def run_warmup()->None:
+    """
+    Initializes the Gemini LLM, the embedding model and the vector store concurrently,
+    then the app-scoped request services that are built on top of them.
+    Failures are recorded and printed; requests still initialize lazily through the dependencies.
+    """
+    warmup_state.started_at=time.perf_counter()
+
+    async def warm_embeddings():
+        # Building the embedding model also verifies its dimension.
+        await _warm_component("embeddings_model", get_embeddings_model)
+        await _warm_component("vector_store", get_vector_store)
+
+    results=await asyncio.gather(
+        _warm_component("gemini_model", get_gemini_model),
+        warm_embeddings(),
+        return_exceptions=True
+    )
+    errors=[result for result in results if isinstance(result, Exception)]
+    if not errors:
+        # The RAG and timestamp services compile their chains on top of the models warmed above.
+        try:
+            await _warm_component("request_services", warm_request_services)
+        except Exception as e:
+            errors.append(e)
+    warmup_state.finished_at=time.perf_counter()
+    if errors:
+        print(f"Warm-up finished with errors: {errors}")
+    else:
+        warmup_state.ready=True
+        print(f"Warm-up finished in {warmup_state.finished_at-warmup_state.started_at:.2f}s")
@@ -1,13 +1,46 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import video_router,chat_router, notebook_router, user_router
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.core.warmup import run_warmup, warmup_state
+from app.core.dependencies import get_job_queue_service
+
+
+async def start_job_workers():
+    # Connecting the job repository can block, so it happens off the startup path.
+    try:
+        job_queue_service=await asyncio.to_thread(get_job_queue_service)
+    except Exception as e:
+        print(f"Error starting job workers: {e}")
+        return None
+    job_queue_service.start()
+    return job_queue_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the models and vector store in the background so startup is not blocked.
+    warmup_task=asyncio.create_task(run_warmup()) if settings.WARMUP_ON_STARTUP else None
+    workers_task=asyncio.create_task(start_job_workers()) if settings.RUN_JOB_WORKERS_IN_APP and settings.JOB_WORKERS>0 else None
+    yield
+    if workers_task and not workers_task.done():
+        workers_task.cancel()
+    elif workers_task and workers_task.result():
+        await workers_task.result().stop()
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
 
 
 app=FastAPI(
     title="YouTube Notebook API",
     description="API for processing YouTube videos, generating content, and managing chat sessions.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,6 +60,14 @@ app.include_router(user_router.router)
 async def read_root():
     return {"message":"Welcome to the youtube notebook api!"}
 
+@app.get("/ready")
+async def read_readiness():
+    return JSONResponse(status_code=200 if warmup_state.ready else 503, content=warmup_state.to_dict())
+
+@app.get("/metrics")
+async def read_metrics():
+    return metrics.snapshot()
+
 if __name__=="__main__":
     import uvicorn
     port=int(os.getenv("PORT",8000))
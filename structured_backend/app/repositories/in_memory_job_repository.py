@@ -0,0 +1,82 @@
+
+import threading
+import uuid
+from typing import List, Dict, Optional, Any
+from app.core.schema import JobDBEntry
+from datetime import datetime
+
+class InMemoryJobRepository:
+
+    """
+    In-process stand-in for JobMongoDBRepository with the same interface.
+    Used for tests and single-process development; jobs are lost on restart.
+    """
+
+    def __init__(self):
+        self._lock=threading.Lock()
+        self._jobs: Dict[str, JobDBEntry]={}
+
+    def create_job(self, job_type:str, payload:Dict[str, Any], not_before:Optional[datetime]=None, dedupe_key:Optional[str]=None)->Optional[JobDBEntry]:
+        now=datetime.utcnow()
+        job=JobDBEntry(
+            job_id=str(uuid.uuid4()), job_type=job_type, payload=payload, dedupe_key=dedupe_key,
+            created_at=now, updated_at=now, not_before=not_before
+        )
+        with self._lock:
+            # Same rule as the unique partial index of the Mongo repository.
+            if dedupe_key is not None and any(
+                    other.job_type==job_type and other.dedupe_key==dedupe_key and other.status in ("queued", "running")
+                    for other in self._jobs.values()
+            ):
+                return None
+            self._jobs[job.job_id]=job
+        return job.model_copy()
+
+    def get_job(self, job_id:str)->Optional[JobDBEntry]:
+        with self._lock:
+            job=self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def find_active_job(self, job_type:str, dedupe_key:str)->Optional[JobDBEntry]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.job_type==job_type and job.dedupe_key==dedupe_key and job.status in ("queued", "running"):
+                    return job.model_copy()
+        return None
+
+    def claim_next_job(self, worker_id:str, job_types:Optional[List[str]]=None)->Optional[JobDBEntry]:
+        now=datetime.utcnow()
+        with self._lock:
+            queued=[
+                job for job in self._jobs.values()
+                if job.status=="queued" and (not job_types or job.job_type in job_types) and (job.not_before is None or job.not_before<=now)
+            ]
+            if not queued:
+                return None
+            job=min(queued, key=lambda j: j.created_at)
+            job.status="running"
+            job.worker_id=worker_id
+            job.started_at=now
+            job.updated_at=now
+            job.attempts+=1
+            return job.model_copy()
+
+    def update_job(self, job_id:str, **fields)->None:
+        with self._lock:
+            job=self._jobs.get(job_id)
+            if job is None:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at=datetime.utcnow()
+
+    def requeue_stale_jobs(self, stale_before:datetime)->int:
+        count=0
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status=="running" and job.updated_at<stale_before:
+                    job.status="queued"
+                    job.worker_id=None
+                    job.updated_at=datetime.utcnow()
+                    count+=1
+        return count
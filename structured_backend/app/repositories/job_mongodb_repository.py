@@ -0,0 +1,89 @@
+
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from pymongo.collection import Collection
+import uuid
+from typing import List, Dict, Optional, Any
+from app.core.schema import JobDBEntry
+from datetime import datetime
+from app.core.settings import settings
+
+class JobMongoDBRepository:
+
+    """Repository class for the Mongo-backed background job queue."""
+
+    def __init__(self, client: MongoClient):
+        if(settings.DB_NAME is None):
+            raise
+        self.db=client[settings.DB_NAME]
+        self.jobs_collection: Collection=self.db["jobs"]
+        self.jobs_collection.create_index("job_id", unique=True)
+        self.jobs_collection.create_index([("status", 1), ("created_at", 1)])
+        self.jobs_collection.create_index([("job_type", 1), ("dedupe_key", 1), ("status", 1)])
+        # At most one queued or running job per (job_type, dedupe_key), across every API and worker process.
+        self.jobs_collection.create_index(
+            [("job_type", 1), ("dedupe_key", 1)],
+            unique=True,
+            name="active_dedupe_key",
+            partialFilterExpression={"dedupe_key": {"$type": "string"}, "status": {"$in": ["queued", "running"]}}
+        )
+        print(f"JobMongoDBRepository connected to database: {self.db.name}")
+
+    def create_job(self, job_type:str, payload:Dict[str, Any], not_before:Optional[datetime]=None, dedupe_key:Optional[str]=None)->Optional[JobDBEntry]:
+        """Creates a queued job; returns None when a queued or running job with the same dedupe_key already exists."""
+        now=datetime.utcnow()
+        job=JobDBEntry(
+            job_id=str(uuid.uuid4()), job_type=job_type, payload=payload, dedupe_key=dedupe_key,
+            created_at=now, updated_at=now, not_before=not_before
+        )
+        try:
+            self.jobs_collection.insert_one(job.model_dump())
+        except DuplicateKeyError:
+            return None
+        return job
+
+    def get_job(self, job_id:str)->Optional[JobDBEntry]:
+        job_doc=self.jobs_collection.find_one({"job_id":job_id}, {"_id":0})
+        if not job_doc:
+            return None
+        return JobDBEntry.model_validate(job_doc)
+
+    def find_active_job(self, job_type:str, dedupe_key:str)->Optional[JobDBEntry]:
+        """Returns the queued or running job of this type for the dedupe key, if there is one."""
+        job_doc=self.jobs_collection.find_one(
+            {"job_type":job_type, "dedupe_key":dedupe_key, "status":{"$in":["queued", "running"]}},
+            {"_id":0}
+        )
+        if not job_doc:
+            return None
+        return JobDBEntry.model_validate(job_doc)
+
+    def claim_next_job(self, worker_id:str, job_types:Optional[List[str]]=None)->Optional[JobDBEntry]:
+        """Atomically moves the oldest queued job to running and assigns it to the worker."""
+        now=datetime.utcnow()
+        query: Dict[str, Any]={"status":"queued", "$or":[{"not_before":None}, {"not_before":{"$lte":now}}]}
+        if job_types:
+            query["job_type"]={"$in":job_types}
+        job_doc=self.jobs_collection.find_one_and_update(
+            query,
+            {"$set":{"status":"running", "worker_id":worker_id, "started_at":now, "updated_at":now},
+             "$inc":{"attempts":1}},
+            sort=[("created_at", 1)],
+            projection={"_id":0},
+            return_document=ReturnDocument.AFTER
+        )
+        if not job_doc:
+            return None
+        return JobDBEntry.model_validate(job_doc)
+
+    def update_job(self, job_id:str, **fields)->None:
+        fields["updated_at"]=datetime.utcnow()
+        self.jobs_collection.update_one({"job_id":job_id}, {"$set":fields})
+
+    def requeue_stale_jobs(self, stale_before:datetime)->int:
+        """Puts running jobs back in the queue when their worker stopped reporting (e.g. it crashed)."""
+        result=self.jobs_collection.update_many(
+            {"status":"running", "updated_at":{"$lt":stale_before}},
+            {"$set":{"status":"queued", "worker_id":None, "updated_at":datetime.utcnow()}}
+        )
+        return result.modified_count
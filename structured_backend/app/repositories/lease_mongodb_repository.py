@@ -0,0 +1,46 @@
+
+from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
+from app.core.settings import settings
+
+class LeaseMongoDBRepository:
+
+    """
+    Expiring lease documents used to make sure only one worker process runs a given piece of work
+    (e.g. the ingest of one video_id) at a time. A lease whose holder stops renewing it can be taken over
+    once it expires.
+    """
+
+    def __init__(self, client: MongoClient, collection_name: str="ingest_leases"):
+        if(settings.DB_NAME is None):
+            raise
+        self.db=client[settings.DB_NAME]
+        self.leases_collection: Collection=self.db[collection_name]
+        # Let Mongo clean up leases abandoned by crashed workers.
+        self.leases_collection.create_index("expires_at", expireAfterSeconds=0)
+        print(f"LeaseMongoDBRepository connected to database: {self.db.name}")
+
+    def try_acquire(self, key:str, owner:str, ttl_seconds:float)->bool:
+        now=datetime.utcnow()
+        expires_at=now+timedelta(seconds=ttl_seconds)
+        try:
+            self.leases_collection.insert_one({"_id":key, "owner":owner, "expires_at":expires_at, "acquired_at":now})
+            return True
+        except DuplicateKeyError:
+            taken_over=self.leases_collection.find_one_and_update(
+                {"_id":key, "$or":[{"expires_at":{"$lt":now}}, {"owner":owner}]},
+                {"$set":{"owner":owner, "expires_at":expires_at, "acquired_at":now}}
+            )
+            return taken_over is not None
+
+    def renew(self, key:str, owner:str, ttl_seconds:float)->bool:
+        result=self.leases_collection.update_one(
+            {"_id":key, "owner":owner},
+            {"$set":{"expires_at":datetime.utcnow()+timedelta(seconds=ttl_seconds)}}
+        )
+        return result.matched_count>0
+
+    def release(self, key:str, owner:str)->None:
+        self.leases_collection.delete_one({"_id":key, "owner":owner})
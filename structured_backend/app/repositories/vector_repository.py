@@ -1,9 +1,20 @@
 import os
-from  pymongo import MongoClient
+import asyncio
+import time
+import pymongo
+from  pymongo import MongoClient, ReplaceOne
+from pymongo.errors import PyMongoError
 from langchain_mongodb.vectorstores import MongoDBAtlasVectorSearch
 from langchain_core.documents import Document
-from typing import List,Optional
+from bson import ObjectId
+from typing import Any,Callable,Dict,List,Optional,Set,Tuple
 from app.core.settings import settings
+from app.core.metrics import metrics
+from app.core.vector_matrix_cache import VectorMatrixCache, VideoMatrix
+from app.core.lexical_index import BM25Index, LexicalIndexStore, reciprocal_rank_fusion
+from app.core.retrieval_cache import RetrievalCache
+
+RETRIEVAL_MODES=("vector", "bm25", "hybrid")
 
 class VectorRepository:
     """
@@ -11,8 +22,41 @@ class VectorRepository:
     This class is responsible for the low-level data access for the vector database.
     """
 
-    def __init__(self, vector_store: MongoDBAtlasVectorSearch):
+    def __init__(
+            self,
+            vector_store: MongoDBAtlasVectorSearch,
+            matrix_cache: Optional[VectorMatrixCache]=None,
+            lexical_index: Optional[LexicalIndexStore]=None,
+            retrieval_mode: str="vector",
+            rrf_k: int=60,
+            fusion_candidates: int=20,
+            retrieval_cache: Optional[RetrievalCache]=None,
+            dependent_caches: Optional[List[Any]]=None,
+            query_timeout_seconds: Optional[float]=None,
+            embed_timeout_seconds: Optional[float]=None
+    ):
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        if retrieval_mode!="vector" and lexical_index is None:
+            raise ValueError(f"Retrieval mode {retrieval_mode} needs a lexical index store.")
         self.vector_store=vector_store
+        # When set, searches scoped to a single video are answered from an in-memory matrix of its chunks.
+        self.matrix_cache=matrix_cache
+        # Per-video BM25 indexes. "bm25" and "hybrid" modes only apply to searches scoped to one video;
+        # hybrid fuses both rankings, each fetched fusion_candidates deep, with reciprocal rank fusion.
+        self.lexical_index=lexical_index
+        self.retrieval_mode=retrieval_mode
+        self.rrf_k=rrf_k
+        self.fusion_candidates=fusion_candidates
+        # Remembers the ranked chunk ids of single-video searches, so a repeated question skips both legs.
+        self.retrieval_cache=retrieval_cache
+        # Other caches derived from a video's chunks (such as answer caches); each has invalidate(video_id).
+        self.dependent_caches=dependent_caches or []
+        # Per-call bounds for searches: every Mongo operation of a search leg gets the remaining time as
+        # maxTimeMS, so the server stops work a timed-out request abandoned; async query embeddings are cancelled.
+        # The sync embed_query cannot be cancelled, so embed_timeout_seconds only bounds the async path.
+        self.query_timeout_seconds=query_timeout_seconds
+        self.embed_timeout_seconds=embed_timeout_seconds
 
     def add_documents_list(self, documents: List[Document])->None:
         # internally using embed_documents that we defined in embeddings.py
@@ -20,20 +64,361 @@ class VectorRepository:
         Adds a list of documents to the vector store.
         """
         try:
-            self.vector_store.add_documents(documents=documents)
+            embeddings=self.vector_store.embeddings.embed_documents([doc.page_content for doc in documents])
+            self._insert_embedded_documents(documents, embeddings)
             print(f"Successfully embedded and stored {len(documents)}chunks.")
         except Exception as e:
             print(f"Error embedding and storing chunks: {e}")
             raise
 
-    def similarity_search_query(self, query: str, k: int, filter: Optional[dict] = None) -> List[Document]:
+    def _insert_embedded_documents(self, documents: List[Document], embeddings: List[List[float]])->None:
         """
-        Performs a similarity search in the vector store with an optional filter.
+        Writes already-embedded documents in the same shape MongoDBAtlasVectorSearch uses.
+        Documents with a chunk_id are upserted under it as _id, so re-running an ingest never duplicates chunks.
+        """
+        operations=[]
+        plain_docs=[]
+        for doc, embedding in zip(documents, embeddings):
+            record={"text": doc.page_content, "embedding": embedding, **doc.metadata}
+            chunk_id=doc.metadata.get("chunk_id")
+            if chunk_id:
+                operations.append(ReplaceOne({"_id": chunk_id}, {"_id": chunk_id, **record}, upsert=True))
+            else:
+                plain_docs.append(record)
+        if operations:
+            self.vector_store.collection.bulk_write(operations, ordered=False)
+        if plain_docs:
+            self.vector_store.collection.insert_many(plain_docs)
+        self._invalidate({doc.metadata.get("video_id") for doc in documents})
+
+    def get_stored_chunk_ids(self, video_id: str)->Set[str]:
+        """Returns the chunk ids already stored for a video; they are the ingest checkpoints."""
+        return {doc["_id"] for doc in self.vector_store.collection.find({"video_id": video_id, "chunk_id": {"$exists": True}}, {"_id": 1})}
+
+    def delete_chunks(self, video_id: str, keep_chunk_ids: Optional[Set[str]]=None)->int:
+        """Deletes a video's chunks, except keep_chunk_ids; returns how many were removed."""
+        query={"video_id": video_id}
+        if keep_chunk_ids is not None:
+            query["_id"]={"$nin": list(keep_chunk_ids)}
+        deleted=self.vector_store.collection.delete_many(query).deleted_count
+        self._invalidate({video_id})
+        return deleted
+
+    def _invalidate(self, video_ids: Set[Optional[str]])->None:
+        for video_id in video_ids:
+            if not video_id:
+                continue
+            if self.matrix_cache is not None:
+                self.matrix_cache.invalidate(video_id)
+            if self.lexical_index is not None:
+                self.lexical_index.invalidate(video_id)
+            if self.retrieval_cache is not None:
+                self.retrieval_cache.invalidate(video_id)
+            for cache in self.dependent_caches:
+                cache.invalidate(video_id)
+
+    def build_lexical_index(self, video_id: str, persist: bool=True)->Optional[BM25Index]:
+        """
+        Builds the BM25 index of a video from its stored chunks and keeps it; returns None when it has none.
+        Ingest persists the index once every chunk is stored; searches build a local-only index instead,
+        because the video may still be embedding.
+        """
+        started=time.perf_counter()
+        generation=self.lexical_index.generation(video_id)
+        cursor=self.vector_store.collection.find({"video_id": video_id}, {"text": 1}).sort("start", 1)
+        index=BM25Index.from_chunks((str(doc["_id"]), doc["text"]) for doc in cursor)
+        if not index.chunk_ids:
+            return None
+        self.lexical_index.put(video_id, index, generation, persist=persist)
+        metrics.observe("retrieval.bm25_index_build", time.perf_counter()-started)
+        return index
+
+    def _documents_by_id(self, chunk_ids: List[str])->Dict[str, Document]:
+        """Loads chunks by their string _id, in the same Document shape $vectorSearch returns."""
+        # Chunks stored before deterministic chunk ids exist have ObjectId _ids.
+        ids=chunk_ids+[ObjectId(chunk_id) for chunk_id in chunk_ids if ObjectId.is_valid(chunk_id)]
+        text_key, embedding_key=self.vector_store._text_key, self.vector_store._embedding_key
+        documents={}
+        for doc in self.vector_store.collection.find({"_id": {"$in": ids}}, {embedding_key: 0}):
+            doc["_id"]=str(doc["_id"])
+            documents[doc["_id"]]=Document(page_content=doc.pop(text_key), metadata=doc, id=doc["_id"])
+        return documents
+
+    def _search_lexical(self, query: str, k: int, video_id: str)->List[Tuple[str, float]]:
+        started=time.perf_counter()
+        index=(
+            self.lexical_index.get(video_id, count_chunks=lambda: self.vector_store.collection.count_documents({"video_id": video_id}))
+            or self.build_lexical_index(video_id, persist=False)
+        )
+        results=index.search(query, k) if index is not None else []
+        metrics.observe("retrieval.bm25", time.perf_counter()-started)
+        return results
+
+    def _search_vector_timed(self, query_vector: List[float], k: int, filter: Optional[dict])->List[Tuple[Document, float]]:
+        started=time.perf_counter()
+        results=self._search_by_vector(query_vector, k, filter)
+        metrics.observe("retrieval.vector_search", time.perf_counter()-started)
+        return results
+
+    def _fuse(
+            self,
+            vector_results: List[Tuple[Document, float]],
+            lexical_results: List[Tuple[str, float]],
+            k: int,
+            timings: Dict[str, float]
+    )->List[Tuple[Document, float]]:
+        """Fuses the two rankings with RRF and loads the lexical-only hits that the vector leg did not return."""
+        started=time.perf_counter()
+        documents={str(doc.metadata.get("_id")): doc for doc, _ in vector_results}
+        fused=reciprocal_rank_fusion([list(documents), [chunk_id for chunk_id, _ in lexical_results]], k=self.rrf_k)[:k]
+        missing=[chunk_id for chunk_id, _ in fused if chunk_id not in documents]
+        if missing:
+            documents.update(self._documents_by_id(missing))
+        results=[(documents[chunk_id], score) for chunk_id, score in fused if chunk_id in documents]
+        timings["fusion_seconds"]=time.perf_counter()-started
+        metrics.observe("retrieval.fusion", timings["fusion_seconds"])
+        return results
+
+    def _resolve_mode(self, filter: Optional[dict], mode: Optional[str])->Tuple[str, Optional[str]]:
+        mode=mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        video_id=self._single_video_id(filter)
+        # The lexical indexes are per video, so searches across videos always use the vector leg alone.
+        if video_id is None or self.lexical_index is None:
+            return "vector", video_id
+        return mode, video_id
+
+    @staticmethod
+    def _single_video_id(filter: Optional[dict])->Optional[str]:
+        """Returns the video id when the filter is exactly {"video_id": <id>}, the only shape the matrix cache serves."""
+        if filter and len(filter)==1 and isinstance(filter.get("video_id"), str):
+            return filter["video_id"]
+        return None
+
+    def _video_matrix(self, video_id: str)->Optional[VideoMatrix]:
+        """Returns the cached matrix of a video, loading all of its chunks in one query on a miss."""
+        matrix=self.matrix_cache.get(video_id)
+        if matrix is not None:
+            return matrix
+        generation=self.matrix_cache.generation(video_id)
+        texts, metadatas, embeddings=[], [], []
+        text_key, embedding_key=self.vector_store._text_key, self.vector_store._embedding_key
+        for doc in self.vector_store.collection.find({"video_id": video_id}):
+            texts.append(doc.pop(text_key))
+            embeddings.append(doc.pop(embedding_key))
+            # Same metadata shape as the documents returned by $vectorSearch.
+            doc["_id"]=str(doc["_id"])
+            metadatas.append(doc)
+        return self.matrix_cache.put(video_id, texts, metadatas, embeddings, generation=generation)
+
+    def _search_by_vector(self, query_vector: List[float], k: int, filter: Optional[dict])->List[Tuple[Document, float]]:
+        """Searches the in-memory matrix for single-video filters and falls back to $vectorSearch otherwise."""
+        video_id=self._single_video_id(filter) if self.matrix_cache is not None else None
+        if video_id is not None:
+            matrix=self._video_matrix(video_id)
+            return matrix.search(query_vector, k) if matrix is not None else []
+        return self.vector_store._similarity_search_with_score(query_vector, k, pre_filter=filter)
+
+    def _bounded(self, func: Callable, *args):
+        """Runs func with its Mongo operations bounded by query_timeout_seconds; a timeout raises TimeoutError."""
+        if self.query_timeout_seconds is None:
+            return func(*args)
+        try:
+            with pymongo.timeout(self.query_timeout_seconds):
+                return func(*args)
+        except PyMongoError as e:
+            if not e.timeout:
+                raise
+            metrics.incr("retrieval.query_timeouts")
+            raise TimeoutError(f"Mongo query exceeded {self.query_timeout_seconds}s") from e
+
+    async def aembed_query(self, query: str)->List[float]:
+        """
+        Embeds a query with the model's native async API (repeated queries hit the query embedding cache).
+        Raises TimeoutError when the request takes longer than embed_timeout_seconds.
         """
         try:
-            # Pass all arguments directly, mimicking the monolithic code's behavior
-            results = self.vector_store.similarity_search(query,k,filter)
+            return await asyncio.wait_for(self.vector_store.embeddings.aembed_query(query), timeout=self.embed_timeout_seconds)
+        except TimeoutError as e:
+            metrics.incr("retrieval.embed_timeouts")
+            raise TimeoutError(f"Query embedding exceeded {self.embed_timeout_seconds}s") from e
+
+    async def aembed_documents(self, documents: List[Document])->List[List[float]]:
+        """Embeds the page contents of the documents with the model's native async API."""
+        return await self.vector_store.embeddings.aembed_documents([doc.page_content for doc in documents])
+
+    async def astore_embedded_documents(self, documents: List[Document], embeddings: List[List[float]])->None:
+        """Stores already-embedded documents, running the blocking insert_many in a worker thread."""
+        await asyncio.to_thread(self._insert_embedded_documents, documents, embeddings)
+
+    async def aadd_documents_list(self, documents: List[Document])->None:
+        """
+        Async version of add_documents_list. Embeds with the model's native async API
+        and runs the blocking Mongo write in a worker thread.
+        """
+        try:
+            embeddings=await self.aembed_documents(documents)
+            await self.astore_embedded_documents(documents, embeddings)
+            print(f"Successfully embedded and stored {len(documents)}chunks.")
+        except Exception as e:
+            print(f"Error embedding and storing chunks: {e}")
+            raise
+
+    def get_video_chunks_with_embeddings(self, video_id: str)->Tuple[List[str], List[List[float]]]:
+        """Returns the stored chunk texts of a video and their embeddings, ordered by start time."""
+        cursor=self.vector_store.collection.find({"video_id": video_id}, {"_id": 0, "text": 1, "embedding": 1}).sort("start", 1)
+        texts, embeddings=[], []
+        for doc in cursor:
+            texts.append(doc["text"])
+            embeddings.append(doc["embedding"])
+        return texts, embeddings
+
+    def search_with_timings(self, query: str, k: int, filter: Optional[dict]=None, mode: Optional[str]=None)->Tuple[List[Document], Dict[str, float]]:
+        """
+        Runs the search in the given (or the configured) retrieval mode and returns the documents
+        with the latency of each leg in seconds: embed, vector, bm25 and fusion as they apply.
+        Single-video searches found in the retrieval cache skip the embedding call and both legs.
+        The Mongo legs are bounded by query_timeout_seconds, but the blocking embed_query call is not;
+        callers that need the whole search bounded use asearch_with_timings.
+        """
+        mode, video_id=self._resolve_mode(filter, mode)
+        started=time.perf_counter()
+        timings: Dict[str, float]={}
+        cache_key=self._cache_key(video_id, query, k, mode)
+        docs=self._bounded(self._cached_documents, cache_key, video_id)
+        if docs is not None:
+            return self._finish_cache_hit(docs, started, timings), timings
+        depth=max(k, self.fusion_candidates) if mode=="hybrid" else k
+        vector_results: List[Tuple[Document, float]]=[]
+        lexical_results: List[Tuple[str, float]]=[]
+        if mode!="bm25":
+            leg_started=time.perf_counter()
+            query_vector=self.vector_store.embeddings.embed_query(query)
+            timings["embed_seconds"]=time.perf_counter()-leg_started
+            leg_started=time.perf_counter()
+            vector_results=self._bounded(self._search_vector_timed, query_vector, depth, filter)
+            timings["vector_seconds"]=time.perf_counter()-leg_started
+        if mode!="vector":
+            leg_started=time.perf_counter()
+            lexical_results=self._bounded(self._search_lexical, query, depth, video_id)
+            timings["bm25_seconds"]=time.perf_counter()-leg_started
+        scored=self._bounded(self._combine, mode, vector_results, lexical_results, k, timings)
+        return self._finish_search(cache_key, mode, scored, started, timings), timings
+
+    async def asearch_with_timings(self, query: str, k: int, filter: Optional[dict]=None, mode: Optional[str]=None)->Tuple[List[Document], Dict[str, float]]:
+        """Async version of search_with_timings; in hybrid mode the vector and BM25 legs run concurrently."""
+        mode, video_id=self._resolve_mode(filter, mode)
+        started=time.perf_counter()
+        timings: Dict[str, float]={}
+        cache_key=self._cache_key(video_id, query, k, mode)
+        if cache_key is not None:
+            docs=await asyncio.to_thread(self._bounded, self._cached_documents, cache_key, video_id)
+            if docs is not None:
+                return self._finish_cache_hit(docs, started, timings), timings
+        depth=max(k, self.fusion_candidates) if mode=="hybrid" else k
+
+        async def vector_leg()->List[Tuple[Document, float]]:
+            if mode=="bm25":
+                return []
+            leg_started=time.perf_counter()
+            query_vector=await self.aembed_query(query)
+            timings["embed_seconds"]=time.perf_counter()-leg_started
+            leg_started=time.perf_counter()
+            results=await asyncio.to_thread(self._bounded, self._search_vector_timed, query_vector, depth, filter)
+            timings["vector_seconds"]=time.perf_counter()-leg_started
             return results
+
+        async def lexical_leg()->List[Tuple[str, float]]:
+            if mode=="vector":
+                return []
+            leg_started=time.perf_counter()
+            results=await asyncio.to_thread(self._bounded, self._search_lexical, query, depth, video_id)
+            timings["bm25_seconds"]=time.perf_counter()-leg_started
+            return results
+
+        vector_results, lexical_results=await asyncio.gather(vector_leg(), lexical_leg())
+        if mode!="vector":
+            # bm25 and hybrid load lexical hits from Mongo.
+            scored=await asyncio.to_thread(self._bounded, self._combine, mode, vector_results, lexical_results, k, timings)
+        else:
+            scored=self._combine(mode, vector_results, lexical_results, k, timings)
+        return self._finish_search(cache_key, mode, scored, started, timings), timings
+
+    def _combine(
+            self,
+            mode: str,
+            vector_results: List[Tuple[Document, float]],
+            lexical_results: List[Tuple[str, float]],
+            k: int,
+            timings: Dict[str, float]
+    )->List[Tuple[Document, float]]:
+        if mode=="vector":
+            return vector_results
+        if mode=="bm25":
+            documents=self._documents_by_id([chunk_id for chunk_id, _ in lexical_results])
+            return [(documents[chunk_id], score) for chunk_id, score in lexical_results if chunk_id in documents]
+        return self._fuse(vector_results, lexical_results, k, timings)
+
+    def _cache_key(self, video_id: Optional[str], query: str, k: int, mode: str):
+        # Only single-video searches are cached, because invalidation is per video.
+        if self.retrieval_cache is None or video_id is None:
+            return None
+        return self.retrieval_cache.key(video_id, query, k, mode)
+
+    def _cached_documents(self, cache_key, video_id: str)->Optional[List[Document]]:
+        """
+        Resolves a cached result to documents, from the video's in-memory matrix when it is loaded and by
+        _id from Mongo otherwise. Returns None on a miss, or when a cached chunk no longer exists.
+        """
+        if cache_key is None:
+            return None
+        cached=self.retrieval_cache.get(cache_key)
+        if cached is None:
+            return None
+        chunk_ids=[chunk_id for chunk_id, _ in cached]
+        matrix=self.matrix_cache.get(video_id) if self.matrix_cache is not None else None
+        documents=matrix.documents_by_id(chunk_ids) if matrix is not None else self._documents_by_id(chunk_ids)
+        if len(documents)<len(chunk_ids):
+            self.retrieval_cache.invalidate(video_id)
+            return None
+        return [documents[chunk_id] for chunk_id in chunk_ids]
+
+    def _finish_search(self, cache_key, mode: str, scored: List[Tuple[Document, float]], started: float, timings: Dict[str, float])->List[Document]:
+        if cache_key is not None and scored:
+            self.retrieval_cache.put(cache_key, [(str(doc.metadata.get("_id")), score) for doc, score in scored])
+        timings["total_seconds"]=time.perf_counter()-started
+        metrics.observe(f"retrieval.{mode}", timings["total_seconds"])
+        return [doc for doc, _ in scored]
+
+    def _finish_cache_hit(self, docs: List[Document], started: float, timings: Dict[str, float])->List[Document]:
+        timings["cache_seconds"]=timings["total_seconds"]=time.perf_counter()-started
+        metrics.observe("retrieval.cache_hit", timings["total_seconds"])
+        return docs
+
+    def similarity_search_query(self, query: str, k: int, filter: Optional[dict] = None, mode: Optional[str] = None) -> List[Document]:
+        """
+        Performs a similarity search in the vector store with an optional filter.
+        Searches scoped to one video use the retrieval mode (vector, bm25 or hybrid).
+        """
+        try:
+            if self.matrix_cache is None and self.retrieval_cache is None and (mode or self.retrieval_mode)=="vector":
+                # Pass all arguments directly, mimicking the monolithic code's behavior
+                return self._bounded(self.vector_store.similarity_search, query, k, filter)
+            docs, _=self.search_with_timings(query, k, filter, mode)
+            return docs
         except Exception as e:
             print(f"Error during similarity search: {e}")
-            raise # Re-raise to preserve the original traceback
\ No newline at end of file
+            raise # Re-raise to preserve the original traceback
+
+    async def asimilarity_search_query(self, query: str, k: int, filter: Optional[dict] = None, mode: Optional[str] = None) -> List[Document]:
+        """
+        Async version of similarity_search_query. The query is embedded without blocking
+        the event loop and the searches run in worker threads.
+        """
+        try:
+            docs, _=await self.asearch_with_timings(query, k, filter, mode)
+            return docs
+        except Exception as e:
+            print(f"Error during similarity search: {e}")
+            raise
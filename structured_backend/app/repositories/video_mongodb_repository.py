@@ -3,11 +3,14 @@ from pymongo import MongoClient
 from pymongo.collection import Collection
 from bson.objectid import ObjectId
 import uuid
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Union
 from app.core.schema import ChatMessage, ChatSessionSummary, VideoDescription, VideoDBEntry
+from app.core.compact_transcript import CompactTranscript
 from datetime import datetime
 from app.core.settings import settings
 
+VIDEO_FIELDS=["_id"]+[field for field in VideoDBEntry.model_fields if field!="id"]
+
 class VideoMongoDBRepository:
 
     def __init__(self, client: MongoClient):
@@ -15,23 +18,100 @@ class VideoMongoDBRepository:
             raise
         self.db=client[settings.DB_NAME]
         self.videos_collection: Collection=self.db["videos"]
+        # "compact" stores the transcript once in columnar form; "legacy" keeps transcript + transcript_text.
+        self.transcript_format=settings.TRANSCRIPT_STORAGE_FORMAT.lower()
+        self.transcript_compression=settings.TRANSCRIPT_COMPRESSION.lower()
         print(f"VideoMongoDBRepository connected to database: {self.db.name}")
 
-    def get_video(self,video_id:str)->VideoDBEntry:
-
+    def get_video(self,video_id:str,fields:Optional[List[str]]=None)->Union[VideoDBEntry, Dict[str, Any]]:
+        """
+        Returns the full VideoDBEntry, or only the requested fields as a dict when fields is given.
+        The projection happens in MongoDB, so unrequested fields (the transcript above all) are never loaded.
+        """
+        if fields is not None:
+            return self._get_video_fields(video_id, fields)
         try:
             video=self.videos_collection.find_one({"video_id":video_id})
             if not video:
                 raise ValueError("Video not found!!!")
+            if "transcript_compact" in video:
+                # Expose the compact columns in the shape the rest of the app expects.
+                compact=CompactTranscript.from_document(video.pop("transcript_compact"))
+                video["transcript"]=compact.entries
+                video["transcript_text"]=compact.transcript_text
             return VideoDBEntry.model_validate(video)
         except Exception as e:
             raise
 
+    def _get_video_fields(self,video_id:str,fields:List[str])->Dict[str, Any]:
+        unknown=set(fields)-set(VIDEO_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown video fields: {sorted(unknown)}")
+        projection={field:1 for field in fields}
+        transcript_fields=[field for field in fields if field in ("transcript", "transcript_text")]
+        if transcript_fields:
+            projection["transcript_compact"]=1
+        video=self.videos_collection.find_one({"video_id":video_id}, projection)
+        if not video:
+            raise ValueError("Video not found!!!")
+        if "transcript_compact" in video:
+            compact=CompactTranscript.from_document(video.pop("transcript_compact"))
+            for field in transcript_fields:
+                video[field]=compact.entries if field=="transcript" else compact.transcript_text
+        if "_id" in fields:
+            video["_id"]=str(video["_id"])
+        else:
+            video.pop("_id", None)
+        return video
+
+    def get_compact_transcript(self,video_id:str)->CompactTranscript:
+        """
+        Loads only the transcript of a video. Nothing is decompressed until a column is used,
+        so reading transcript_text never decodes the timing arrays.
+        """
+        video=self.videos_collection.find_one({"video_id":video_id}, {"transcript_compact":1, "transcript":1, "transcript_text":1})
+        if not video:
+            raise ValueError("Video not found!!!")
+        if "transcript_compact" in video:
+            return CompactTranscript.from_document(video["transcript_compact"])
+        return CompactTranscript.from_entries(video.get("transcript", []))
+
+    def get_transcript_text(self,video_id:str)->str:
+        return self.get_compact_transcript(video_id).transcript_text
+
+    def get_transcript_window(self,video_id:str,start:float,end:Optional[float]=None)->List[Dict[str, Any]]:
+        """Returns the transcript segments overlapping [start, end) seconds."""
+        return self.get_compact_transcript(video_id).window(start, end)
+
+    def video_exists(self,video_id:str)->bool:
+        return self.videos_collection.count_documents({"video_id":video_id}, limit=1)>0
 
     def add_video_details(self,video_db_entry: VideoDBEntry):
         try:
-            self.videos_collection.insert_one(video_db_entry.model_dump(by_alias=True))
+            if self.transcript_format=="compact":
+                video=video_db_entry.model_dump(by_alias=True, exclude={"transcript", "transcript_text"})
+                video["transcript_compact"]=CompactTranscript.from_entries(video_db_entry.transcript).to_document(self.transcript_compression)
+            else:
+                video=video_db_entry.model_dump(by_alias=True)
+            self.videos_collection.insert_one(video)
         except Exception as e:
             raise
 
+    def get_embedding_status(self,video_id:str)->Optional[str]:
+        """Returns the video's embedding_status ("ready" for documents that predate it), or None when it is not stored."""
+        video=self.videos_collection.find_one({"video_id":video_id}, {"embedding_status":1})
+        if not video:
+            return None
+        return video.get("embedding_status", "ready")
+
+    def update_embedding_status(self,video_id:str,status:str):
+        self.videos_collection.update_one(
+            {"video_id":video_id},
+            {"$set":{"embedding_status":status, "updated_at":datetime.utcnow()}}
+        )
 
+    def update_video_description(self,video_id:str,description: VideoDescription):
+        self.videos_collection.update_one(
+            {"video_id":video_id},
+            {"$set":{"description":description.model_dump(), "description_status":"ready", "updated_at":datetime.utcnow()}}
+        )
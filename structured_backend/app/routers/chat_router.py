@@ -21,7 +21,8 @@ async def chat_once_endpoint(
     try:
         response_text = await rag_service.get_response(
             query_text=chat_query.query,
-            video_id=chat_query.video_id
+            video_id=chat_query.video_id,
+            use_cache=chat_query.use_cache
         )
         return {"answer": response_text}
     except Exception as e:
@@ -67,7 +68,8 @@ async def get_timestamps_endpoint(
     try:
         timestamps = await timestamp_service.get_timestamps_for_query(
             query_text=timestamp_query.query,
-            video_id=timestamp_query.video_id
+            video_id=timestamp_query.video_id,
+            use_cache=timestamp_query.use_cache
         )
         return {"message": "Timestamps retrieved successfully.", "timestamps": timestamps}
     except Exception as e:
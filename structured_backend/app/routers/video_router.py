@@ -1,12 +1,17 @@
 # app/routers/video_router.py
-from fastapi import APIRouter, HTTPException, Depends
+import json
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from typing import Optional
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl
-from app.core.dependencies import get_youtube_service, get_vector_service, get_genai_service, get_video_mongodb_repository
+from app.core.dependencies import get_youtube_service, get_vector_service, get_genai_service, get_video_mongodb_repository, get_job_queue_service, get_bulk_ingest_service
 from app.services.youtube_service import YouTubeService
 from app.services.vector_service import VectorService
 from app.services.genai_service import GenAIService
 from app.repositories.video_mongodb_repository import VideoMongoDBRepository
-from app.core.schema import VideoDBEntry, VideoSubmission
+from app.services.job_queue_service import JobQueueService
+from app.services.bulk_ingest_service import BulkIngestService
+from app.core.schema import VideoDBEntry, VideoSubmission, BulkVideoSubmission
 from datetime import datetime
 
 router = APIRouter(
@@ -15,13 +20,13 @@ router = APIRouter(
 )
 
 
-@router.post("/submit-video")
+@router.post("/submit-video", status_code=202)
 async def submit_video_endpoint(
     video_submission: VideoSubmission,
+    response: Response,
     youtube_service: YouTubeService = Depends(get_youtube_service),
-    vector_service: VectorService = Depends(get_vector_service),
-    genai_service: GenAIService = Depends(get_genai_service),
-    video_mongo_repo: VideoMongoDBRepository = Depends(get_video_mongodb_repository)
+    video_mongo_repo: VideoMongoDBRepository = Depends(get_video_mongodb_repository),
+    job_queue_service: JobQueueService = Depends(get_job_queue_service)
 ):
     url=(str(video_submission.url))
     try:
@@ -29,45 +34,120 @@ async def submit_video_endpoint(
         if not video_id:
             raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
-        if video_mongo_repo.get_video(video_id):
-            return {"message": f"Video with ID {video_id} was already submitted.", "video_id": video_id}
-
-        transcript_list = youtube_service.fetch_transcript(video_id)
-        transcript_text = youtube_service.textify(transcript_list)
-        generated_description = await genai_service.generate_video_description(transcript_text)
-
-        video_db_entry=VideoDBEntry(
-            video_id= video_id,
-            url=url,
-            submitted_at=datetime.utcnow(),
-            transcript= transcript_list,
-            transcript_text=transcript_text,
-            description= generated_description,
-            updated_at= datetime.utcnow()
-        )
+        embedding_status=video_mongo_repo.get_embedding_status(video_id)
+        if embedding_status in ("ready", "running"):
+            response.status_code=200
+            return {"message": f"Video with ID {video_id} was already submitted.", "video_id": video_id, "embedding_status": embedding_status}
 
-        video_mongo_repo.add_video_details(video_db_entry)
+        # Transcript fetch, description generation and embedding run in the background job queue.
+        # Concurrent submissions of the same video share one job. A video whose embedding failed
+        # is resumed by the same job, which only embeds the chunks that are still missing.
+        job=await job_queue_service.enqueue("ingest_video", {"video_id": video_id, "url": url}, dedupe_key=video_id)
 
-        vector_service.embed_and_store_transcript(video_id, transcript_list)
-
-        return {"message": f"Video {video_id} submitted. Transcript processing, Video embedding and Description Generation is done.", "video_id": video_id}
+        return {
+            "message": f"Video {video_id} queued for processing.",
+            "video_id": video_id,
+            "job_id": job.job_id,
+            "status_url": f"/videos/jobs/{job.job_id}"
+        }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to submit video: {e}")
 
 
+@router.post("/bulk-submit")
+async def bulk_submit_endpoint(
+    bulk_submission: BulkVideoSubmission,
+    bulk_ingest_service: BulkIngestService = Depends(get_bulk_ingest_service),
+    job_queue_service: JobQueueService = Depends(get_job_queue_service)
+):
+    """
+    Queues an ingest job for every new video in the list and streams per-video status as NDJSON
+    until all of them finish. The jobs keep running if the client disconnects; their status
+    stays available at /videos/jobs/{job_id}.
+    """
+    if not bulk_submission.items:
+        raise HTTPException(status_code=400, detail="No videos submitted.")
+
+    async def stream_status():
+        async for event in bulk_ingest_service.submit_and_watch(bulk_submission.items, job_queue_service):
+            yield json.dumps(event, default=str)+"\n"
+
+    return StreamingResponse(stream_status(), media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status_endpoint(
+    job_id: str,
+    job_queue_service: JobQueueService = Depends(get_job_queue_service)
+):
+    job = await job_queue_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events_endpoint(
+    job_id: str,
+    job_queue_service: JobQueueService = Depends(get_job_queue_service)
+):
+    """
+    Streams the job's progress as Server-Sent Events until it finishes. Ingest jobs emit stages such as
+    transcript_fetched, embedding (detail.chunks_stored of detail.chunks_estimated) and description_ready;
+    once detail.description is "ready" the notebook can be opened while embedding continues.
+    """
+    if await job_queue_service.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    async def stream_events():
+        async for job in job_queue_service.watch_job(job_id):
+            event=job.status if job.status in ("done", "failed") else "progress"
+            data={
+                "job_id": job.job_id, "status": job.status, "stage": job.stage,
+                "progress": job.progress, "detail": job.detail, "error": job.error,
+            }
+            if job.status=="done":
+                data["result"]=job.result
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(stream_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 
 @router.get("/video_details/{video_id}")
 async def get_video_details_endpoint(
     video_id: str,
-    video_mongo_repo: VideoMongoDBRepository = Depends(get_video_mongodb_repository),
-    youtube_service: YouTubeService = Depends(get_youtube_service),
-    genai_service: GenAIService = Depends(get_genai_service),
-    vector_service: VectorService = Depends(get_vector_service)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. video_id,description. Returns the full entry when omitted."),
+    video_mongo_repo: VideoMongoDBRepository = Depends(get_video_mongodb_repository)
 ):
-    video_db_entry= video_mongo_repo.get_video(video_id)
-    if not video_db_entry:
-        raise HTTPException(status_code=404, detail="Video details not found.")
+    try:
+        field_list=[field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        if field_list is not None and not field_list:
+            raise HTTPException(status_code=400, detail="fields must name at least one field.")
+        video_db_entry= video_mongo_repo.get_video(video_id, field_list)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        if "not found" in str(e):
+            raise HTTPException(status_code=404, detail="Video details not found.")
+        raise HTTPException(status_code=400, detail=str(e))
     # Convert ObjectId to string else error will occur
-    return video_db_entry
\ No newline at end of file
+    return video_db_entry
+
+
+@router.get("/{video_id}/transcript")
+async def get_transcript_window_endpoint(
+    video_id: str,
+    start: float = Query(0.0, alias="from", ge=0, description="Window start in seconds."),
+    end: Optional[float] = Query(None, alias="to", description="Window end in seconds; the end of the video when omitted."),
+    video_mongo_repo: VideoMongoDBRepository = Depends(get_video_mongodb_repository)
+):
+    """Returns only the transcript segments that overlap the [from, to) time window."""
+    if end is not None and end<=start:
+        raise HTTPException(status_code=400, detail="'to' must be greater than 'from'.")
+    try:
+        segments=video_mongo_repo.get_transcript_window(video_id, start, end)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Video not found.")
+    return {"video_id": video_id, "from": start, "to": end, "segments": segments}
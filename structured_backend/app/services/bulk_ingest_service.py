@@ -0,0 +1,146 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.repositories.video_mongodb_repository import VideoMongoDBRepository
+from app.services.job_queue_service import JobQueueService
+from app.services.video_ingest_service import VideoIngestService
+from app.services.youtube_service import VIDEO_ID_PATTERN, YouTubeService
+
+TERMINAL_STATUSES=("done", "failed", "skipped", "invalid")
+
+
+class BulkIngestService:
+    """
+    Ingests a list of YouTube URLs or bare video ids, such as every video of a course.
+    Items are resolved to video ids, deduplicated and checked against the stored videos first.
+    The remaining videos run with at most max_in_flight in progress, while VideoIngestService
+    applies separate caps to transcript fetching, LLM calls and embedding.
+    Every status change is yielded as a dict, so callers can stream it as NDJSON.
+    """
+
+    def __init__(
+            self,
+            youtube_service: YouTubeService,
+            video_mongo_repo: VideoMongoDBRepository,
+            video_ingest_service: VideoIngestService,
+            max_in_flight: int=8
+    ):
+        self.youtube_service=youtube_service
+        self.video_mongo_repo=video_mongo_repo
+        self.video_ingest_service=video_ingest_service
+        self.max_in_flight=max_in_flight
+
+    def _resolve_item(self, item: str)->Tuple[str, str]:
+        """Returns (video_id, url) for a URL or a bare video id; video_id is "" when it cannot be resolved."""
+        item=item.strip()
+        if VIDEO_ID_PATTERN.match(item):
+            return item, f"https://www.youtube.com/watch?v={item}"
+        return self.youtube_service.extract_video_id(item), item
+
+    async def resolve_items(self, items: List[str])->Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
+        """
+        Splits the submitted items into the (video_id, url) pairs that still have to be ingested
+        and the status events for invalid, duplicate and already stored items.
+        """
+        pending: List[Tuple[str, str]]=[]
+        events: List[Dict[str, Any]]=[]
+        seen=set()
+        for item in items:
+            video_id, url=self._resolve_item(item)
+            if not video_id:
+                events.append({"item": item, "video_id": None, "status": "invalid", "detail": "Invalid YouTube URL or video id"})
+                continue
+            if video_id in seen:
+                events.append({"item": item, "video_id": video_id, "status": "skipped", "detail": "duplicate in request"})
+                continue
+            seen.add(video_id)
+            pending.append((video_id, url))
+
+        statuses=await asyncio.gather(*(asyncio.to_thread(self.video_mongo_repo.get_embedding_status, video_id) for video_id, _ in pending))
+        remaining=[]
+        for (video_id, url), status in zip(pending, statuses):
+            # Videos whose embedding failed stay in the list; their ingest resumes from the stored chunks.
+            if status in ("ready", "running"):
+                events.append({"item": url, "video_id": video_id, "status": "skipped", "detail": "already stored"})
+            else:
+                remaining.append((video_id, url))
+        return remaining, events
+
+    async def run(self, items: List[str])->AsyncIterator[Dict[str, Any]]:
+        """Ingests the items in this process and yields per-video status events until all are finished."""
+        remaining, events=await self.resolve_items(items)
+        for event in events:
+            yield event
+        if not remaining:
+            return
+
+        queue: asyncio.Queue=asyncio.Queue()
+        in_flight=asyncio.Semaphore(self.max_in_flight)
+
+        async def ingest_one(video_id: str, url: str)->None:
+            async with in_flight:
+                started=time.perf_counter()
+
+                async def report(stage: str, progress: float, detail: Optional[Dict[str, Any]]=None)->None:
+                    await queue.put({"item": url, "video_id": video_id, "status": "running", "stage": stage, "progress": progress, "detail": detail})
+
+                try:
+                    result=await self.video_ingest_service.ingest_video(video_id, url, report)
+                    await queue.put({"item": url, "video_id": video_id, "status": "done", "seconds": time.perf_counter()-started, "result": result})
+                except Exception as e:
+                    await queue.put({"item": url, "video_id": video_id, "status": "failed", "seconds": time.perf_counter()-started, "error": str(e)})
+
+        for video_id, url in remaining:
+            yield {"item": url, "video_id": video_id, "status": "queued"}
+        tasks=[asyncio.create_task(ingest_one(video_id, url)) for video_id, url in remaining]
+        try:
+            finished=0
+            while finished<len(tasks):
+                event=await queue.get()
+                if event["status"] in TERMINAL_STATUSES:
+                    finished+=1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit_and_watch(
+            self,
+            items: List[str],
+            job_queue_service: JobQueueService,
+            poll_interval_seconds: float=2.0
+    )->AsyncIterator[Dict[str, Any]]:
+        """
+        Enqueues one ingest_video job per remaining video and yields an event whenever a job's
+        status or stage changes. The jobs keep running if the caller stops watching.
+        """
+        remaining, events=await self.resolve_items(items)
+        for event in events:
+            yield event
+
+        jobs={}
+        last_seen: Dict[str, Tuple]={}
+        for video_id, url in remaining:
+            job=await job_queue_service.enqueue("ingest_video", {"video_id": video_id, "url": url}, dedupe_key=video_id)
+            jobs[job.job_id]=(video_id, url)
+            last_seen[job.job_id]=(job.status, job.stage)
+            yield {"item": url, "video_id": video_id, "status": "queued", "job_id": job.job_id, "status_url": f"/videos/jobs/{job.job_id}"}
+
+        while jobs:
+            for job_id, (video_id, url) in list(jobs.items()):
+                job=await job_queue_service.get_job(job_id)
+                if job is None:
+                    continue
+                state=(job.status, job.stage)
+                if last_seen.get(job_id)!=state:
+                    last_seen[job_id]=state
+                    event={"item": url, "video_id": video_id, "job_id": job_id, "status": job.status, "stage": job.stage, "progress": job.progress}
+                    if job.status=="failed":
+                        event["error"]=job.error
+                    yield event
+                if job.status in TERMINAL_STATUSES:
+                    del jobs[job_id]
+            if jobs:
+                await asyncio.sleep(poll_interval_seconds)
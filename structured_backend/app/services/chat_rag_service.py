@@ -52,9 +52,7 @@ class ChatRAGService:
 
         self.chat_rag_chain=(
             RunnablePassthrough.assign(
-                context=lambda x:self.rag_service._get_retriever_chain(
-                    x["question"],x["video_id"]
-                ),
+                context=self.rag_service.retriever,
                 chat_history=lambda x: x["chat_history_for_llm"]
             )
             | self.chat_prompt
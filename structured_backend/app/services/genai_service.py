@@ -1,16 +1,44 @@
+import asyncio
 import json
 import re
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
 from langchain_google_vertexai import ChatVertexAI
 from langchain.prompts import PromptTemplate, ChatPromptTemplate
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import PydanticOutputParser
+from app.core.metrics import metrics
 from app.core.schema import VideoDescription
 
 class GenAIService:
-    def __init__(self, llm: ChatVertexAI):
+    def __init__(
+            self,
+            llm: ChatVertexAI,
+            map_reduce_threshold_chars: int=60000,
+            map_window_chars: int=20000,
+            map_concurrency: int=4,
+            description_token_budget: int=4000
+    ):
         self.llm=llm
+        # Prompt budget for the "budgeted" mode, which only sends the most representative chunks.
+        self.description_token_budget=description_token_budget
+        # Transcripts longer than map_reduce_threshold_chars are summarized window by window
+        # and the partial summaries are merged into the final description.
+        self.map_reduce_threshold_chars=map_reduce_threshold_chars
+        # map_concurrency caps the map calls in flight across every description this service generates,
+        # so concurrent long ingests cannot multiply the LLM load.
+        self.map_concurrency=map_concurrency
+        self._map_semaphore: Optional[asyncio.Semaphore]=None
+        self._map_semaphore_loop=None
+        self.window_splitter=RecursiveCharacterTextSplitter(
+            chunk_size=map_window_chars,
+            chunk_overlap=0,
+            length_function=len,
+            is_separator_regex=False,
+        )
         self.parser=PydanticOutputParser(pydantic_object=VideoDescription)
         self.prompt_template=ChatPromptTemplate.from_messages(
             [
@@ -22,23 +50,193 @@ class GenAIService:
                  ("user","Transcript:\n{transcript}")
             ]
         )
+        self.map_prompt_template=ChatPromptTemplate.from_messages(
+            [
+                ("system",
+                 "You are summarizing one section of a long YouTube video transcript (section {index} of {total}). "
+                 "List the main points, the key terms and any named tools, people or concepts as concise bullet points. "
+                 "Only use information from this section."),
+                 ("user","Transcript section:\n{transcript}")
+            ]
+        )
+        self.reduce_prompt_template=ChatPromptTemplate.from_messages(
+            [
+                ("system",
+                 "As an expert video content analyst, your task is to generate a structured description of a YouTube video from the summaries of its consecutive sections. The output MUST be a strict JSON object.\n"
+                 "Generate a concise and descriptive title, relevant keywords, appropriate category tags, a detailed description broken down into key points covering the whole video, and a brief summary. "
+                 "The output must conform to the following format instructions:\n{format_instructions}\n"
+                 "Your response should ONLY contain the JSON object and nothing else."),
+                 ("user","Section summaries, in order:\n{summaries}")
+            ]
+        )
 
-        self.chain=(
+        # The generation chains stop at the LLM message so its usage metadata can be read before parsing.
+        self.generation_chain=(
             {"transcript": RunnablePassthrough(),
              "format_instructions": lambda x: self.parser.get_format_instructions()}
              | self.prompt_template
              | self.llm
-             | self.parser
+        )
+        self.chain=self.generation_chain | self.parser
+        self.map_chain=self.map_prompt_template | self.llm
+        self.reduce_chain=(
+            RunnablePassthrough.assign(format_instructions=lambda x: self.parser.get_format_instructions())
+            | self.reduce_prompt_template
+            | self.llm
         )
 
-    async def generate_video_description(self, transcript_text: str)-> VideoDescription:
+    @staticmethod
+    def _usage(message)->Dict[str, int]:
+        usage=getattr(message, "usage_metadata", None) or {}
+        return {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+
+    def _record_stage(self, stats: Dict[str, Any], stage: str, started: float, usages: List[Dict[str, int]])->None:
+        seconds=time.perf_counter()-started
+        stats["stages"][stage]={
+            "seconds": seconds,
+            "input_tokens": sum(usage["input_tokens"] for usage in usages),
+            "output_tokens": sum(usage["output_tokens"] for usage in usages),
+        }
+        metrics.observe(f"description.{stage}", seconds)
+        metrics.incr("description.input_tokens", stats["stages"][stage]["input_tokens"])
+        metrics.incr("description.output_tokens", stats["stages"][stage]["output_tokens"])
+
+    def _map_slot(self)->asyncio.Semaphore:
+        """Returns the shared map-call semaphore, bound to the running event loop."""
+        loop=asyncio.get_running_loop()
+        if self._map_semaphore_loop is not loop:
+            self._map_semaphore=asyncio.Semaphore(self.map_concurrency)
+            self._map_semaphore_loop=loop
+        return self._map_semaphore
+
+    async def _summarize_windows(self, windows: List[str])->Tuple[List[str], List[Dict[str, int]]]:
+        """Map step: summarizes every transcript window, at most map_concurrency calls at a time service-wide."""
+        semaphore=self._map_slot()
+
+        async def summarize(index: int, window: str):
+            async with semaphore:
+                return await self.map_chain.ainvoke({"index": index+1, "total": len(windows), "transcript": window})
+
+        messages=await asyncio.gather(*(summarize(i, window) for i, window in enumerate(windows)))
+        return [str(message.content).strip() for message in messages], [self._usage(message) for message in messages]
+
+    async def generate_video_description_with_stats(self, transcript_text: str)->Tuple[VideoDescription, Dict[str, Any]]:
         """
-        Generates a structured video description from a transcript using the LLM.
-        The chain now handles both the generation and the parsing of the output.
+        Generates the structured video description and returns it with per-stage latency and token counts.
+        Short transcripts go through a single prompt; long ones are map-reduced.
         """
+        started=time.perf_counter()
+        stats: Dict[str, Any]={"mode": "single", "transcript_chars": len(transcript_text), "stages": {}}
         try:
-            result: VideoDescription=await self.chain.ainvoke({"transcript": transcript_text})
-            return result
+            if len(transcript_text)<=self.map_reduce_threshold_chars:
+                message=await self.generation_chain.ainvoke({"transcript": transcript_text})
+                self._record_stage(stats, "single", started, [self._usage(message)])
+            else:
+                windows=self.window_splitter.split_text(transcript_text)
+                stats["mode"]="map_reduce"
+                stats["windows"]=len(windows)
+                summaries, usages=await self._summarize_windows(windows)
+                self._record_stage(stats, "map", started, usages)
+
+                reduce_started=time.perf_counter()
+                summaries_text="\n\n".join(f"Section {i+1}:\n{summary}" for i, summary in enumerate(summaries))
+                message=await self.reduce_chain.ainvoke({"summaries": summaries_text})
+                self._record_stage(stats, "reduce", reduce_started, [self._usage(message)])
+
+            result: VideoDescription=await self.parser.ainvoke(message)
+            stats["total_seconds"]=time.perf_counter()-started
+            return result, stats
         except Exception as e:
             print(f"Error during video description generation: {e}")
             raise RuntimeError(f"Failed to generate description: {e}") from e
+
+    @staticmethod
+    def _estimate_tokens(text: str)->int:
+        return len(text)//4+1
+
+    def select_representative_chunks(self, chunks: List[str], embeddings: List[List[float]], token_budget: int)->List[int]:
+        """
+        Picks the indices of the chunks that best cover the video within token_budget.
+        The normalized embeddings are clustered with k-means, where k is the number of average-sized chunks
+        that fit the budget. From each cluster, largest first, the chunk closest to the centroid is taken
+        while it still fits. The indices are returned in transcript order.
+        """
+        tokens=np.array([self._estimate_tokens(chunk) for chunk in chunks])
+        if tokens.sum()<=token_budget:
+            return list(range(len(chunks)))
+
+        vectors=np.asarray(embeddings, dtype=np.float32)
+        vectors/=np.linalg.norm(vectors, axis=1, keepdims=True)+1e-12
+        k=int(min(len(chunks), max(1, token_budget//max(int(tokens.mean()), 1))))
+
+        # k-means++ seeding with a fixed seed, so the same video always yields the same selection.
+        rng=np.random.default_rng(0)
+        centroids=[vectors[rng.integers(len(vectors))]]
+        for _ in range(1, k):
+            distances=np.min(1.0-vectors@np.array(centroids).T, axis=1).clip(min=0)
+            total=distances.sum()
+            probabilities=distances/total if total>0 else None
+            centroids.append(vectors[rng.choice(len(vectors), p=probabilities)])
+        centroids=np.array(centroids)
+        for _ in range(10):
+            labels=np.argmax(vectors@centroids.T, axis=1)
+            for cluster in range(k):
+                members=vectors[labels==cluster]
+                if len(members):
+                    centroid=members.mean(axis=0)
+                    centroids[cluster]=centroid/(np.linalg.norm(centroid)+1e-12)
+        labels=np.argmax(vectors@centroids.T, axis=1)
+        similarity=np.einsum("ij,ij->i", vectors, centroids[labels])
+
+        selected: List[int]=[]
+        used=0
+        for cluster in np.argsort(-np.bincount(labels, minlength=k)):
+            members=np.flatnonzero(labels==cluster)
+            if not len(members):
+                continue
+            best=int(members[np.argmax(similarity[members])])
+            if used+tokens[best]<=token_budget:
+                selected.append(best)
+                used+=int(tokens[best])
+        return sorted(selected)
+
+    async def generate_budgeted_video_description_with_stats(
+            self,
+            chunks: List[str],
+            embeddings: List[List[float]],
+            token_budget: Optional[int]=None
+    )->Tuple[VideoDescription, Dict[str, Any]]:
+        """
+        Budgeted mode: generates the description from the most representative transcript chunks,
+        selected with the chunk embeddings computed at ingest, instead of the full transcript.
+        """
+        token_budget=token_budget or self.description_token_budget
+        started=time.perf_counter()
+        selected=await asyncio.to_thread(self.select_representative_chunks, chunks, embeddings, token_budget)
+        excerpts="\n[...]\n".join(chunks[i] for i in selected)
+        select_seconds=time.perf_counter()-started
+        metrics.observe("description.select", select_seconds)
+
+        result, stats=await self.generate_video_description_with_stats(
+            f"(Representative excerpts of the transcript, in order)\n{excerpts}"
+        )
+        full_tokens=sum(self._estimate_tokens(chunk) for chunk in chunks)
+        stats.update({
+            "mode": "budgeted",
+            "chunks_total": len(chunks),
+            "chunks_selected": len(selected),
+            "estimated_transcript_tokens": full_tokens,
+            "estimated_prompt_tokens": self._estimate_tokens(excerpts),
+            "total_seconds": stats["total_seconds"]+select_seconds,
+        })
+        stats["stages"]["select"]={"seconds": select_seconds}
+        return result, stats
+
+    async def generate_video_description(self, transcript_text: str)-> VideoDescription:
+        """
+        Generates a structured video description from a transcript using the LLM.
+        Transcripts up to map_reduce_threshold_chars go through a single prompt; longer ones are
+        split into windows that are summarized (map) and merged into the description (reduce).
+        """
+        result, _=await self.generate_video_description_with_stats(transcript_text)
+        return result
@@ -0,0 +1,220 @@
+import asyncio
+import socket
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.metrics import metrics
+from app.core.single_flight import KeyedLock
+from app.core.schema import JobDBEntry
+
+ProgressCallback=Callable[..., Awaitable[None]]
+TERMINAL_JOB_STATUSES=("done", "failed")
+JobHandler=Callable[[JobDBEntry, ProgressCallback], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobQueueService:
+    """
+    Drains the background job queue with a pool of asyncio workers.
+    The queue itself lives in a job repository (Mongo, or in-memory for tests), so workers can run
+    inside the API process or in a separate process started with `python -m app.worker`.
+    """
+
+    def __init__(
+            self,
+            job_repository,
+            num_workers: int=2,
+            poll_interval_seconds: float=1.0,
+            stale_after_seconds: float=900
+    ):
+        self.job_repository=job_repository
+        self.num_workers=num_workers
+        self.poll_interval_seconds=poll_interval_seconds
+        self.stale_after_seconds=stale_after_seconds
+        self.handlers: Dict[str, JobHandler]={}
+        self.retry_policies: Dict[str, tuple]={}
+        self._worker_tasks: List[asyncio.Task]=[]
+        self._enqueue_locks=KeyedLock()
+        self._worker_prefix=f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        # Wakes in-process watchers as soon as a job changes; watchers of jobs run by other processes poll.
+        self._watchers: Dict[str, Set[asyncio.Event]]={}
+
+    def register_handler(self, job_type: str, handler: JobHandler, max_attempts: int=1, retry_delay_seconds: float=60)->None:
+        """Registers the handler for a job type. Failed jobs are retried with exponential delay until max_attempts."""
+        self.handlers[job_type]=handler
+        self.retry_policies[job_type]=(max_attempts, retry_delay_seconds)
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], delay_seconds: float=0, dedupe_key: Optional[str]=None)->JobDBEntry:
+        """
+        Creates a job. With a dedupe_key, an already queued or running job of the same type and key is
+        returned instead, so concurrent submissions of the same work share one job, also across processes.
+        """
+        if job_type not in self.handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+        not_before=datetime.utcnow()+timedelta(seconds=delay_seconds) if delay_seconds else None
+        if dedupe_key is None:
+            job=await asyncio.to_thread(self.job_repository.create_job, job_type, payload, not_before)
+        else:
+            # The in-process lock saves round trips; the repository enforces one active job per key across processes.
+            async with self._enqueue_locks.lock(f"{job_type}:{dedupe_key}"):
+                while True:
+                    existing=await asyncio.to_thread(self.job_repository.find_active_job, job_type, dedupe_key)
+                    if existing is not None:
+                        metrics.incr(f"jobs.{job_type}.coalesced")
+                        return existing
+                    job=await asyncio.to_thread(self.job_repository.create_job, job_type, payload, not_before, dedupe_key)
+                    if job is not None:
+                        break
+                    # Another process created the job between the two calls; return that one (or retry if it already ended).
+        metrics.incr(f"jobs.{job_type}.enqueued")
+        return job
+
+    async def get_job(self, job_id: str)->Optional[JobDBEntry]:
+        return await asyncio.to_thread(self.job_repository.get_job, job_id)
+
+    def _notify(self, job_id: str)->None:
+        for event in self._watchers.get(job_id, ()):
+            event.set()
+
+    async def watch_job(self, job_id: str, poll_interval_seconds: float=1.0)->AsyncIterator[JobDBEntry]:
+        """
+        Yields the job every time its status, stage, progress or detail changes, until it is done or failed.
+        Updates made in this process wake the watcher immediately; otherwise the job is re-read every poll interval.
+        """
+        changed=asyncio.Event()
+        self._watchers.setdefault(job_id, set()).add(changed)
+        last_state=None
+        try:
+            while True:
+                changed.clear()
+                job=await self.get_job(job_id)
+                if job is None:
+                    return
+                state=(job.status, job.stage, job.progress, job.detail)
+                if state!=last_state:
+                    last_state=state
+                    yield job
+                if job.status in TERMINAL_JOB_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            watchers=self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(changed)
+                if not watchers:
+                    del self._watchers[job_id]
+
+    def _close_stage(self, job_type: str, stage_state: Dict[str, Any], next_stage: Optional[str])->None:
+        """Records how long the job spent in its current stage once it moves to another one."""
+        if stage_state["stage"]==next_stage:
+            return
+        now=time.perf_counter()
+        if stage_state["stage"] is not None:
+            metrics.observe(f"jobs.{job_type}.stage.{stage_state['stage']}", now-stage_state["since"])
+        stage_state["stage"]=next_stage
+        stage_state["since"]=now
+
+    def _progress_reporter(self, job: JobDBEntry, stage_state: Dict[str, Any])->ProgressCallback:
+        async def report(stage: str, progress: float, detail: Optional[Dict[str, Any]]=None)->None:
+            self._close_stage(job.job_type, stage_state, stage)
+            await asyncio.to_thread(self.job_repository.update_job, job.job_id, stage=stage, progress=progress, detail=detail)
+            self._notify(job.job_id)
+        return report
+
+    async def _heartbeat(self, job: JobDBEntry)->None:
+        """
+        Touches the job's updated_at every stale_after_seconds/3 while its handler runs, so a long step that
+        reports no progress (such as a map-reduce description) is not requeued as stale and run twice.
+        """
+        while True:
+            await asyncio.sleep(self.stale_after_seconds/3)
+            try:
+                await asyncio.to_thread(self.job_repository.update_job, job.job_id)
+            except Exception as e:
+                print(f"Heartbeat for job {job.job_id} failed: {e}")
+
+    async def _run_job(self, job: JobDBEntry)->None:
+        handler=self.handlers[job.job_type]
+        print(f"Worker {job.worker_id} started job {job.job_id} ({job.job_type})")
+        stage_state: Dict[str, Any]={"stage": None, "since": time.perf_counter()}
+        try:
+            with metrics.timer(f"jobs.{job.job_type}"):
+                heartbeat=asyncio.create_task(self._heartbeat(job))
+                try:
+                    result=await handler(job, self._progress_reporter(job, stage_state))
+                finally:
+                    heartbeat.cancel()
+                    self._close_stage(job.job_type, stage_state, None)
+            await asyncio.to_thread(
+                self.job_repository.update_job, job.job_id,
+                status="done", stage="done", progress=1.0, result=result, error=None, finished_at=datetime.utcnow()
+            )
+            self._notify(job.job_id)
+            metrics.incr(f"jobs.{job.job_type}.done")
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so another worker picks it up.
+            await asyncio.to_thread(self.job_repository.update_job, job.job_id, status="queued", worker_id=None)
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            max_attempts, retry_delay_seconds=self.retry_policies.get(job.job_type, (1, 0))
+            if job.attempts<max_attempts:
+                delay=retry_delay_seconds*(2**(job.attempts-1))
+                await asyncio.to_thread(
+                    self.job_repository.update_job, job.job_id,
+                    status="queued", worker_id=None, error=str(e), not_before=datetime.utcnow()+timedelta(seconds=delay)
+                )
+                self._notify(job.job_id)
+                metrics.incr(f"jobs.{job.job_type}.retried")
+                return
+            await asyncio.to_thread(
+                self.job_repository.update_job, job.job_id,
+                status="failed", error=str(e), finished_at=datetime.utcnow()
+            )
+            self._notify(job.job_id)
+            metrics.incr(f"jobs.{job.job_type}.failed")
+
+    async def _worker_loop(self, worker_id: str)->None:
+        job_types=list(self.handlers)
+        while True:
+            try:
+                stale_before=datetime.utcnow()-timedelta(seconds=self.stale_after_seconds)
+                await asyncio.to_thread(self.job_repository.requeue_stale_jobs, stale_before)
+                job=await asyncio.to_thread(self.job_repository.claim_next_job, worker_id, job_types)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Worker {worker_id} failed to poll the job queue: {e}")
+                job=None
+            if job is None:
+                await asyncio.sleep(self.poll_interval_seconds)
+                continue
+            await self._run_job(job)
+
+    def start(self)->None:
+        """Starts the worker pool on the running event loop."""
+        if self._worker_tasks:
+            return
+        for i in range(self.num_workers):
+            worker_id=f"{self._worker_prefix}-{i}"
+            self._worker_tasks.append(asyncio.create_task(self._worker_loop(worker_id)))
+        print(f"Started {self.num_workers} job workers.")
+
+    async def stop(self)->None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks=[]
+
+    async def run_forever(self)->None:
+        """Runs the worker pool until cancelled; used by the standalone worker process."""
+        self.start()
+        try:
+            await asyncio.gather(*self._worker_tasks)
+        finally:
+            await self.stop()
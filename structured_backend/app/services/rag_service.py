@@ -1,20 +1,39 @@
 # app/services/rag_service.py
+import asyncio
 from typing import List, Optional
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from langchain_google_vertexai import ChatVertexAI
-from langchain_mongodb import MongoDBAtlasVectorSearch
+from app.core.answer_cache import SemanticAnswerCache
+from app.core.metrics import metrics
+from app.repositories.vector_repository import VectorRepository
+from app.repositories.video_mongodb_repository import VideoMongoDBRepository
+
+NO_CONTEXT = "No relevant video context found."
 
 class BasicRAGService:
     """
     Component 1: A core RAG service that answers a query using a vector store,
     without any conversation history.
     """
-    def __init__(self, llm: ChatVertexAI, vector_store: MongoDBAtlasVectorSearch):
+    def __init__(
+            self,
+            llm: ChatVertexAI,
+            vector_repository: VectorRepository,
+            retrieval_timeout_seconds: Optional[float] = 10.0,
+            answer_cache: Optional[SemanticAnswerCache] = None,
+            video_mongo_repo: Optional[VideoMongoDBRepository] = None
+    ):
         self.llm = llm
-        self.vector_store = vector_store
+        self.vector_repository = vector_repository
+        # Answers to video-scoped questions are reused for semantically equivalent later questions.
+        self.answer_cache = answer_cache
+        # Answers are only cached once the video's embedding_status is "ready", so none come from a partial chunk set.
+        self.video_mongo_repo = video_mongo_repo
+        # A retrieval that takes longer than this is abandoned and the question is answered without context.
+        self.retrieval_timeout_seconds = retrieval_timeout_seconds
 
         self.prompt = ChatPromptTemplate.from_messages(
             [
@@ -28,43 +47,84 @@ class BasicRAGService:
                 ("user", "Context: {context}\nQuestion: {question}"),
             ]
         )
-        self.rag_chain = (
-            RunnablePassthrough.assign(
-                # Use .get() to safely handle missing 'video_id' key
-                context=lambda x: self._get_retriever_chain(
-                    x["question"], x.get("video_id")
-                ),
-            )
-            | self.prompt
-            | self.llm
-            | StrOutputParser()
+        # Retrieval step shared by the RAG chains. ainvoke takes the async path (native async embedding,
+        # Mongo work in worker threads, bounded by retrieval_timeout_seconds), so it never blocks the event loop.
+        self.retriever = RunnableLambda(
+            # Use .get() to safely handle missing 'video_id' key.
+            lambda x: self._get_retriever_chain(x["question"], x.get("video_id")),
+            afunc=lambda x: self._aget_retriever_chain(x["question"], x.get("video_id")),
         )
+        self.answer_chain = self.prompt | self.llm | StrOutputParser()
+        self.rag_chain = RunnablePassthrough.assign(context=self.retriever) | self.answer_chain
 
     def _format_docs(self, docs: List[Document]) -> str:
         if not docs:
-            return "No relevant video context found."
+            return NO_CONTEXT
         return "\n\n".join(doc.page_content for doc in docs)
 
     def _get_retriever_chain(self, question: str, video_id: Optional[str]):
-        # Initialize a base dictionary with the required 'k' parameter.
-        search_kwargs = {"k": 5, "pre_filter":None}
+        # Only restrict the search to one video when a video_id is provided.
+        pre_filter = {"video_id": video_id} if video_id else None
+        docs = self.vector_repository.similarity_search_query(question, k=5, filter=pre_filter)
+        return self._format_docs(docs)
 
-        # Conditionally add the 'pre_filter' key only if video_id is provided.
-        if video_id:
-            search_kwargs["pre_filter"] = {"video_id": video_id}
+    async def _aget_retriever_chain(self, question: str, video_id: Optional[str]):
+        """
+        Async version of _get_retriever_chain using the native async embedding API, bounded by retrieval_timeout_seconds
+        overall; the repository also bounds the embedding call and each Mongo query, which stops abandoned work.
+        """
+        pre_filter = {"video_id": video_id} if video_id else None
+        try:
+            with metrics.timer("rag.retrieval"):
+                docs = await asyncio.wait_for(
+                    self.vector_repository.asimilarity_search_query(question, k=5, filter=pre_filter),
+                    timeout=self.retrieval_timeout_seconds,
+                )
+        except asyncio.TimeoutError as e:
+            metrics.incr("rag.retrieval_timeouts")
+            # The repository's own timeouts carry a message; asyncio.wait_for's does not.
+            print(f"Retrieval timed out for video_id:{video_id}: {e or f'exceeded {self.retrieval_timeout_seconds}s'}")
+            docs = []
+        return self._format_docs(docs)
 
-        # The search_kwargs dictionary now has a clear and correct structure
-        # for the type checker.
-        retriever = self.vector_store.as_retriever(search_kwargs=search_kwargs)
+    async def _video_ready(self, video_id: str) -> bool:
+        if self.video_mongo_repo is None:
+            return True
+        return await asyncio.to_thread(self.video_mongo_repo.get_embedding_status, video_id) == "ready"
 
-        return self._format_docs(retriever.invoke(question))
+    async def _cache_answer(self, video_id: str, query_vector: List[float], response: str, generation: int) -> None:
+        try:
+            if await self._video_ready(video_id):
+                self.answer_cache.put("chat_once", video_id, query_vector, response, generation=generation)
+        except Exception as e:
+            print(f"Answer cache put failed: {e}")
 
-    async def get_response(self, query_text: str, video_id: Optional[str] = None) -> str:
-        """Generates a response to a single query using RAG."""
+    async def get_response(self, query_text: str, video_id: Optional[str] = None, use_cache: bool = True) -> str:
+        """
+        Generates a response to a single query using RAG. For a video-scoped question with use_cache,
+        a cached answer to a semantically equivalent question is returned without calling the LLM.
+        """
+        query_vector = None
+        if use_cache and video_id and self.answer_cache is not None:
+            # The cache is an optimization only: if its lookup fails, the question is answered uncached.
+            try:
+                generation = self.answer_cache.generation(video_id)
+                query_vector = await self.vector_repository.aembed_query(query_text)
+                cached = self.answer_cache.lookup("chat_once", video_id, query_vector)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                print(f"Answer cache lookup failed, answering uncached: {e}")
+                query_vector = None
         try:
             # Pass video_id in the input dictionary
-            response = await self.rag_chain.ainvoke({"question": query_text, "video_id": video_id})
+            inputs = {"question": query_text, "video_id": video_id}
+            context = await self.retriever.ainvoke(inputs)
+            response = await self.answer_chain.ainvoke({**inputs, "context": context})
+            # Answers given without context (nothing found, or retrieval timed out) are not worth reusing.
+            if query_vector is not None and context != NO_CONTEXT:
+                await self._cache_answer(video_id, query_vector, response, generation)
             return response
         except Exception as e:
             print(f"Error in BasicRAGService: {e}")
-            return f"Error generating response: {e}"
\ No newline at end of file
+            return f"Error generating response: {e}"
@@ -1,14 +1,16 @@
 
 
 import sys
+import asyncio
 from langchain_google_vertexai import ChatVertexAI
 from app.repositories.vector_repository import VectorRepository
+from app.repositories.video_mongodb_repository import VideoMongoDBRepository
+from app.core.answer_cache import SemanticAnswerCache
 from app.core.schema import TimestampEntry, TimestampResponse
 from langchain.output_parsers import PydanticOutputParser
-from typing import List, Dict
+from typing import List, Dict, Optional
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 
 class TimestampService:
     """
@@ -16,9 +18,43 @@ class TimestampService:
     using a Retrieval-Augmented Generation (RAG) approach.
     """
 
-    def __init__(self, llm: ChatVertexAI, vector_repository: VectorRepository):
+    def __init__(
+            self,
+            llm: ChatVertexAI,
+            vector_repository: VectorRepository,
+            answer_cache: Optional[SemanticAnswerCache]=None,
+            video_mongo_repo: Optional[VideoMongoDBRepository]=None
+    ):
         self.llm=llm
         self.vector_repository=vector_repository
+        # Timestamps found for a query are reused for semantically equivalent later queries about the same video.
+        self.answer_cache=answer_cache
+        # Timestamps are only cached once the video's embedding_status is "ready", so none come from a partial chunk set.
+        self.video_mongo_repo=video_mongo_repo
+        # The parser, prompt and chain are built once; the query and its retrieved context are passed at invoke time.
+        self.parser=PydanticOutputParser(pydantic_object=TimestampResponse)
+        self.prompt=ChatPromptTemplate.from_messages(
+            [
+                ("system",
+                 "You are an expert assistant at extracting precise timestamps from video transcripts. "
+                 "Given the user's query and relevant transcript segments, "
+                 "identify the most precise start times where the topic '{query}' is discussed. "
+                 "Only provide timestamps from the provided segments.\n\n"
+                 "Transcript Segments:\n{context}\n\n"
+                 "Provide a list of up to 3 relevant timestamps and a very brief (1-2 sentences) snippet of "
+                 "the text that directly relates to that timestamp. If the topic is not clearly present, "
+                 "return an empty list. "
+                 "Do not make up answers or timestamps. "
+                 "Format your final output as a single JSON object that conforms to the following schema:\n{format_instructions}"
+                ),
+                ("user", "Query: {query}"),
+            ]
+        )
+        self.timestamp_rag_chain=(
+            self.prompt.partial(format_instructions=self.parser.get_format_instructions())
+            | self.llm
+            | self.parser
+        )
 
     def _format_timestamp(self, seconds: float)->str:
         """Converts seconds into a human-readable HH:MM:SS or MM:SS format."""
@@ -40,52 +76,53 @@ class TimestampService:
                 )
         return "\n---\n".join(formatted_segments)
 
+    async def _video_ready(self, video_id: str)->bool:
+        if self.video_mongo_repo is None:
+            return True
+        return await asyncio.to_thread(self.video_mongo_repo.get_embedding_status, video_id)=="ready"
+
+    async def _cache_timestamps(self, namespace: str, video_id: str, query_vector: List[float], results: List[TimestampEntry], generation: int)->None:
+        try:
+            if await self._video_ready(video_id):
+                self.answer_cache.put(namespace, video_id, query_vector, results, generation=generation)
+        except Exception as e:
+            print(f"Answer cache put failed: {e}", file=sys.stderr)
+
     async def get_timestamps_for_query(
-            self, query_text: str, video_id:str, k: int=5
+            self, query_text: str, video_id:str, k: int=5, use_cache: bool=True
     )->List[TimestampEntry]:
         """
         Retrieves the most relevant timestamps for a given query using a RAG chain
-        with structured Pydantic output parsing.
+        with structured Pydantic output parsing. With use_cache, timestamps already found for
+        a semantically equivalent query about the same video are returned without calling the LLM.
         """
         print(f"Searching for timestamps for query: '{query_text}' in  video: {video_id}")
 
+        namespace=f"timestamps:{k}"
+        query_vector=None
+        if use_cache and self.answer_cache is not None:
+            # The cache is an optimization only: if its lookup fails, the query is answered uncached.
+            try:
+                generation=self.answer_cache.generation(video_id)
+                query_vector=await self.vector_repository.aembed_query(query_text)
+                cached=self.answer_cache.lookup(namespace, video_id, query_vector)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                print(f"Answer cache lookup failed, answering uncached: {e}", file=sys.stderr)
+                query_vector=None
         try:
-            retriever_docs=self.vector_repository.similarity_search_query(query=query_text,k=k,filter={"video_id":video_id})
+            retriever_docs=await self.vector_repository.asimilarity_search_query(query=query_text,k=k,filter={"video_id":video_id})
         except Exception as e:
             print(f"Error retrieving documents from vector store: {e}", file=sys.stderr)
             return []
         context=self._format_docs_for_timestamp_llm(retriever_docs)
 
-        parser=PydanticOutputParser(pydantic_object=TimestampResponse)
-        prompt=ChatPromptTemplate.from_messages(
-            [
-                ("system",
-                 "You are an expert assistant at extracting precise timestamps from video transcripts. "
-                 "Given the user's query and relevant transcript segments, "
-                 "identify the most precise start times where the topic '{query}' is discussed. "
-                 "Only provide timestamps from the provided segments.\n\n"
-                 "Transcript Segments:\n{context}\n\n"
-                 "Provide a list of up to 3 relevant timestamps and a very brief (1-2 sentences) snippet of "
-                 "the text that directly relates to that timestamp. If the topic is not clearly present, "
-                 "return an empty list. "
-                 "Do not make up answers or timestamps. "
-                 "Format your final output as a single JSON object that conforms to the following schema:\n{format_instructions}"
-                ),
-                ("user", "Query: {query}"),
-            ]
-        )
-
-        timestamp_rag_chain=(
-            {"context": lambda x: context, "query": RunnablePassthrough(), "format_instructions": lambda x: parser.get_format_instructions()
-            }
-            | prompt
-            | self.llm
-            | parser
-        )
-
         try:
-            response_obj=await timestamp_rag_chain.ainvoke(query_text)
+            response_obj=await self.timestamp_rag_chain.ainvoke({"query": query_text, "context": context})
             print(f"LLM successfully parsed into Pydantic object. ")
+            if query_vector is not None and retriever_docs:
+                await self._cache_timestamps(namespace, video_id, query_vector, response_obj.results, generation)
             return response_obj.results
         except Exception as e:
             print(f"Error in RAG chain or parsing LLM response: {e}", file=sys.stderr)
@@ -1,7 +1,9 @@
 
+import hashlib
+from collections import deque
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.schema import TranscriptEntry
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator
 from langchain_core.documents import Document
 
 
@@ -10,78 +12,106 @@ class TranscriptProcessingService:
     Handles the business logic for converting a raw transcript into a list of LanChain Document objects with aggregates timestamps.
     """
 
-    def __init__(self):
+    def __init__(self, chunk_size: int=1000, chunk_overlap: int=200):
+         self.chunk_size=chunk_size
+         self.chunk_overlap=chunk_overlap
+         # Only used for single segments longer than chunk_size; start_index places each piece in time.
          self.text_splitter= RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
             length_function=len,
             is_separator_regex=False,
+            add_start_index=True,
         )
 
     def process_transcript_to_documents(self, video_id: str, transcript_list: List[Dict])->List[Document]:
-
         """
         Takes a raw transcript list and returns a list of context-rich documents
-        with aggregated timestamps.
+        with aggregated timestamps. Eager form of iter_segment_chunks, the single chunking implementation.
         """
+        return list(self.iter_segment_chunks(video_id, transcript_list))
+
+    @staticmethod
+    def make_chunk_id(video_id: str, ordinal: int, text: str)->str:
+        """Deterministic chunk id: the same transcript and chunk settings always produce the same ids."""
+        digest=hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        return f"{video_id}:{ordinal}:{digest}"
+
+    def _make_document(self, video_id: str, window, ordinal: int)->Document:
+        start_time=min(segment[1] for segment in window)
+        end_time=max(segment[2] for segment in window)
+        text=" ".join(segment[0] for segment in window)
+        return Document(
+            page_content=text,
+            metadata={
+                "video_id": video_id,
+                "source":F"youtube_transcript_{video_id}",
+                "start": start_time,
+                "end":end_time,
+                "duration":end_time-start_time,
+                "chunk_id": self.make_chunk_id(video_id, ordinal, text),
+                "ordinal": ordinal
+            }
+        )
 
-        final_documents_for_embedding=[]
-        full_transcript_text=""
-        original_segments_info=[]
-        current_char_index=0
-
-        for entry in transcript_list:
-            segment_text=entry.get("text","")
-            segment_start=entry.get("start",0.0)
-            segment_duration=entry.get("duration",0.0)
-            segment_end=segment_start + segment_duration
-
-            original_segments_info.append(
-                (segment_text, segment_start, segment_end, current_char_index, current_char_index+len(segment_text))
+    def _split_segment(self, text: str, start: float, end: float)->Iterator[tuple]:
+        """
+        Yields (text, start, end) pieces of at most chunk_size characters. A segment longer than that is cut
+        by the text splitter, and each piece's times are interpolated from its character span in the segment.
+        """
+        if len(text)<=self.chunk_size:
+            yield (text, start, end)
+            return
+        seconds_per_char=(end-start)/len(text)
+        for piece in self.text_splitter.create_documents([text]):
+            piece_start=piece.metadata["start_index"]
+            yield (
+                piece.page_content,
+                start+piece_start*seconds_per_char,
+                start+(piece_start+len(piece.page_content))*seconds_per_char,
             )
-            full_transcript_text+=segment_text+" "
-            current_char_index+=len(segment_text)+1
-
-        text_chunks=self.text_splitter.split_text(full_transcript_text)
-
 
+    def iter_segment_chunks(self, video_id: str, transcript_entries: Iterable[Dict])->Iterator[Document]:
+        """
+        Lazily yields Documents cut on transcript-segment boundaries.
 
-        for chunk_content in text_chunks:
-            try:
-                chunk_char_start=full_transcript_text.index(chunk_content)
-                chunk_char_end=chunk_char_start+len(chunk_content)
-            except ValueError:
-                print(f"Warning: Could not find chunk content in full transcript. Skipping chunk: {chunk_content[:50]}...")
+        Segments are accumulated until the next one would push the chunk past chunk_size; the
+        chunk is then yielded with the exact start/end of the segments it contains, and the
+        trailing segments (up to chunk_overlap characters) are carried into the next chunk.
+        Only the current window is held in memory, so the input can itself be a generator.
+        Segments longer than chunk_size are first split (see _split_segment), so no chunk exceeds it.
+        """
+        window=deque()
+        window_length=0
+        has_unemitted=False
+        ordinal=0
+
+        for entry in transcript_entries:
+            segment_text=entry.get("text","").strip()
+            if not segment_text:
                 continue
-
-            min_start_time=float('inf')
-            max_end_time=float('-inf')
-            found_overlap=False
-
-            for _, original_start, original_end, original_char_start, original_char_end in original_segments_info:
-                if(max(chunk_char_start, original_char_start)<min(chunk_char_end,original_char_end)):
-                    min_start_time=min(min_start_time, original_start)
-                    max_end_time=max(max_end_time,original_end)
-                    found_overlap=True
-
-            if found_overlap and min_start_time !=float('inf') and max_end_time != float('-inf'):
-
-                doc=Document(
-                    page_content=chunk_content,
-                    metadata={
-                        "video_id": video_id,
-                        "source":F"youtube_transcript_{video_id}",
-                        "start": min_start_time,
-                        "end":max_end_time,
-                        "duration":max_end_time-min_start_time
-                    }
-                )
-                final_documents_for_embedding.append(doc)
-            else:
-                print(f"Warning: No timestamp overlap found for chunk: {chunk_content[:50]}...Skipping.")
-
-
-        return final_documents_for_embedding
-
-
-
+            segment_start=entry.get("start",0.0)
+            segment_end=segment_start+entry.get("duration",0.0)
+            for piece_text, piece_start, piece_end in self._split_segment(segment_text, segment_start, segment_end):
+                added_length=len(piece_text)+(1 if window else 0)
+
+                if window and has_unemitted and window_length+added_length>self.chunk_size:
+                    yield self._make_document(video_id, window, ordinal)
+                    ordinal+=1
+                    has_unemitted=False
+                    while window and window_length>self.chunk_overlap:
+                        removed=window.popleft()
+                        window_length-=len(removed[0])+(1 if window else 0)
+                    added_length=len(piece_text)+(1 if window else 0)
+                    # The carried overlap plus a full-size piece could still exceed chunk_size.
+                    while window and window_length+added_length>self.chunk_size:
+                        removed=window.popleft()
+                        window_length-=len(removed[0])+(1 if window else 0)
+                        added_length=len(piece_text)+(1 if window else 0)
+
+                window.append((piece_text, piece_start, piece_end))
+                window_length+=added_length
+                has_unemitted=True
+
+        if window and has_unemitted:
+            yield self._make_document(video_id, window, ordinal)
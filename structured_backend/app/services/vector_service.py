@@ -1,7 +1,11 @@
 
+import asyncio
+import time
+from app.core.metrics import metrics
 from app.repositories.vector_repository import VectorRepository
 from app.services.transcript_processing_service import TranscriptProcessingService
-from typing import List,Dict
+from itertools import islice
+from typing import Any,Awaitable,Callable,List,Dict,Iterable,Iterator,Optional,Set,Tuple
 from langchain_core.documents import Document
 
 
@@ -12,9 +16,38 @@ class VectorService:
     This class orchestrates the chunking, timestamp aggregation, and storage process.
     """
 
-    def __init__(self, vector_repository: VectorRepository, transcript_processing_service: TranscriptProcessingService):
+    PIPELINE_STAGES=("fetch", "chunk", "embed", "store")
+
+    def __init__(self, vector_repository: VectorRepository, transcript_processing_service: TranscriptProcessingService, batch_size: int=32, queue_size: int=4):
         self.vector_repository=vector_repository
         self.transcript_processing_service=transcript_processing_service
+        self.batch_size=batch_size
+        self.queue_size=queue_size
+
+    def estimate_chunk_count(self, transcript_list: List[Dict])->int:
+        """Estimates how many chunks the segment chunker will cut, for progress reporting."""
+        total_chars=sum(len(entry.get("text",""))+1 for entry in transcript_list)
+        step=max(self.transcript_processing_service.chunk_size-self.transcript_processing_service.chunk_overlap, 1)
+        return max(1, -(-total_chars//step)) if total_chars else 0
+
+    def _iter_document_batches(
+            self,
+            video_id: str,
+            transcript_list: Iterable[Dict],
+            skip_chunk_ids: Optional[Set[str]]=None,
+            seen_chunk_ids: Optional[Set[str]]=None
+    )->Iterator[List[Document]]:
+        """
+        Groups the lazily chunked documents into batches so each batch is embedded as soon as it is cut.
+        Chunks in skip_chunk_ids are already stored and are left out; every chunk id cut is added to seen_chunk_ids.
+        """
+        documents=self.transcript_processing_service.iter_segment_chunks(video_id=video_id, transcript_entries=transcript_list)
+        if seen_chunk_ids is not None:
+            documents=(doc for doc in documents if not seen_chunk_ids.add(doc.metadata["chunk_id"]))
+        if skip_chunk_ids:
+            documents=(doc for doc in documents if doc.metadata["chunk_id"] not in skip_chunk_ids)
+        while batch:=list(islice(documents, self.batch_size)):
+            yield batch
 
 
     def embed_and_store_transcript(self, video_id: str,transcript_list: List[Dict])->bool:
@@ -27,14 +60,138 @@ class VectorService:
 
         print(f"Preparing chunks for video_id:{video_id}. ")
 
-        final_documents_for_embedding=self.transcript_processing_service.process_transcript_to_documents(video_id=video_id,transcript_list=transcript_list)
+        stored=0
+        try:
+            existing=self.vector_repository.get_stored_chunk_ids(video_id)
+            for batch in self._iter_document_batches(video_id, transcript_list, skip_chunk_ids=existing):
+                self.vector_repository.add_documents_list(documents=batch)
+                stored+=len(batch)
+            if self.vector_repository.lexical_index is not None:
+                self.vector_repository.build_lexical_index(video_id)
+        except Exception:
+            return False
+
+        return stored+len(existing)>0
+
+
+    async def run_ingest_pipeline(
+            self,
+            video_id: str,
+            transcript_list: Optional[List[Dict]]=None,
+            fetch_transcript: Optional[Callable[[str], List[Dict]]]=None,
+            on_batch_stored: Optional[Callable[[int], Awaitable[None]]]=None,
+            on_batch_embedded: Optional[Callable[[List[Document], List[List[float]]], None]]=None,
+            resume: bool=True
+    )->Dict[str, Any]:
+        """
+        Runs fetch -> chunk -> embed -> store as concurrent asyncio stages joined by bounded queues,
+        so storing batch N overlaps with embedding batch N+1 and end-to-end latency tracks the
+        slowest stage. The fetch stage only runs when no transcript_list is given.
+        on_batch_embedded receives every (documents, embeddings) batch, so callers can reuse the vectors.
+        Stored chunks are the checkpoints: with resume, chunks whose deterministic id is already stored
+        are skipped, so a retry only embeds what is missing. Once the run completes, stored chunks of the
+        video that the current chunking did not produce are pruned.
+        Returns per-stage throughput stats; the first failing stage cancels the others and re-raises.
+        """
+        if transcript_list is None and fetch_transcript is None:
+            raise ValueError("Either transcript_list or fetch_transcript must be provided.")
+
+        stats: Dict[str, Any]={stage: {"batches": 0, "items": 0, "busy_seconds": 0.0} for stage in self.PIPELINE_STAGES}
+        existing_chunk_ids: Set[str]=await asyncio.to_thread(self.vector_repository.get_stored_chunk_ids, video_id) if resume else set()
+        seen_chunk_ids: Set[str]=set()
+        embed_queue: asyncio.Queue=asyncio.Queue(maxsize=self.queue_size)
+        store_queue: asyncio.Queue=asyncio.Queue(maxsize=self.queue_size)
+
+        def record(stage: str, items: int, started: float)->None:
+            elapsed=time.perf_counter()-started
+            stats[stage]["batches"]+=1
+            stats[stage]["items"]+=items
+            stats[stage]["busy_seconds"]+=elapsed
+            metrics.observe(f"ingest.{stage}", elapsed)
+            metrics.incr(f"ingest.{stage}.items", items)
+
+        async def chunk_stage():
+            transcript=transcript_list
+            if transcript is None:
+                started=time.perf_counter()
+                transcript=await asyncio.to_thread(fetch_transcript, video_id)
+                record("fetch", len(transcript), started)
+            batches=self._iter_document_batches(video_id, transcript, skip_chunk_ids=existing_chunk_ids, seen_chunk_ids=seen_chunk_ids)
+            while True:
+                started=time.perf_counter()
+                batch=next(batches, None)
+                if batch is None:
+                    break
+                record("chunk", len(batch), started)
+                await embed_queue.put(batch)
+            await embed_queue.put(None)
 
-        if final_documents_for_embedding:
-            try:
-                self.vector_repository.add_documents_list(documents=final_documents_for_embedding)
-                return True
-            except Exception:
-                return False
+        async def embed_stage():
+            while (batch:=await embed_queue.get()) is not None:
+                started=time.perf_counter()
+                embeddings=await self.vector_repository.aembed_documents(batch)
+                record("embed", len(batch), started)
+                if on_batch_embedded is not None:
+                    on_batch_embedded(batch, embeddings)
+                await store_queue.put((batch, embeddings))
+            await store_queue.put(None)
 
-        return False
+        async def store_stage():
+            while (item:=await store_queue.get()) is not None:
+                batch, embeddings=item
+                started=time.perf_counter()
+                await self.vector_repository.astore_embedded_documents(batch, embeddings)
+                record("store", len(batch), started)
+                if on_batch_stored is not None:
+                    await on_batch_stored(stats["store"]["items"]+len(existing_chunk_ids))
+
+        wall_started=time.perf_counter()
+        tasks=[asyncio.create_task(stage()) for stage in (chunk_stage, embed_stage, store_stage)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        wall_seconds=time.perf_counter()-wall_started
+        metrics.observe("ingest.pipeline", wall_seconds)
+
+        resumed=len(existing_chunk_ids&seen_chunk_ids)
+        stats["resumed_chunks"]=resumed
+        # Also drops chunks stored before chunk ids existed, which would otherwise duplicate the new ones.
+        stats["pruned_chunks"]=await asyncio.to_thread(self.vector_repository.delete_chunks, video_id, seen_chunk_ids) if seen_chunk_ids else 0
+        stats["total_chunks"]=stats["store"]["items"]+resumed
+        metrics.incr("ingest.resumed_chunks", resumed)
+        if self.vector_repository.lexical_index is not None:
+            started=time.perf_counter()
+            await asyncio.to_thread(self.vector_repository.build_lexical_index, video_id)
+            stats["lexical_index_seconds"]=time.perf_counter()-started
+
+        for stage in self.PIPELINE_STAGES:
+            busy=stats[stage]["busy_seconds"]
+            stats[stage]["items_per_second"]=stats[stage]["items"]/busy if busy else 0.0
+        stats["wall_seconds"]=wall_seconds
+        print(f"Ingest pipeline for video_id:{video_id} stored {stats['store']['items']} chunks ({resumed} already stored) in {wall_seconds:.2f}s")
+        return stats
+
+    async def aload_chunks_with_embeddings(self, video_id: str)->Tuple[List[str], List[List[float]]]:
+        """Loads a stored video's chunk texts and embeddings in transcript order."""
+        return await asyncio.to_thread(self.vector_repository.get_video_chunks_with_embeddings, video_id)
+
+    async def aembed_and_store_transcript(self, video_id: str,transcript_list: List[Dict])->bool:
+        """
+        Async version of embed_and_store_transcript. Chunking, embedding and storage run as a pipeline.
+        """
+        if not transcript_list:
+            print(f"No transcipt list provided for video ID:{video_id}.Skipping embedding.")
+            return False
+
+        print(f"Preparing chunks for video_id:{video_id}. ")
+
+        try:
+            stats=await self.run_ingest_pipeline(video_id, transcript_list=transcript_list)
+        except Exception as e:
+            print(f"Error embedding and storing chunks for video_id:{video_id}: {e}")
+            return False
 
+        return stats["total_chunks"]>0
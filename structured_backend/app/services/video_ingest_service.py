@@ -0,0 +1,326 @@
+import asyncio
+import contextlib
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.metrics import metrics
+from app.core.schema import VideoDBEntry, VideoDescription
+from app.core.single_flight import SingleFlight
+from app.repositories.lease_mongodb_repository import LeaseMongoDBRepository
+from app.repositories.video_mongodb_repository import VideoMongoDBRepository
+from app.services.genai_service import GenAIService
+from app.services.vector_service import VectorService
+from app.services.youtube_service import YouTubeService
+
+ProgressCallback=Callable[..., Awaitable[None]]
+
+
+async def _no_progress(stage: str, progress: float, detail: Optional[Dict[str, Any]]=None)->None:
+    return None
+
+
+class VideoIngestService:
+    """
+    Runs the full ingest of one video: transcript fetch, description generation,
+    video document insert and transcript embedding. Progress is reported as (stage, fraction, detail).
+    """
+
+    def __init__(
+            self,
+            youtube_service: YouTubeService,
+            genai_service: GenAIService,
+            vector_service: VectorService,
+            video_mongo_repo: VideoMongoDBRepository,
+            lease_repository: Optional[LeaseMongoDBRepository]=None,
+            lease_ttl_seconds: float=120,
+            lease_poll_seconds: float=2.0,
+            stage_limits: Optional[Dict[str, int]]=None,
+            description_mode: str="full"
+    ):
+        self.youtube_service=youtube_service
+        self.genai_service=genai_service
+        self.vector_service=vector_service
+        self.video_mongo_repo=video_mongo_repo
+        self.lease_repository=lease_repository
+        self.lease_ttl_seconds=lease_ttl_seconds
+        self.lease_poll_seconds=lease_poll_seconds
+        self._owner_id=f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self._single_flight=SingleFlight("ingest_video")
+        # Independent caps for the rate-limited upstreams: "transcript", "llm" and "embedding".
+        self.stage_limits=stage_limits or {}
+        self._stage_semaphores: Dict[str, asyncio.Semaphore]={}
+        self._stage_semaphores_loop: Optional[asyncio.AbstractEventLoop]=None
+        # "full" sends the whole transcript (map-reduced when long); "budgeted" sends representative chunks only.
+        self.description_mode=description_mode
+
+    def _stage_slot(self, stage: str):
+        """Returns a context manager holding one slot of the stage's cap, bound to the running event loop."""
+        limit=self.stage_limits.get(stage)
+        if not limit:
+            return contextlib.nullcontext()
+        loop=asyncio.get_running_loop()
+        if self._stage_semaphores_loop is not loop:
+            self._stage_semaphores={}
+            self._stage_semaphores_loop=loop
+        if stage not in self._stage_semaphores:
+            self._stage_semaphores[stage]=asyncio.Semaphore(limit)
+        return self._stage_semaphores[stage]
+
+    async def _in_stage(self, stage: str, coro_fn: Callable[[], Awaitable[Any]])->Any:
+        """Awaits coro_fn() inside the stage's cap and records how long the call queued for a slot."""
+        queued=time.perf_counter()
+        async with self._stage_slot(stage):
+            metrics.observe(f"ingest.{stage}_slot_wait", time.perf_counter()-queued)
+            return await coro_fn()
+
+    async def _describe(self, transcript_text: str, chunk_texts: List[str], chunk_embeddings: List[List[float]]):
+        """Generates the description in the configured mode and returns it with its stats."""
+        if self.description_mode=="budgeted" and chunk_texts:
+            return await self._in_stage("llm", lambda: self.genai_service.generate_budgeted_video_description_with_stats(chunk_texts, chunk_embeddings))
+        return await self._in_stage("llm", lambda: self.genai_service.generate_video_description_with_stats(transcript_text))
+
+    async def ingest_video(self, video_id: str, url: str, report: Optional[ProgressCallback]=None)->Dict[str, Any]:
+        """
+        Ingests one video at most once at a time. Concurrent calls in this process for the same
+        video_id await the in-flight run; across processes a Mongo lease makes latecomers wait for
+        the holder to finish and then return the stored video instead of ingesting it again.
+        """
+        result, shared=await self._single_flight.do(video_id, lambda: self._ingest_with_lease(video_id, url, report))
+        if shared:
+            if report:
+                await report("done", 1.0)
+            return {**result, "coalesced": True}
+        return result
+
+    async def _ingest_with_lease(self, video_id: str, url: str, report: Optional[ProgressCallback])->Dict[str, Any]:
+        if self.lease_repository is None:
+            return await self._ingest_video(video_id, url, report)
+
+        while True:
+            if await asyncio.to_thread(self.video_mongo_repo.get_embedding_status, video_id)=="ready":
+                return {"video_id": video_id, "already_stored": True}
+            if await asyncio.to_thread(self.lease_repository.try_acquire, video_id, self._owner_id, self.lease_ttl_seconds):
+                break
+            if report:
+                await report("waiting_for_inflight_ingest", 0.05)
+            await asyncio.sleep(self.lease_poll_seconds)
+
+        ingest_task=asyncio.create_task(self._ingest_video(video_id, url, report))
+        lease_lost=False
+
+        async def keep_lease_alive():
+            nonlocal lease_lost
+            while True:
+                await asyncio.sleep(self.lease_ttl_seconds/3)
+                try:
+                    renewed=await asyncio.to_thread(self.lease_repository.renew, video_id, self._owner_id, self.lease_ttl_seconds)
+                except Exception as e:
+                    print(f"Renewing the ingest lease for {video_id} failed, retrying: {e}")
+                    continue
+                if not renewed:
+                    # The lease expired and another process may have taken it over; carrying on would ingest twice.
+                    lease_lost=True
+                    ingest_task.cancel()
+                    return
+
+        renew_task=asyncio.create_task(keep_lease_alive())
+        try:
+            return await ingest_task
+        except asyncio.CancelledError:
+            if lease_lost:
+                raise RuntimeError(f"Lost the ingest lease for video {video_id}; the ingest was stopped.")
+            raise
+        finally:
+            renew_task.cancel()
+            await asyncio.to_thread(self.lease_repository.release, video_id, self._owner_id)
+
+    async def _ingest_video(self, video_id: str, url: str, report: Optional[ProgressCallback]=None)->Dict[str, Any]:
+        """
+        Ingests one video. Description generation and embedding both only need the transcript,
+        so they run concurrently. As soon as the description lands the video document is stored
+        with embedding_status "running", so the notebook can open while chunks are still embedding.
+        If embedding fails the description task is cancelled, an early-stored document is marked
+        embedding_status "failed" and the error propagates; the chunks stored so far are kept as
+        checkpoints, so the retry only embeds the rest. If only the description fails the video is stored with
+        description_status "pending" so the description can be retried on its own later.
+        """
+        report=report or _no_progress
+
+        embedding_status=await asyncio.to_thread(self.video_mongo_repo.get_embedding_status, video_id)
+        if embedding_status=="ready":
+            await report("done", 1.0)
+            return {"video_id": video_id, "already_stored": True}
+        if embedding_status is not None:
+            # Stored early but its embedding never finished: only the missing chunks are left to do.
+            return await self.resume_embedding(video_id, report)
+
+        await report("fetching_transcript", 0.05)
+        transcript_list=await self._in_stage("transcript", lambda: asyncio.to_thread(self.youtube_service.fetch_transcript, video_id))
+        transcript_text=self.youtube_service.textify(transcript_list)
+
+        estimated_chunks=self.vector_service.estimate_chunk_count(transcript_list)
+        detail: Dict[str, Any]={"description": "running", "chunks_stored": 0, "chunks_estimated": estimated_chunks, "segments": len(transcript_list)}
+        timings: Dict[str, float]={}
+        description_stats: Dict[str, Any]={}
+        chunk_texts: List[str]=[]
+        chunk_embeddings: List[List[float]]=[]
+        embeddings_ready=asyncio.Event()
+        pipeline_stats: Dict[str, Any]={}
+        stored_early=False
+        await report("transcript_fetched", 0.1, dict(detail))
+
+        def make_entry(description: Optional[VideoDescription], embedding_status: str)->VideoDBEntry:
+            return VideoDBEntry(
+                video_id= video_id,
+                url=url,
+                submitted_at=datetime.utcnow(),
+                transcript= transcript_list,
+                transcript_text=transcript_text,
+                description= description,
+                description_status="ready" if description else "pending",
+                embedding_status=embedding_status,
+                updated_at= datetime.utcnow()
+            )
+
+        def embedding_progress()->float:
+            # Chunks stream in, so the total is an estimate until the pipeline finishes.
+            fraction=min(detail["chunks_stored"]/estimated_chunks, 0.99) if estimated_chunks else 0.0
+            return 0.1+0.8*fraction
+
+        async def on_batch_stored(chunks_stored: int)->None:
+            detail["chunks_stored"]=chunks_stored
+            await report("embedding", embedding_progress(), dict(detail))
+
+        def on_batch_embedded(documents, embeddings)->None:
+            chunk_texts.extend(doc.page_content for doc in documents)
+            chunk_embeddings.extend(embeddings)
+
+        async def describe()->VideoDescription:
+            nonlocal stored_early
+            if self.description_mode=="budgeted":
+                # The budgeted prompt is built from the chunk embeddings, so it starts once they exist.
+                await embeddings_ready.wait()
+                if pipeline_stats.get("resumed_chunks"):
+                    # Chunks from an earlier attempt were not re-embedded here, so read them all back.
+                    loaded_texts, loaded_embeddings=await self.vector_service.aload_chunks_with_embeddings(video_id)
+                    chunk_texts[:]=loaded_texts
+                    chunk_embeddings[:]=loaded_embeddings
+            started=time.perf_counter()
+            try:
+                description, stats=await self._describe(transcript_text, chunk_texts, chunk_embeddings)
+                description_stats.update(stats)
+            finally:
+                timings["description_seconds"]=time.perf_counter()-started
+            detail["description"]="ready"
+            if not embeddings_ready.is_set():
+                stored_early=True
+                await asyncio.to_thread(self.video_mongo_repo.add_video_details, make_entry(description, "running"))
+                metrics.observe("ingest.time_to_description", time.perf_counter()-overlap_started)
+                await report("description_ready", embedding_progress(), dict(detail))
+            return description
+
+        async def embed()->Dict[str, Any]:
+            started=time.perf_counter()
+            try:
+                stats=await self._in_stage("embedding", lambda: self.vector_service.run_ingest_pipeline(
+                    video_id, transcript_list=transcript_list, on_batch_stored=on_batch_stored, on_batch_embedded=on_batch_embedded
+                ))
+                pipeline_stats.update(stats)
+                embeddings_ready.set()
+                return stats
+            finally:
+                timings["embedding_seconds"]=time.perf_counter()-started
+
+        overlap_started=time.perf_counter()
+        describe_task=asyncio.create_task(describe())
+        embed_task=asyncio.create_task(embed())
+        try:
+            stats=await embed_task
+        except BaseException:
+            describe_task.cancel()
+            await asyncio.gather(describe_task, return_exceptions=True)
+            if stored_early:
+                await asyncio.to_thread(self.video_mongo_repo.update_embedding_status, video_id, "failed")
+            raise
+
+        generated_description: Optional[VideoDescription]=None
+        try:
+            generated_description=await describe_task
+        except Exception as e:
+            print(f"Description generation failed for video_id:{video_id}, storing it as pending: {e}")
+            detail["description"]="pending"
+
+        wall_seconds=time.perf_counter()-overlap_started
+        saved_seconds=max(timings.get("description_seconds", 0.0)+timings.get("embedding_seconds", 0.0)-wall_seconds, 0.0)
+        metrics.observe("ingest.describe_and_embed", wall_seconds)
+        metrics.observe("ingest.overlap_saved", saved_seconds)
+
+        await report("storing_video", 0.95, dict(detail))
+        if stored_early:
+            await asyncio.to_thread(self.video_mongo_repo.update_embedding_status, video_id, "ready")
+        else:
+            await asyncio.to_thread(self.video_mongo_repo.add_video_details, make_entry(generated_description, "ready"))
+
+        detail["chunks_stored"]=stats["total_chunks"]
+        await report("done", 1.0, dict(detail))
+        return {
+            "video_id": video_id,
+            "already_stored": False,
+            "chunks": stats["total_chunks"],
+            "resumed_chunks": stats["resumed_chunks"],
+            "description_status": "ready" if generated_description else "pending",
+            "timings": {**timings, "wall_seconds": wall_seconds, "overlap_saved_seconds": saved_seconds},
+            "description_stats": description_stats
+        }
+
+    async def resume_embedding(self, video_id: str, report: Optional[ProgressCallback]=None)->Dict[str, Any]:
+        """
+        Finishes the embedding of a stored video from its stored transcript. Chunks that are already
+        stored are skipped by their deterministic ids, so only the missing ones are embedded.
+        """
+        report=report or _no_progress
+        await report("resuming_embedding", 0.05)
+        await asyncio.to_thread(self.video_mongo_repo.update_embedding_status, video_id, "running")
+        compact=await asyncio.to_thread(self.video_mongo_repo.get_compact_transcript, video_id)
+        transcript_list=compact.entries
+        estimated_chunks=self.vector_service.estimate_chunk_count(transcript_list)
+
+        async def on_batch_stored(chunks_stored: int)->None:
+            fraction=min(chunks_stored/estimated_chunks, 0.99) if estimated_chunks else 0.0
+            await report("embedding", 0.1+0.8*fraction, {"chunks_stored": chunks_stored, "chunks_estimated": estimated_chunks})
+
+        try:
+            stats=await self._in_stage("embedding", lambda: self.vector_service.run_ingest_pipeline(
+                video_id, transcript_list=transcript_list, on_batch_stored=on_batch_stored
+            ))
+        except BaseException:
+            await asyncio.to_thread(self.video_mongo_repo.update_embedding_status, video_id, "failed")
+            raise
+        await asyncio.to_thread(self.video_mongo_repo.update_embedding_status, video_id, "ready")
+        await report("done", 1.0, {"chunks_stored": stats["total_chunks"], "chunks_estimated": estimated_chunks})
+        return {
+            "video_id": video_id,
+            "already_stored": False,
+            "resumed": True,
+            "chunks": stats["total_chunks"],
+            "resumed_chunks": stats["resumed_chunks"],
+        }
+
+    async def regenerate_description(self, video_id: str, report: Optional[ProgressCallback]=None)->Dict[str, Any]:
+        """Generates the description for a stored video whose description is still pending."""
+        report=report or _no_progress
+        video=await asyncio.to_thread(self.video_mongo_repo.get_video, video_id, ["description", "description_status"])
+        if video.get("description_status", "ready")=="ready" and video.get("description") is not None:
+            return {"video_id": video_id, "description_status": "ready"}
+
+        await report("generating_description", 0.1)
+        chunk_texts, chunk_embeddings=[], []
+        if self.description_mode=="budgeted":
+            chunk_texts, chunk_embeddings=await self.vector_service.aload_chunks_with_embeddings(video_id)
+        transcript_text=await asyncio.to_thread(self.video_mongo_repo.get_transcript_text, video_id)
+        generated_description, _=await self._describe(transcript_text, chunk_texts, chunk_embeddings)
+        await asyncio.to_thread(self.video_mongo_repo.update_video_description, video_id, generated_description)
+        return {"video_id": video_id, "description_status": "ready"}
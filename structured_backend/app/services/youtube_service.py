@@ -1,28 +1,59 @@
 from fastapi import HTTPException
 from youtube_transcript_api._api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import (
+    AgeRestricted, InvalidVideoId, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable, VideoUnplayable
+)
+import re
 from urllib.parse import urlparse, parse_qs
+from typing import List, Optional
+from app.core.transcript_cache import TranscriptCache
+
+# YouTube video ids are 11 characters of [A-Za-z0-9_-]; anything else is rejected before it reaches a cache key or file name.
+VIDEO_ID_PATTERN=re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+DEFAULT_TRANSCRIPT_LANGUAGES=["en-GB", "en-IN", "en-CA", "en-AU", "en"]
+
+# Failures that will not go away on a retry soon, so they are cached as negative results.
+PERMANENT_TRANSCRIPT_ERRORS=(AgeRestricted, InvalidVideoId, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable, VideoUnplayable)
 
 
 class YouTubeService:
+    def __init__(self, transcript_cache: Optional[TranscriptCache]=None, languages: Optional[List[str]]=None):
+        self.transcript_cache=transcript_cache
+        self.languages=languages or DEFAULT_TRANSCRIPT_LANGUAGES
+
     def extract_video_id(self,url: str) -> str:
-        """Extract YouTube video ID from URL."""
+        """Extract YouTube video ID from URL; returns "" when the URL holds no well-formed video id."""
         parsed_url = urlparse(url)
+        video_id = ""
         if parsed_url.hostname in ("www.youtube.com", "youtube.com"):
             query = parse_qs(parsed_url.query)
-            video_id = query.get("v", [None])[0]
-            return video_id if video_id is not None else ""
+            video_id = query.get("v", [""])[0]
         elif parsed_url.hostname == "youtu.be":
-            return parsed_url.path.lstrip("/")
-        return ""
+            video_id = parsed_url.path.lstrip("/")
+        return video_id if VIDEO_ID_PATTERN.match(video_id) else ""
 
     def fetch_transcript(self,video_id: str) -> list:
-        """Fetch and format transcript from YouTube."""
+        """Fetch and format transcript from YouTube, going through the transcript cache when one is configured."""
+        if self.transcript_cache is not None:
+            cached=self.transcript_cache.get(video_id, self.languages)
+            if cached is not None:
+                if "error" in cached:
+                    raise HTTPException(status_code=500, detail=f"Error fetching transcript: {cached['error']}")
+                return cached["transcript"]
+
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=["en-GB", "en-IN", "en-CA", "en-AU", "en"])
-            return [{"text": entry["text"], "start": entry["start"], "duration": entry["duration"]} for entry in transcript]
+            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=self.languages)
+            formatted=[{"text": entry["text"], "start": entry["start"], "duration": entry["duration"]} for entry in transcript]
         except Exception as e:
+            if self.transcript_cache is not None and isinstance(e, PERMANENT_TRANSCRIPT_ERRORS):
+                self.transcript_cache.put_negative(video_id, self.languages, str(e))
             raise HTTPException(status_code=500, detail=f"Error fetching transcript: {str(e)}")
 
+        if self.transcript_cache is not None:
+            self.transcript_cache.put(video_id, self.languages, formatted)
+        return formatted
+
     def textify(self, transcript: list) -> str:
         """Convert transcript list to a single text string."""
-        return " ".join(entry["text"] for entry in transcript if "text" in entry)
\ No newline at end of file
+        return " ".join(entry["text"] for entry in transcript if "text" in entry)
@@ -0,0 +1,26 @@
+from app.core.answer_cache import SemanticAnswerCache
+
+
+def run_test():
+    answer_cache=SemanticAnswerCache(similarity_threshold=0.95, ttl_seconds=60, max_entries_per_video=2)
+    answer_cache.put("chat_once", "ehTIhQpj9ys", [1.0, 0.0, 0.0], "numpy answer", generation=answer_cache.generation("ehTIhQpj9ys"))
+    assert answer_cache.lookup("chat_once", "ehTIhQpj9ys", [0.99, 0.05, 0.0])=="numpy answer"
+    assert answer_cache.lookup("chat_once", "ehTIhQpj9ys", [0.0, 1.0, 0.0]) is None
+    assert answer_cache.lookup("timestamps:5", "ehTIhQpj9ys", [1.0, 0.0, 0.0]) is None
+    assert answer_cache.lookup("chat_once", "eWiBLgxOcW0", [1.0, 0.0, 0.0]) is None
+
+    stale_generation=answer_cache.generation("ehTIhQpj9ys")
+    answer_cache.invalidate("ehTIhQpj9ys")
+    assert answer_cache.lookup("chat_once", "ehTIhQpj9ys", [1.0, 0.0, 0.0]) is None
+    answer_cache.put("chat_once", "ehTIhQpj9ys", [1.0, 0.0, 0.0], "stale answer", generation=stale_generation)
+    assert answer_cache.lookup("chat_once", "ehTIhQpj9ys", [1.0, 0.0, 0.0]) is None, "an answer that raced with an invalidation must not be cached"
+
+    for i, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])):
+        answer_cache.put("chat_once", "ehTIhQpj9ys", vector, f"answer {i}")
+    assert answer_cache.stats()["entries"]==2
+    print(f"Answer cache: {answer_cache.stats()}")
+    print("completed!!!")
+
+
+if __name__=="__main__":
+    run_test()
@@ -14,7 +14,7 @@ async def run_test():
     vector_store=get_vector_store()
     client=get_mongo_client()
     chat_mongodb_repo=ChatMongoDBRepository(client)
-    rag_service=BasicRAGService(llm,vector_store)
+    rag_service=BasicRAGService(llm,VectorRepository(vector_store))
     chat_rag_service=ChatRAGService(llm,rag_service)
     persistant_chat_rag_service=PersistentChatRAGService(chat_rag_service,chat_mongodb_repo)
 
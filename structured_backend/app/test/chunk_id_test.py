@@ -0,0 +1,33 @@
+from app.services.transcript_processing_service import TranscriptProcessingService
+
+
+def make_transcript(words: int):
+    return [{"text": f"segment {i} talks about topic {i%7}", "start": i*2.5, "duration": 2.5} for i in range(words)]
+
+def run_test():
+    transcript_processing_service=TranscriptProcessingService(chunk_size=200, chunk_overlap=40)
+    transcript=make_transcript(60)
+
+    first=transcript_processing_service.process_transcript_to_documents("ehTIhQpj9ys", transcript)
+    second=list(transcript_processing_service.iter_segment_chunks("ehTIhQpj9ys", iter(transcript)))
+    ids=[doc.metadata["chunk_id"] for doc in first]
+    print(f"{len(ids)} chunks, first ids: {ids[:3]}")
+    assert ids==[doc.metadata["chunk_id"] for doc in second], "chunk ids must not depend on the run"
+    assert len(set(ids))==len(ids)
+    assert [doc.metadata["ordinal"] for doc in first]==list(range(len(first)))
+    assert all(len(doc.page_content)<=200 for doc in first)
+
+    assert TranscriptProcessingService.make_chunk_id("ehTIhQpj9ys", 0, "hello")==TranscriptProcessingService.make_chunk_id("ehTIhQpj9ys", 0, "hello")
+    assert TranscriptProcessingService.make_chunk_id("ehTIhQpj9ys", 0, "hello")!=TranscriptProcessingService.make_chunk_id("ehTIhQpj9ys", 1, "hello")
+    assert TranscriptProcessingService.make_chunk_id("ehTIhQpj9ys", 0, "hello")!=TranscriptProcessingService.make_chunk_id("eWiBLgxOcW0", 0, "hello")
+
+    # Changing the transcript tail keeps the ids of the chunks before it, so a resumed ingest skips them.
+    edited=transcript[:-1]+[{"text": "a different ending", "start": transcript[-1]["start"], "duration": 2.5}]
+    edited_ids=[doc.metadata["chunk_id"] for doc in transcript_processing_service.iter_segment_chunks("ehTIhQpj9ys", edited)]
+    assert edited_ids[:-1]==ids[:-1] and edited_ids[-1]!=ids[-1]
+
+    print("completed!!!")
+
+
+if __name__=="__main__":
+    run_test()
@@ -0,0 +1,42 @@
+from app.core.compact_transcript import CompactTranscript
+
+
+TRANSCRIPT=[
+    {"text": "Welcome back to the channel.", "start": 0.0, "duration": 2.16},
+    {"text": "Today: numpy vs. python lists — ünïcode too.", "start": 2.16, "duration": 3.021},
+    {"text": "Let's look at the benchmarks.", "start": 5.181, "duration": 4.0},
+    {"text": "Thanks for watching!", "start": 3601.375, "duration": 1.5},
+]
+
+def run_test():
+    compact=CompactTranscript.from_entries(TRANSCRIPT)
+    document=compact.to_document(codec="zlib")
+    print(f"Stored columns: {sorted(document)} count={document['count']}")
+
+    restored=CompactTranscript.from_document(document)
+    assert len(restored)==len(TRANSCRIPT)
+    assert restored.transcript_text==" ".join(entry["text"] for entry in TRANSCRIPT)
+    assert restored.entries==TRANSCRIPT, restored.entries
+    assert [restored.segment_text(i) for i in range(len(restored))]==[entry["text"] for entry in TRANSCRIPT]
+
+    assert restored.window(2.5, 5.181)==TRANSCRIPT[1:2]
+    assert restored.window(5.0)==TRANSCRIPT[1:]
+
+    # Segments overlap in time: the long first one is still running when the third one starts.
+    overlapping=CompactTranscript.from_entries([
+        {"text": "long intro", "start": 0.0, "duration": 10.0},
+        {"text": "short aside", "start": 1.0, "duration": 1.0},
+        {"text": "main point", "start": 3.0, "duration": 2.0},
+        {"text": "outro", "start": 6.0, "duration": 1.0},
+    ])
+    assert [entry["text"] for entry in overlapping.window(4.0, 6.5)]==["long intro", "main point", "outro"]
+    assert overlapping.window(11.0)==[]
+
+    uncompressed=CompactTranscript.from_document(compact.to_document(codec="none"))
+    assert uncompressed.entries==TRANSCRIPT
+
+    print("completed!!!")
+
+
+if __name__=="__main__":
+    run_test()
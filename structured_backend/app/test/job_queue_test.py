@@ -0,0 +1,34 @@
+import asyncio
+from app.services.job_queue_service import JobQueueService
+from app.repositories.in_memory_job_repository import InMemoryJobRepository
+
+
+async def fake_ingest_handler(job, report):
+    for i, stage in enumerate(["fetching_transcript", "generating_description", "embedding"]):
+        await report(stage, (i+1)/4)
+        await asyncio.sleep(0.1)
+    if job.payload["video_id"]=="broken":
+        raise RuntimeError("Transcript not available")
+    return {"video_id": job.payload["video_id"]}
+
+async def run_test():
+    job_queue_service=JobQueueService(InMemoryJobRepository(), num_workers=2, poll_interval_seconds=0.05)
+    job_queue_service.register_handler("ingest_video", fake_ingest_handler)
+    job_queue_service.start()
+
+    jobs=[await job_queue_service.enqueue("ingest_video", {"video_id": video_id, "url": ""}) for video_id in ["ehTIhQpj9ys", "broken", "eWiBLgxOcW0"]]
+
+    while True:
+        statuses=[await job_queue_service.get_job(job.job_id) for job in jobs]
+        for status in statuses:
+            print(f"{status.payload['video_id']}: {status.status} stage={status.stage} progress={status.progress:.2f} error={status.error}")
+        print("---")
+        if all(status.status in ("done", "failed") for status in statuses):
+            break
+        await asyncio.sleep(0.15)
+
+    await job_queue_service.stop()
+
+
+if __name__=="__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,46 @@
+from app.core.lexical_index import BM25Index, LexicalIndexStore, reciprocal_rank_fusion, tokenize
+
+
+CHUNKS=[
+    ("c0", "In this video we install numpy and pandas with pip."),
+    ("c1", "The training loop uses torch.optim.Adam with a learning rate of 3e-4."),
+    ("c2", "We compare numpy arrays against python lists for speed."),
+    ("c3", "Finally the model is exported to ONNX for inference."),
+]
+
+def run_test():
+    print(f"Tokens: {tokenize('The torch.optim.Adam optimizer, version 3.14!')}")
+    assert tokenize("The torch.optim.Adam optimizer")==["torch.optim.adam", "optimizer"]
+
+    index=BM25Index.from_chunks(CHUNKS)
+    results=index.search("numpy speed", k=3)
+    print(f"BM25 'numpy speed': {results}")
+    assert [chunk_id for chunk_id, _ in results]==["c2", "c0"]
+    assert index.search("torch.optim.Adam", k=3)[0][0]=="c1"
+    assert index.search("kubernetes", k=3)==[]
+
+    restored=BM25Index.from_bytes(index.to_bytes())
+    assert restored.search("numpy speed", k=3)==results
+
+    store=LexicalIndexStore(max_videos=1)
+    store.put("video_a", index, store.generation("video_a"))
+    assert store.get("video_a") is index
+    stale_generation=store.generation("video_a")
+    store.invalidate("video_a")
+    assert store.get("video_a") is None
+    store.put("video_a", index, stale_generation)
+    assert store.get("video_a") is None, "an index built before an invalidation must not be kept"
+    store.put("video_b", index, store.generation("video_b"))
+    store.put("video_c", index, store.generation("video_c"))
+    assert store.get("video_b") is None and store.get("video_c") is index
+
+    fused=reciprocal_rank_fusion([["c0", "c1", "c2"], ["c2", "c3"]], k=60)
+    print(f"RRF: {fused}")
+    assert [chunk_id for chunk_id, _ in fused]==["c2", "c0", "c1", "c3"]
+    assert abs(fused[0][1]-(1/63+1/61))<1e-12
+
+    print("completed!!!")
+
+
+if __name__=="__main__":
+    run_test()
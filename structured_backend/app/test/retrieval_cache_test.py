@@ -0,0 +1,29 @@
+from app.core.retrieval_cache import RetrievalCache
+from app.core.embedding_cache import normalize_query
+
+
+def run_test():
+    assert normalize_query("  What IS   NumPy? ")=="what is numpy?"
+
+    retrieval_cache=RetrievalCache(max_entries=2, ttl_seconds=60)
+    key=retrieval_cache.key("ehTIhQpj9ys", "What is numpy?", 5, "hybrid")
+    assert retrieval_cache.get(key) is None
+    retrieval_cache.put(key, [("c2", 0.9), ("c0", 0.5)])
+    assert retrieval_cache.get(retrieval_cache.key("ehTIhQpj9ys", "  WHAT is numpy?", 5, "hybrid"))==[("c2", 0.9), ("c0", 0.5)]
+    assert retrieval_cache.get(retrieval_cache.key("ehTIhQpj9ys", "  WHAT is numpy?", 5, "vector")) is None
+
+    stale_key=retrieval_cache.key("ehTIhQpj9ys", "what is pandas", 5, "hybrid")
+    retrieval_cache.invalidate("ehTIhQpj9ys")
+    assert retrieval_cache.get(retrieval_cache.key("ehTIhQpj9ys", "  WHAT is numpy?", 5, "hybrid")) is None
+    retrieval_cache.put(stale_key, [("c0", 0.4)])
+    assert retrieval_cache.get(retrieval_cache.key("ehTIhQpj9ys", "what is pandas", 5, "hybrid")) is None, "a search that raced with an invalidation must not be cached"
+
+    for i in range(3):
+        retrieval_cache.put(retrieval_cache.key("eWiBLgxOcW0", f"question {i}", 5, "hybrid"), [(f"c{i}", 1.0)])
+    assert retrieval_cache.stats()["entries"]==2
+    print(f"Retrieval cache: {retrieval_cache.stats()}")
+    print("completed!!!")
+
+
+if __name__=="__main__":
+    run_test()
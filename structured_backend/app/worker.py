@@ -0,0 +1,12 @@
+# app/worker.py
+# Standalone job worker: `python -m app.worker`. Run with RUN_JOB_WORKERS_IN_APP=False on the API side.
+import asyncio
+from app.core.dependencies import get_job_queue_service
+
+
+async def main():
+    job_queue_service=get_job_queue_service()
+    await job_queue_service.run_forever()
+
+if __name__=="__main__":
+    asyncio.run(main())